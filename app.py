@@ -5,47 +5,320 @@ Streamlit application for the LLMOps StudyBuddy project.
 
 This app provides:
 - A UI for selecting quiz settings (topic, type, difficulty, quantity)
-- Interactive presentation of questions generated by the QuestionGenerator
+- Interactive presentation of questions generated by the QuestionGenerator,
+  with questions previewed as they stream in during generation
 - Submission, scoring, and visual feedback on quiz performance
-- CSV export of results for later analysis
+- Saving results to an append-only store, and CSV download built in memory
 
 The UI works together with:
 - QuestionGenerator     (LLM-driven question creation)
 - QuizManager           (quiz state, evaluation, export)
+- QuestionBank          (persistent cache of validated questions)
+- ResultsStore          (append-only store of saved quiz results)
+- PrefetchPool          (background-warmed questions for preset topics)
 - Streamlit session_state (UI lifecycle management)
+
+The quiz body and the results panel are `st.fragment`s: answering a
+question re-executes only the quiz fragment, not the whole script.
+
+The generator stack (LangChain, Groq) is imported lazily: the first page
+renders without it while a warm-up thread preloads it. pandas is only
+imported by the legacy CSV export (RESULTS_BACKEND=csv).
 """
 
 # --------------------------------------------------------------
 # Imports
 # --------------------------------------------------------------
-import os
+from __future__ import annotations
+
+from datetime import datetime
+from typing import TYPE_CHECKING
 
 import streamlit as st
-from dotenv import load_dotenv
+from streamlit.runtime.scriptrunner import get_script_run_ctx
 
 # Quiz management + helpers
 from src.utils.helpers import QuizManager, rerun
 
-# LLM question-generation service
-from src.generator.question_generator import QuestionGenerator
+# Per-session rerun counter and timer
+from src.utils.render_stats import session_render_stats, track_render
+
+# Idle-session eviction + session memory accounting
+from src.utils.session_registry import get_session_registry
+from src.models.quiz_records import interned_count
+
+# Prometheus exporter and background preloading of heavy modules
+from src.common.metrics import start_metrics_server
+from src.common.warmup import start_warmup
+
+# Configuration and preset topics
+from src.config.settings import settings
+from src.config.topics import DIFFICULTIES, QUESTION_TYPES, TOPIC_OPTIONS, preset_topics
+
+# Persistent store of previously validated questions
+from src.storage.question_bank import get_question_bank
+
+# Append-only store of saved quiz results
+from src.storage.results_store import get_results_store
+
+if TYPE_CHECKING:
+    from src.models.quiz_records import QuizQuestion
+
+    # LLM question-generation service (+ request coalescing and prefetching)
+    from src.generator.coalescing import CoalescingGenerator
+    from src.generator.prefetch import PrefetchPool
+    from src.generator.question_generator import QuestionGenerator
+
+
+# --------------------------------------------------------------
+# Shared Resources
+# --------------------------------------------------------------
+@st.cache_resource
+def get_question_generator() -> QuestionGenerator | CoalescingGenerator:
+    """
+    Return one QuestionGenerator per process, shared by every session.
+
+    The generator (and the pooled Groq client behind it) is thread-safe, so
+    there is no need to rebuild it on every "Generate Quiz" click. When
+    coalescing is enabled, identical requests from concurrent sessions share
+    their LLM calls.
+    """
+    # Imported on first use (usually already loaded by the warm-up thread)
+    from src.generator.question_generator import QuestionGenerator
+
+    generator = QuestionGenerator()
+    if settings.COALESCING_ENABLED:
+        from src.generator.coalescing import CoalescingGenerator
+
+        return CoalescingGenerator(generator)
+    return generator
+
+
+@st.cache_resource
+def get_prefetch_pool() -> PrefetchPool | None:
+    """
+    Start (once per process) the background pool that keeps preset topics warm.
+
+    Returns
+    -------
+    PrefetchPool or None
+        The running pool, or None when prefetching is disabled.
+    """
+    if not settings.PREFETCH_ENABLED:
+        return None
+
+    from src.generator.prefetch import PrefetchPool
+
+    bank = get_question_bank() if settings.QUESTION_BANK_ENABLED else None
+    return PrefetchPool(
+        get_question_generator(),
+        preset_topics(),
+        QUESTION_TYPES,
+        DIFFICULTIES,
+        bank=bank,
+    ).start()
+
+
+@st.cache_resource
+def start_metrics_exporter() -> bool:
+    """Serve Prometheus metrics on `METRICS_PORT` (once per process)."""
+    return start_metrics_server()
 
-# Load environment variables
-load_dotenv()
+
+def touch_session() -> None:
+    """Record activity for this session (idle sessions are released on the way)."""
+    ctx = get_script_run_ctx()
+    if ctx is not None:
+        get_session_registry().touch(ctx.session_id, st.session_state.quiz_manager)
+
+
+@st.cache_resource
+def start_background_warmup() -> bool:
+    """Preload the generator stack on a daemon thread (once per process)."""
+    return start_warmup()
+
+
+# --------------------------------------------------------------
+# Progressive Generation
+# --------------------------------------------------------------
+def render_question_preview(container, number: int, record: QuizQuestion) -> None:
+    """
+    Show a read-only preview of a question while the quiz is still generating.
+
+    Parameters
+    ----------
+    container
+        Streamlit container the preview is written into.
+    number : int
+        1-based question number.
+    record : QuizQuestion
+        Question record produced by `QuizManager.iter_questions`.
+    """
+    container.markdown(f"**Question {number}: {record.question}**")
+    if record.is_mcq:
+        container.markdown("\n".join(f"- {option}" for option in record.options))
+
+
+def stream_quiz(
+    quiz_manager: QuizManager,
+    slot,
+    generator: QuestionGenerator,
+    topic: str,
+    question_type: str,
+    difficulty: str,
+    num_questions: int,
+    **sources,
+) -> bool:
+    """
+    Generate a quiz while rendering each question as soon as it is ready.
+
+    Previews are written into `slot` and cleared once the quiz is complete,
+    at which point the interactive quiz takes their place.
+
+    Returns
+    -------
+    bool
+        True if at least one question was generated.
+    """
+    preview = slot.container()
+    preview.markdown("## 📝 Quiz")
+    progress = preview.progress(0.0, text="Generating questions...")
+
+    try:
+        for number, record in enumerate(
+            quiz_manager.iter_questions(
+                generator,
+                topic,
+                question_type,
+                difficulty,
+                num_questions,
+                **sources,
+            ),
+            start=1,
+        ):
+            progress.progress(
+                min(number / num_questions, 1.0),
+                text=f"{number}/{num_questions} questions ready",
+            )
+            render_question_preview(preview, number, record)
+
+    except Exception as exc:
+        st.error(f"Error generating questions: {exc}")
+        return False
+
+    finally:
+        slot.empty()
+
+    if not quiz_manager.questions:
+        st.error("No questions were generated.")
+        return False
+
+    return True
+
+
+# --------------------------------------------------------------
+# Quiz & Results Fragments
+# --------------------------------------------------------------
+@st.fragment
+def render_quiz() -> None:
+    """
+    Render the quiz and collect answers.
+
+    As a fragment, a radio click or keystroke re-executes only this
+    function. Submitting evaluates the quiz and reruns the whole app so the
+    results panel appears.
+    """
+    with track_render("quiz"):
+        touch_session()
+        quiz_manager = st.session_state.quiz_manager
+
+        st.markdown("## 📝 Quiz")
+
+        quiz_manager.attempt_quiz()
+
+        if st.button("✅ Submit Quiz"):
+            quiz_manager.evaluate_quiz()
+            st.session_state.quiz_submitted = True
+            # The results panel lives outside this fragment
+            st.rerun(scope="app")
+
+
+@st.fragment
+def render_results() -> None:
+    """
+    Render the score, per-question feedback, saving and CSV download.
+
+    As a fragment, saving results re-executes only this panel.
+    """
+    with track_render("results"):
+        st.markdown("## 📊 Quiz Results")
+
+        # Cached score; recomputed only after the quiz is marked again
+        summary = st.session_state.quiz_manager.result_summary()
+
+        if summary.total:
+            st.write(f"Overall score: **{summary.score_percentage:.2f}%**")
+
+            # Detailed per-question feedback
+            for result in summary.results:
+                q_num = result.question_number
+
+                if result.is_correct:
+                    st.success(f"✅ Question {q_num}: {result.question}")
+                else:
+                    st.error(f"❌ Question {q_num}: {result.question}")
+                    st.write(f"Your answer: `{result.user_answer}`")
+                    st.write(f"Correct answer: `{result.correct_answer}`")
+
+                st.markdown(" ")
+
+            # -------------------
+            # Save Results
+            # -------------------
+            st.markdown("---")
+            st.markdown("### 💾 Save Your Results")
+
+            quiz_manager = st.session_state.quiz_manager
+
+            if settings.RESULTS_BACKEND == "csv":
+                # Legacy path: one timestamped file per save under results/
+                if st.button("💾 Save Results to CSV"):
+                    saved_file = quiz_manager.save_to_csv()
+                    if not saved_file:
+                        st.warning("No results available.")
+            elif st.button("💾 Save Results"):
+                ctx = get_script_run_ctx()
+                quiz_manager.save_results(
+                    get_results_store(),
+                    session_id=ctx.session_id if ctx is not None else None,
+                )
+
+            # Built in memory only when the learner clicks the button
+            st.download_button(
+                label="⬇️ Download Results",
+                data=quiz_manager.results_csv,
+                file_name=f"quiz_results_{datetime.now():%Y%m%d_%H%M%S}.csv",
+                mime="text/csv",
+                on_click="ignore",
+            )
 
 
 # --------------------------------------------------------------
 # Main App
 # --------------------------------------------------------------
-def main() -> None:
+def render_app() -> None:
     """
-    Run the Streamlit StudyBuddy application.
+    Render one full run of the StudyBuddy application.
 
     Manages session state, quiz setup, generation, evaluation,
     and result export.
     """
 
-    # App configuration
-    st.set_page_config(page_title="Study Buddy AI", page_icon="📚", layout="wide")
+    # Expose pipeline metrics to Prometheus
+    start_metrics_exporter()
+
+    # Start importing heavy modules while the first page renders
+    start_background_warmup()
 
     # ----------------------------------------------------------
     # Session State Initialisation
@@ -62,11 +335,26 @@ def main() -> None:
     if "rerun_trigger" not in st.session_state:
         st.session_state.rerun_trigger = False
 
+    # Keep this session registered; tell the learner if it was idle too long
+    touch_session()
+    if st.session_state.quiz_manager.evicted:
+        st.session_state.quiz_manager.evicted = False
+        st.session_state.quiz_generated = False
+        st.session_state.quiz_submitted = False
+        st.info("Your previous quiz was cleared after a period of inactivity. Generate a new one to continue.")
+
     # ----------------------------------------------------------
     # Layout: Sidebar (controls) + Main (quiz)
     # ----------------------------------------------------------
     sidebar, main_col = st.columns([1, 2])
 
+    with main_col:
+        # App Title
+        st.title("📚 Study Buddy AI")
+
+        # Placeholder for questions streamed in while a quiz is generating
+        generation_slot = st.empty()
+
     # ===========================
     # Sidebar — Quiz Configuration
     # ===========================
@@ -78,7 +366,7 @@ def main() -> None:
         # -----------------------
         question_type = st.selectbox(
             "Select Question Type",
-            ["Multiple Choice", "Fill in the Blank"],
+            QUESTION_TYPES,
             index=0,
         )
 
@@ -87,17 +375,7 @@ def main() -> None:
         # -----------------------
         st.markdown("### 🧠 Topic")
 
-        topic_options = {
-            "📜 History": "history, covering different periods, regions, and major events",
-            "🌍 Geography": "world geography, including countries, capitals, landforms, and climate",
-            "🧪 Science": "general science, including physics, chemistry, and basic scientific principles",
-            "🧬 Biology": "biology, including cells, genetics, evolution, and ecosystems",
-            "📐 Mathematics": "mathematics, including algebra, geometry, and basic calculus ideas",
-            "💻 Computer Science": "computer science fundamentals, including algorithms and data structures",
-            "📈 Economics": "economics, including microeconomics and macroeconomics concepts",
-            "⚽ Sports": "general sports knowledge, including rules, famous events, and athletes",
-            "📝 Custom topic": None,
-        }
+        topic_options = TOPIC_OPTIONS
 
         topic_choice = st.selectbox(
             "Choose a topic",
@@ -125,7 +403,7 @@ def main() -> None:
 
         difficulty = st.selectbox(
             "Difficulty Level",
-            ["Easy", "Medium", "Hard"],
+            DIFFICULTIES,
             index=1,
         )
 
@@ -152,87 +430,83 @@ def main() -> None:
             else:
                 st.session_state.quiz_submitted = False
 
-                generator = QuestionGenerator()
-
-                success = st.session_state.quiz_manager.generate_questions(
-                    generator,
-                    effective_topic,
-                    question_type,
-                    difficulty,
-                    num_questions,
-                )
+                generator = get_question_generator()
+                sources = {
+                    "bank": get_question_bank() if settings.QUESTION_BANK_ENABLED else None,
+                    "pool": get_prefetch_pool(),
+                }
+
+                if settings.PROGRESSIVE_RENDERING:
+                    # Show each question as soon as it is ready
+                    success = stream_quiz(
+                        st.session_state.quiz_manager,
+                        generation_slot,
+                        generator,
+                        effective_topic,
+                        question_type,
+                        difficulty,
+                        num_questions,
+                        **sources,
+                    )
+                else:
+                    success = st.session_state.quiz_manager.generate_questions(
+                        generator,
+                        effective_topic,
+                        question_type,
+                        difficulty,
+                        num_questions,
+                        **sources,
+                    )
 
                 st.session_state.quiz_generated = success
                 rerun()
 
+        # -----------------------
+        # Rerun cost (debug view)
+        # -----------------------
+        if settings.RENDER_STATS_PANEL:
+            with st.expander("⏱️ Render stats (this session)"):
+                st.json(session_render_stats().snapshot())
+
+        if settings.SESSION_MEMORY_PANEL:
+            with st.expander("🧮 Session memory (this process)"):
+                report = get_session_registry().memory_report()
+                st.write(
+                    f"**{len(report['sessions'])}** sessions, "
+                    f"**{report['total_bytes'] / 1024:.1f} KiB** in total, "
+                    f"{interned_count()} shared questions, {report['evicted']} evicted"
+                )
+                st.dataframe(report["sessions"], hide_index=True)
+
     # ===========================
     # Main Content — Quiz & Results
     # ===========================
     with main_col:
-        # App Title
-        st.title("📚 Study Buddy AI")
-
         # -----------------------
         # Quiz Display & Answer Input
         # -----------------------
         if st.session_state.quiz_generated and st.session_state.quiz_manager.questions:
-            st.markdown("## 📝 Quiz")
-
-            st.session_state.quiz_manager.attempt_quiz()
-
-            if st.button("✅ Submit Quiz"):
-                st.session_state.quiz_manager.evaluate_quiz()
-                st.session_state.quiz_submitted = True
-                rerun()
+            render_quiz()
 
         # -----------------------
         # Quiz Results
         # -----------------------
         if st.session_state.quiz_submitted:
-            st.markdown("## 📊 Quiz Results")
-
-            results_df = st.session_state.quiz_manager.generate_result_dataframe()
-
-            if not results_df.empty:
-                # Calculate score
-                correct_count = results_df["is_correct"].sum()
-                total_questions = len(results_df)
-                score_percentage = (correct_count / total_questions) * 100
-
-                st.write(f"Overall score: **{score_percentage:.2f}%**")
+            render_results()
 
-                # Detailed per-question feedback
-                for _, result in results_df.iterrows():
-                    q_num = result["question_number"]
 
-                    if result["is_correct"]:
-                        st.success(f"✅ Question {q_num}: {result['question']}")
-                    else:
-                        st.error(f"❌ Question {q_num}: {result['question']}")
-                        st.write(f"Your answer: `{result['user_answer']}`")
-                        st.write(f"Correct answer: `{result['correct_answer']}`")
-
-                    st.markdown(" ")
+def main() -> None:
+    """
+    Run the Streamlit StudyBuddy application.
 
-                # -------------------
-                # Save Results
-                # -------------------
-                st.markdown("---")
-                st.markdown("### 💾 Save Your Results")
+    Every full script run is timed per session (scope 'app'); fragment
+    reruns are timed separately by the fragments themselves.
+    """
+    # App configuration
+    st.set_page_config(page_title="Study Buddy AI", page_icon="📚", layout="wide")
 
-                if st.button("💾 Save Results to CSV"):
-                    saved_file = st.session_state.quiz_manager.save_to_csv()
-
-                    if saved_file:
-                        with open(saved_file, "rb") as f:
-                            st.download_button(
-                                label="⬇️ Download Results",
-                                data=f.read(),
-                                file_name=os.path.basename(saved_file),
-                                mime="text/csv",
-                            )
-                    else:
-                        st.warning("No results available.")
+    with track_render("app"):
+        render_app()
 
 
 # --------------------------------------------------------------
@@ -0,0 +1,191 @@
+"""
+decode.py
+
+Microbenchmark of the response decode path for the LLMOps StudyBuddy
+project: per-question CPU cost of turning a raw model response into
+validated question models.
+
+Two paths are compared on the same well-formed responses (produced by
+`FakeChatModel` from the production templates):
+
+- legacy : the previous path, kept here for reference; a new
+  `PydanticOutputParser` per call, v1-style `@validator` schemas, and one
+  `model_validate` per batch item after `json.loads`
+- fast   : `QuestionGenerator._parse` with the shared parsers, native JSON
+  validation, bulk `TypeAdapter` validation and `JSON_DECODER`
+
+Usage
+-----
+Example:
+    python -m benchmarks.decode --responses 200 --repeats 5 --n 5,10
+"""
+
+# --------------------------------------------------------------
+# Imports
+# --------------------------------------------------------------
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import time
+import warnings
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence
+from unittest import mock
+
+from langchain_core.output_parsers import PydanticOutputParser
+from pydantic import BaseModel, Field, PydanticDeprecatedSince20
+
+from benchmarks.fake_llm import FakeChatModel
+from src.generator.question_generator import QuestionGenerator
+from src.prompts.templates import get_prompt_template
+from src.utils.json_repair import JSON_DECODER
+
+TOPIC = "benchmark topic"
+
+
+# --------------------------------------------------------------
+# Legacy Path
+# --------------------------------------------------------------
+def _clean_question(v: object) -> str:
+    """The schemas' question normaliser (dict -> first text field)."""
+    if isinstance(v, dict):
+        for key in ("text", "question", "description", "content", "prompt"):
+            if isinstance(v.get(key), str):
+                return v[key]
+    return str(v)
+
+
+with warnings.catch_warnings():
+    warnings.simplefilter("ignore", PydanticDeprecatedSince20)
+    from pydantic import validator
+
+    class LegacyMCQQuestion(BaseModel):
+        question: str = Field(description="The question text")
+        options: List[str] = Field(description="List of 4 options")
+        correct_answer: str = Field(description="The correct answer from the options")
+
+        @validator("question", pre=True)
+        def clean_question(cls, v: object) -> str:
+            return _clean_question(v)
+
+    class LegacyFillBlankQuestion(BaseModel):
+        question: str = Field(description="The question text with '___' for the blank")
+        answer: str = Field(description="The correct word or phrase for the blank")
+
+        @validator("question", pre=True)
+        def clean_question(cls, v: object) -> str:
+            return _clean_question(v)
+
+
+_LEGACY_MODELS = {"mcq": LegacyMCQQuestion, "fill_blank": LegacyFillBlankQuestion}
+
+
+def legacy_decode(kind: str, content: str, validate: Callable[[Any], Any], batch: bool) -> int:
+    """Decode one response the way the generator used to; return the number of questions."""
+    model = _LEGACY_MODELS[kind]
+    if not batch:
+        validate(PydanticOutputParser(pydantic_object=model).parse(content))
+        return 1
+
+    data = json.loads(content)
+    if isinstance(data, dict):
+        data = data.get("questions", [data])
+    valid = [validate(model.model_validate(item)) for item in data]
+    return len(valid)
+
+
+# --------------------------------------------------------------
+# Harness
+# --------------------------------------------------------------
+def make_responses(kind: str, count: int, n: Optional[int]) -> List[str]:
+    """Produce `count` well-formed responses for a template (single if `n` is None)."""
+    fake = FakeChatModel(latency="fixed:0", seed=7)
+    name = kind if n is None else f"{kind}_batch"
+    prompt = get_prompt_template(name).format(topic=TOPIC, difficulty="medium", n=n or 1)
+    return [fake.invoke(prompt).content for _ in range(count)]
+
+
+def time_per_question(decode: Callable[[str], int], responses: Sequence[str], repeats: int) -> float:
+    """Best-of-`repeats` CPU time per decoded question, in microseconds."""
+    best = float("inf")
+    for _ in range(repeats):
+        questions = 0
+        started = time.thread_time_ns()
+        for content in responses:
+            questions += decode(content)
+        best = min(best, (time.thread_time_ns() - started) / 1000 / questions)
+    return best
+
+
+def run(responses: int, repeats: int, sizes: Sequence[int]) -> List[Dict[str, Any]]:
+    """Time both paths for single and batch responses of each kind."""
+    with mock.patch("src.generator.question_generator.get_groq_llm", return_value=None):
+        generator = QuestionGenerator()
+    validators = {"mcq": generator._validate_mcq, "fill_blank": generator._validate_fill_blank}
+
+    rows = []
+    for kind in ("mcq", "fill_blank"):
+        for n in [None, *sizes]:
+            batch = n is not None
+            name = f"{kind}_batch" if batch else kind
+            parser = generator._parsers[name]
+            validate = None if batch else validators[kind]
+            contents = make_responses(kind, responses, n)
+
+            def fast(content: str) -> int:
+                parsed = generator._parse(content, parser, validate)
+                return len(parsed.questions) if batch else 1
+
+            def legacy(content: str) -> int:
+                return legacy_decode(kind, content, validators[kind], batch)
+
+            row = {
+                "template": name,
+                "batch_size": n or 1,
+                "legacy_us_per_question": time_per_question(legacy, contents, repeats),
+                "fast_us_per_question": time_per_question(fast, contents, repeats),
+            }
+            row["speedup"] = row["legacy_us_per_question"] / row["fast_us_per_question"]
+            rows.append(row)
+    return rows
+
+
+def main(argv: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+    """Run the microbenchmark, print a table and optionally write JSON."""
+    parser = argparse.ArgumentParser(description="Per-question decode cost: legacy vs fast path.")
+    parser.add_argument("--responses", type=int, default=200, help="Distinct responses per case.")
+    parser.add_argument("--repeats", type=int, default=5, help="Timing repeats (best is kept).")
+    parser.add_argument("--n", default="5,10", help="Comma-separated batch sizes.")
+    parser.add_argument("--output", default=None, help="Optional JSON output path.")
+    args = parser.parse_args(argv)
+    logging.disable(logging.CRITICAL)
+
+    sizes = [int(size) for size in args.n.split(",") if size.strip()]
+    report = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "json_decoder": JSON_DECODER,
+        "config": {"responses": args.responses, "repeats": args.repeats, "sizes": sizes},
+        "results": run(args.responses, args.repeats, sizes),
+    }
+
+    print(f"JSON decoder: {JSON_DECODER}")
+    for row in report["results"]:
+        print(
+            f"{row['template']:<17} n={row['batch_size']:<3} "
+            f"legacy={row['legacy_us_per_question']:7.1f} us/q  "
+            f"fast={row['fast_us_per_question']:7.1f} us/q  x{row['speedup']:.1f}"
+        )
+
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote {args.output}")
+    return report
+
+
+if __name__ == "__main__":
+    main()
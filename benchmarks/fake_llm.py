@@ -0,0 +1,262 @@
+"""
+fake_llm.py
+
+Deterministic stand-in for the Groq chat model, used by the offline
+benchmarks of the LLMOps StudyBuddy project.
+
+`FakeChatModel` exposes the two methods the generator uses (`invoke` and
+`ainvoke`), reads the formatted prompt to decide what to return (single or
+batched, MCQ or fill-in-the-blank) and injects the failure modes seen in
+production:
+
+- latency drawn from a configurable distribution (fixed, uniform, lognormal)
+- malformed output: truncated JSON, fenced/prose-wrapped JSON (repairable)
+  and structurally invalid questions
+- duplicates: questions repeated from earlier responses
+- HTTP 429 errors carrying a `Retry-After` header
+
+All randomness comes from one seeded generator, so a run with the same
+seed and the same call order produces the same responses.
+"""
+
+# --------------------------------------------------------------
+# Imports
+# --------------------------------------------------------------
+from __future__ import annotations
+
+import asyncio
+import json
+import random
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+from langchain_core.messages import AIMessage
+
+# Detects batched prompts and their size ("Generate 5 distinct ...")
+_BATCH_RE = re.compile(r"Generate (\d+) distinct")
+
+# Questions remembered per kind for duplicate injection
+_HISTORY_SIZE = 200
+
+
+# --------------------------------------------------------------
+# Injected Errors
+# --------------------------------------------------------------
+class FakeRateLimitError(Exception):
+    """HTTP 429 raised by `FakeChatModel`; classified like Groq's RateLimitError."""
+
+    status_code = 429
+
+    def __init__(self, retry_after: float) -> None:
+        super().__init__("Rate limit reached (injected by FakeChatModel).")
+        self.response = httpx.Response(429, headers={"retry-after": f"{retry_after:g}"})
+
+
+# --------------------------------------------------------------
+# Latency Distributions
+# --------------------------------------------------------------
+def parse_latency(spec: str) -> Tuple[str, Tuple[float, ...]]:
+    """
+    Parse a latency spec such as 'fixed:0.5', 'uniform:0.2:1.5' or
+    'lognormal:0.8:0.6' (median seconds, sigma).
+
+    Raises
+    ------
+    ValueError
+        If the distribution is unknown or has the wrong number of parameters.
+    """
+    name, *raw = spec.split(":")
+    params = tuple(float(value) for value in raw)
+    expected = {"fixed": 1, "uniform": 2, "lognormal": 2}
+    if name not in expected or len(params) != expected[name]:
+        raise ValueError(
+            f"Invalid latency spec '{spec}'; use fixed:S, uniform:LO:HI or lognormal:MEDIAN:SIGMA."
+        )
+    return name, params
+
+
+# --------------------------------------------------------------
+# Fake Chat Model
+# --------------------------------------------------------------
+class FakeChatModel:
+    """
+    Chat model double with configurable latency and failure injection.
+
+    Parameters
+    ----------
+    latency : str, optional
+        Latency spec, see `parse_latency`.
+    malformed_rate : float, optional
+        Probability that a response is malformed.
+    duplicate_rate : float, optional
+        Probability that each returned question repeats an earlier one.
+    rate_limit_rate : float, optional
+        Probability that a call fails with HTTP 429.
+    retry_after : float, optional
+        `Retry-After` seconds sent with injected 429s.
+    seed : int, optional
+        Seed for all random decisions.
+
+    Methods
+    -------
+    invoke(prompt) / ainvoke(prompt)
+        Return an `AIMessage` (or raise an injected 429) after the sampled latency.
+    stats()
+        Calls made and failures injected, by kind.
+    reset_stats()
+        Zero the counters (the duplicate history is kept).
+    """
+
+    def __init__(
+        self,
+        latency: str = "lognormal:0.8:0.5",
+        malformed_rate: float = 0.0,
+        duplicate_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        retry_after: float = 0.5,
+        seed: int = 0,
+    ) -> None:
+        self.latency = parse_latency(latency)
+        self.malformed_rate = malformed_rate
+        self.duplicate_rate = duplicate_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._serial = 0
+        self._history: Dict[str, List[dict]] = {"mcq": [], "fill_blank": []}
+        self._counts: Dict[str, int] = {}
+
+    # ----------------------------------------------------------
+    # Sampling
+    # ----------------------------------------------------------
+    def _sample_latency(self) -> float:
+        """Draw one latency in seconds. Caller holds the lock."""
+        name, params = self.latency
+        if name == "fixed":
+            return params[0]
+        if name == "uniform":
+            return self._rng.uniform(*params)
+        median, sigma = params
+        return self._rng.lognormvariate(0.0, sigma) * median
+
+    def _count(self, name: str) -> None:
+        """Increment a counter. Caller holds the lock."""
+        self._counts[name] = self._counts.get(name, 0) + 1
+
+    def _words(self, count: int) -> List[str]:
+        """Pseudo-words from a large vocabulary, so fresh questions never look alike."""
+        return [f"term{self._rng.randrange(100_000)}" for _ in range(count)]
+
+    def _question(self, kind: str) -> dict:
+        """Return one question payload (fresh or duplicated). Caller holds the lock."""
+        history = self._history[kind]
+        if history and self._rng.random() < self.duplicate_rate:
+            self._count("duplicates")
+            return self._rng.choice(history)
+
+        self._serial += 1
+        subject = " ".join(self._words(4))
+        if kind == "mcq":
+            options = self._words(4)
+            payload = {
+                "question": f"Which concept is linked with {subject}?",
+                "options": options,
+                "correct_answer": options[self._rng.randrange(4)],
+            }
+        else:
+            payload = {
+                "question": f"The concept linked with {subject} is _____.",
+                "answer": self._words(1)[0],
+            }
+
+        history.append(payload)
+        if len(history) > _HISTORY_SIZE:
+            history.pop(0)
+        return payload
+
+    def _malform(self, kind: str, content: str) -> str:
+        """Corrupt a response in one of the ways real models do. Caller holds the lock."""
+        style = self._rng.choice(("truncated", "fenced", "invalid"))
+        self._count(f"malformed_{style}")
+        if style == "truncated":
+            return content[: max(1, len(content) // 2)]
+        if style == "fenced":
+            return f"Here is your quiz:\n```json\n{content}\n```"
+        # Structurally invalid: parses, but fails the generator's checks
+        payload = json.loads(content)
+        items = payload if isinstance(payload, list) else [payload]
+        for item in items:
+            if kind == "mcq":
+                item["options"] = item["options"][:3]
+            else:
+                item["question"] = item["question"].replace("_____", "something")
+        return json.dumps(payload)
+
+    def _respond(self, prompt: Any) -> Tuple[float, Optional[AIMessage]]:
+        """Decide latency and response for one call (None = injected 429)."""
+        text = str(prompt)
+        kind = "mcq" if "multiple-choice" in text else "fill_blank"
+        batch = _BATCH_RE.search(text)
+
+        with self._lock:
+            self._count("calls")
+            delay = self._sample_latency()
+
+            if self._rng.random() < self.rate_limit_rate:
+                self._count("rate_limited")
+                return delay, None
+
+            if batch:
+                content = json.dumps(
+                    [dict(self._question(kind)) for _ in range(int(batch.group(1)))]
+                )
+            else:
+                content = json.dumps(dict(self._question(kind)))
+
+            if self._rng.random() < self.malformed_rate:
+                content = self._malform(kind, content)
+
+        input_tokens = len(text) // 4
+        output_tokens = len(content) // 4
+        return delay, AIMessage(
+            content=content,
+            usage_metadata={
+                "input_tokens": input_tokens,
+                "output_tokens": output_tokens,
+                "total_tokens": input_tokens + output_tokens,
+            },
+        )
+
+    # ----------------------------------------------------------
+    # Chat Model API
+    # ----------------------------------------------------------
+    def invoke(self, prompt: Any, *args: Any, **kwargs: Any) -> AIMessage:
+        """Blocking call, like `ChatGroq.invoke`."""
+        delay, message = self._respond(prompt)
+        time.sleep(delay)
+        if message is None:
+            raise FakeRateLimitError(self.retry_after)
+        return message
+
+    async def ainvoke(self, prompt: Any, *args: Any, **kwargs: Any) -> AIMessage:
+        """Async call, like `ChatGroq.ainvoke`."""
+        delay, message = self._respond(prompt)
+        await asyncio.sleep(delay)
+        if message is None:
+            raise FakeRateLimitError(self.retry_after)
+        return message
+
+    def stats(self) -> Dict[str, int]:
+        """Return calls made and failures injected, by kind."""
+        with self._lock:
+            return dict(self._counts)
+
+    def reset_stats(self) -> None:
+        """Zero the counters."""
+        with self._lock:
+            self._counts.clear()
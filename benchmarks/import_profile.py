@@ -0,0 +1,170 @@
+"""
+import_profile.py
+
+Import-time profile of the LLMOps StudyBuddy modules.
+
+Each target module is imported in a fresh interpreter with `-X importtime`,
+so every number is a cold import. For each target the report gives:
+
+- the cumulative import time (best of `--repeats` runs)
+- the heaviest packages it pulled in, by top-level package name
+- which known heavy dependencies (pandas, LangChain, Groq, ...) it loaded
+
+The app's startup path is kept free of the heavy dependencies (they load
+lazily and through `src.common.warmup`). `--budget-ms` and `--forbid` turn
+the report into a regression check: the script exits with status 1 if a
+target is over budget or imports a forbidden package.
+
+Usage
+-----
+Example:
+    python -m benchmarks.import_profile
+    python -m benchmarks.import_profile --targets src.utils.helpers \\
+        --forbid pandas,langchain_core --budget-ms 800
+"""
+
+# --------------------------------------------------------------
+# Imports
+# --------------------------------------------------------------
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Sequence
+
+# Modules on the app's startup path, plus the lazily loaded generator
+DEFAULT_TARGETS = (
+    "src.config.settings",
+    "src.common.logger",
+    "src.common.metrics",
+    "src.models.question_schemas",
+    "src.storage.question_bank",
+    "src.generator.prefetch",
+    "src.generator.coalescing",
+    "src.utils.helpers",
+    "src.generator.question_generator",
+)
+
+# Packages worth calling out when they show up in an import tree
+HEAVY_PACKAGES = ("pandas", "numpy", "langchain", "langchain_core", "langchain_groq", "groq", "streamlit", "dotenv")
+
+# "import time: self [us] | cumulative | imported package"
+_LINE_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)$")
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+# --------------------------------------------------------------
+# Profiling
+# --------------------------------------------------------------
+def profile_import(module: str) -> Dict[str, Any]:
+    """
+    Import `module` in a fresh interpreter and parse the `-X importtime` log.
+
+    Returns
+    -------
+    dict
+        `total_ms` (cumulative time of the target), `packages` (self time
+        per top-level package, in ms) and `loaded` (every module imported).
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=_ROOT,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+
+    total_us = 0
+    packages: Dict[str, int] = defaultdict(int)
+    loaded: List[str] = []
+    for line in result.stderr.splitlines():
+        match = _LINE_RE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, _, name = match.groups()
+        loaded.append(name)
+        packages[name.split(".")[0]] += int(self_us)
+        if name == module:
+            total_us = int(cumulative_us)
+
+    return {
+        "total_ms": total_us / 1000,
+        "packages": {name: us / 1000 for name, us in packages.items()},
+        "loaded": loaded,
+    }
+
+
+def profile(targets: Sequence[str], repeats: int, top: int) -> List[Dict[str, Any]]:
+    """Profile every target, keeping the fastest of `repeats` cold imports."""
+    rows = []
+    for module in targets:
+        best = min((profile_import(module) for _ in range(repeats)), key=lambda run: run["total_ms"])
+        heaviest = sorted(best["packages"].items(), key=lambda item: item[1], reverse=True)[:top]
+        loaded_roots = {name.split(".")[0] for name in best["loaded"]} | set(best["loaded"])
+        rows.append(
+            {
+                "module": module,
+                "total_ms": round(best["total_ms"], 1),
+                "modules_loaded": len(best["loaded"]),
+                "heaviest_packages_ms": {name: round(ms, 1) for name, ms in heaviest},
+                "heavy_dependencies": [name for name in HEAVY_PACKAGES if name in loaded_roots],
+            }
+        )
+    return rows
+
+
+def check(rows: Sequence[Dict[str, Any]], budget_ms: Optional[float], forbid: Sequence[str]) -> List[str]:
+    """Return budget and forbidden-import violations."""
+    problems = []
+    for row in rows:
+        if budget_ms is not None and row["total_ms"] > budget_ms:
+            problems.append(f"{row['module']}: {row['total_ms']:.0f} ms > budget {budget_ms:.0f} ms")
+        for name in forbid:
+            if name in row["heavy_dependencies"]:
+                problems.append(f"{row['module']}: imports {name}")
+    return problems
+
+
+def _list(value: str) -> List[str]:
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Print the import profile and return the exit status."""
+    parser = argparse.ArgumentParser(description="Cold import time per module.")
+    parser.add_argument("--targets", type=_list, default=list(DEFAULT_TARGETS))
+    parser.add_argument("--repeats", type=int, default=3, help="Cold imports per target (best is kept).")
+    parser.add_argument("--top", type=int, default=5, help="Heaviest packages listed per target.")
+    parser.add_argument("--budget-ms", type=float, default=None, help="Fail if a target exceeds this.")
+    parser.add_argument("--forbid", type=_list, default=[], help="Fail if a target imports these packages.")
+    parser.add_argument("--output", default=None, help="Optional JSON output path.")
+    args = parser.parse_args(argv)
+
+    rows = profile(args.targets, args.repeats, args.top)
+    for row in rows:
+        heaviest = ", ".join(f"{name} {ms:.0f}" for name, ms in row["heaviest_packages_ms"].items())
+        heavy = ",".join(row["heavy_dependencies"]) or "-"
+        print(f"{row['module']:<36} {row['total_ms']:8.1f} ms  heavy={heavy:<40} top: {heaviest}")
+
+    problems = check(rows, args.budget_ms, args.forbid)
+    for problem in problems:
+        print(f"FAIL {problem}")
+
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"python": sys.version.split()[0], "results": rows, "problems": problems}, f, indent=2)
+        print(f"Wrote {args.output}")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,210 @@
+"""
+prompt_variants.py
+
+Compare prompt template variants for the LLMOps StudyBuddy project:
+parse-success rate versus input tokens.
+
+Every template of every variant ('full', 'compact', ...) is sent to the model
+for a few topics and difficulties. Each raw response goes through the same
+parsing, repair and validation as in production (`QuestionGenerator._parse`)
+with no retries, so the success rate is the first-attempt rate. For each
+template the report recommends the cheapest variant whose success rate
+meets `--min-success`.
+
+The model is whatever `get_groq_llm()` returns, so the harness runs against
+Groq, or offline against a call log with `LLM_CASSETTE_MODE=replay`.
+`--fake` uses `FakeChatModel` instead, which only checks the wiring.
+
+Usage
+-----
+Example:
+    python -m benchmarks.prompt_variants --samples 3 --min-success 0.95 \\
+        --output benchmarks/results/prompt_variants.json
+"""
+
+# --------------------------------------------------------------
+# Imports
+# --------------------------------------------------------------
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from benchmarks.fake_llm import FakeChatModel
+from benchmarks.run_generation import CpuTimer, build_generator, percentiles
+from src.config.topics import DIFFICULTIES, preset_topics
+from src.generator.question_generator import QuestionGenerator
+from src.llm.groq_client import get_groq_llm
+from src.prompts.templates import PROMPT_VARIANTS
+from src.prompts.token_accounting import TOKENIZER, count_tokens
+
+
+# --------------------------------------------------------------
+# Parsers
+# --------------------------------------------------------------
+def parser_for(generator: QuestionGenerator, name: str) -> Tuple[Any, Any]:
+    """Return the (parser, validate) pair production uses for a template."""
+    validators = {"mcq": generator._validate_mcq, "fill_blank": generator._validate_fill_blank}
+    # Batch parsers validate their items themselves
+    return generator._parsers[name], validators.get(name)
+
+
+# --------------------------------------------------------------
+# Harness
+# --------------------------------------------------------------
+def run(
+    llm: Any,
+    variants: Sequence[str],
+    templates: Sequence[str],
+    topics: Sequence[str],
+    difficulties: Sequence[str],
+    samples: int,
+    n: int,
+) -> List[Dict[str, Any]]:
+    """Send every prompt `samples` times and record tokens and parse outcome."""
+    generator = build_generator(llm, CpuTimer())
+    calls: List[Dict[str, Any]] = []
+
+    for variant in variants:
+        for name in templates:
+            template = PROMPT_VARIANTS[variant][name]
+            parser, validate = parser_for(generator, name)
+            requested = n if name.endswith("_batch") else 1
+
+            for topic in topics:
+                for difficulty in difficulties:
+                    prompt = template.format(topic=topic, difficulty=difficulty, n=n)
+                    for _ in range(samples):
+                        record: Dict[str, Any] = {
+                            "variant": variant,
+                            "template": name,
+                            "requested": requested,
+                            "prompt_tokens": count_tokens(prompt),
+                        }
+                        started = time.perf_counter()
+                        try:
+                            response = llm.invoke(prompt)
+                        except Exception as exc:
+                            # Provider errors say nothing about the prompt
+                            record["call_error"] = type(exc).__name__
+                            calls.append(record)
+                            continue
+                        record["latency"] = time.perf_counter() - started
+
+                        usage = getattr(response, "usage_metadata", None) or {}
+                        record["input_tokens"] = usage.get("input_tokens") or record["prompt_tokens"]
+                        record["output_tokens"] = usage.get("output_tokens") or count_tokens(response.content)
+
+                        try:
+                            parsed = generator._parse(response.content, parser, validate)
+                        except Exception as exc:
+                            record["parsed"] = False
+                            record["valid_questions"] = 0
+                            record["error"] = type(exc).__name__
+                        else:
+                            record["parsed"] = True
+                            record["valid_questions"] = (
+                                len(parsed.questions) if hasattr(parsed, "questions") else 1
+                            )
+                        calls.append(record)
+    return calls
+
+
+def summarise(calls: Sequence[Dict[str, Any]], min_success: float) -> Dict[str, Any]:
+    """Aggregate per (variant, template) and pick the cheapest reliable variant."""
+    grouped: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+    for call in calls:
+        grouped.setdefault((call["variant"], call["template"]), []).append(call)
+
+    summary: Dict[str, Dict[str, Any]] = {}
+    for (variant, name), group in grouped.items():
+        answered = [call for call in group if "call_error" not in call]
+        valid = sum(call["valid_questions"] for call in answered)
+        requested = sum(call["requested"] for call in answered)
+        input_tokens = sum(call["input_tokens"] for call in answered)
+        summary.setdefault(name, {})[variant] = {
+            "calls": len(group),
+            "call_errors": len(group) - len(answered),
+            "parse_success_rate": (
+                sum(call["parsed"] for call in answered) / len(answered) if answered else 0.0
+            ),
+            "valid_question_rate": valid / requested if requested else 0.0,
+            "mean_input_tokens": input_tokens / len(answered) if answered else 0.0,
+            "mean_output_tokens": (
+                sum(call["output_tokens"] for call in answered) / len(answered) if answered else 0.0
+            ),
+            "input_tokens_per_valid_question": input_tokens / valid if valid else None,
+            "latency_seconds": percentiles([call["latency"] for call in answered]),
+        }
+
+    recommendations = {}
+    for name, by_variant in summary.items():
+        reliable = [
+            (stats["input_tokens_per_valid_question"], variant)
+            for variant, stats in by_variant.items()
+            if stats["parse_success_rate"] >= min_success
+            and stats["input_tokens_per_valid_question"] is not None
+        ]
+        recommendations[name] = min(reliable)[1] if reliable else None
+
+    return {"by_template": summary, "recommended_variant": recommendations}
+
+
+def _list(value: str) -> List[str]:
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def main(argv: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+    """Run the comparison and write the JSON report."""
+    parser = argparse.ArgumentParser(description="Compare prompt variants: parse success vs input tokens.")
+    parser.add_argument("--variants", type=_list, default=list(PROMPT_VARIANTS))
+    parser.add_argument("--templates", type=_list, default=list(PROMPT_VARIANTS["full"]))
+    parser.add_argument("--topics", type=_list, default=preset_topics()[:3])
+    parser.add_argument("--difficulties", type=_list, default=[d.lower() for d in DIFFICULTIES])
+    parser.add_argument("--samples", type=int, default=3, help="Calls per prompt.")
+    parser.add_argument("--n", type=int, default=5, help="Batch size for batch templates.")
+    parser.add_argument("--min-success", type=float, default=0.95)
+    parser.add_argument("--fake", action="store_true", help="Use FakeChatModel (wiring check only).")
+    parser.add_argument("--output", default=None, help="JSON output path.")
+    parser.add_argument("--verbose", action="store_true", help="Keep application logging.")
+    args = parser.parse_args(argv)
+    if not args.verbose:
+        logging.disable(logging.CRITICAL)
+
+    llm = FakeChatModel(latency="fixed:0", malformed_rate=0.05) if args.fake else get_groq_llm()
+    calls = run(llm, args.variants, args.templates, args.topics, args.difficulties, args.samples, args.n)
+
+    report = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "tokenizer": TOKENIZER,
+        "config": {key: value for key, value in vars(args).items() if key not in ("output", "verbose")},
+        **summarise(calls, args.min_success),
+    }
+
+    for name, by_variant in report["by_template"].items():
+        for variant, stats in by_variant.items():
+            per_question = stats["input_tokens_per_valid_question"]
+            print(
+                f"{name:<17} {variant:<8} success={stats['parse_success_rate']:.0%} "
+                f"input={stats['mean_input_tokens']:.0f} tok/call "
+                f"input/valid q={'-' if per_question is None else f'{per_question:.0f}'}"
+            )
+    print(f"Recommended: {report['recommended_variant']}")
+
+    output = args.output or os.path.join(
+        "benchmarks", "results", f"prompt_variants_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {output}")
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,357 @@
+"""
+run_generation.py
+
+Offline throughput and overhead benchmark for question generation in the
+LLMOps StudyBuddy project.
+
+The Groq model is replaced by `FakeChatModel`, so no API key or network is
+needed. Two scenarios are measured:
+
+- generator : single-question calls to `QuestionGenerator.agenerate_mcq` /
+  `agenerate_fill_blank` at several concurrency levels
+- quiz      : whole quizzes through `QuizManager.generate_questions` for each
+  generation mode, quiz size and concurrency level
+
+For every run the report contains p50/p95/p99 latency, LLM calls per
+accepted question, and CPU time spent in parsing/validation and in duplicate
+checks. Results are written as JSON so runs can be compared.
+
+Usage
+-----
+Example:
+    python -m benchmarks.run_generation --sizes 5,10 --concurrency 1,4 \\
+        --latency lognormal:0.8:0.5 --malformed 0.05 --duplicates 0.1 \\
+        --rate-limits 0.02 --output benchmarks/results/baseline.json
+
+Notes
+-----
+- The rate limiter, model router and hedger are bypassed so the numbers
+  reflect the generator itself; the retry policy (backoff, retry budget) is
+  real, so injected 429s cost real waiting time.
+- The question bank and prefetch pool are not used.
+"""
+
+# --------------------------------------------------------------
+# Imports
+# --------------------------------------------------------------
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Sequence
+from unittest import mock
+
+from benchmarks.fake_llm import FakeChatModel
+from src.common.event_loop import run_coroutine
+from src.generator.question_generator import QuestionGenerator
+from src.utils.helpers import QuizManager
+
+TOPIC = "benchmark topic"
+
+
+# --------------------------------------------------------------
+# Measurement Helpers
+# --------------------------------------------------------------
+def percentiles(values: Sequence[float]) -> Dict[str, float]:
+    """Return p50/p95/p99, mean and max of `values` (zeros if empty)."""
+    if not values:
+        return {"p50": 0.0, "p95": 0.0, "p99": 0.0, "mean": 0.0, "max": 0.0}
+    ordered = sorted(values)
+
+    def pick(q: float) -> float:
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    return {
+        "p50": pick(0.50),
+        "p95": pick(0.95),
+        "p99": pick(0.99),
+        "mean": sum(ordered) / len(ordered),
+        "max": ordered[-1],
+    }
+
+
+class CpuTimer:
+    """
+    Accumulate the thread CPU time spent inside a wrapped callable.
+
+    `thread_time` is used so that concurrent calls on other threads (and
+    time spent sleeping) are not counted.
+    """
+
+    def __init__(self) -> None:
+        self.seconds = 0.0
+        self.calls = 0
+
+    def wrap(self, func: Callable[..., Any]) -> Callable[..., Any]:
+        """Return `func` instrumented with this timer."""
+
+        def timed(*args: Any, **kwargs: Any) -> Any:
+            started = time.thread_time()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.seconds += time.thread_time() - started
+                self.calls += 1
+
+        return timed
+
+    def report(self) -> Dict[str, float]:
+        """Return total and per-call CPU time in milliseconds."""
+        return {
+            "calls": self.calls,
+            "total_ms": self.seconds * 1000,
+            "per_call_ms": self.seconds * 1000 / self.calls if self.calls else 0.0,
+        }
+
+
+def build_generator(fake: FakeChatModel, parse_timer: CpuTimer) -> QuestionGenerator:
+    """Return a `QuestionGenerator` whose every call goes to `fake`."""
+    # Replace the Groq factory, so no API key or network is needed
+    with mock.patch("src.generator.question_generator.get_groq_llm", return_value=fake):
+        generator = QuestionGenerator()
+    generator.rate_limiter = None
+    generator.router = None
+    generator.hedger = None
+    generator._parse = parse_timer.wrap(generator._parse)
+    return generator
+
+
+# --------------------------------------------------------------
+# Scenarios
+# --------------------------------------------------------------
+def bench_generator(
+    fake: FakeChatModel,
+    question_type: str,
+    concurrency: int,
+    calls: int,
+) -> Dict[str, Any]:
+    """Time `calls` single-question generations with `concurrency` in flight."""
+    parse_timer = CpuTimer()
+    generator = build_generator(fake, parse_timer)
+    generate = (
+        generator.agenerate_mcq if question_type == "Multiple Choice" else generator.agenerate_fill_blank
+    )
+    fake.reset_stats()
+
+    latencies: List[float] = []
+    failures = 0
+
+    async def one(semaphore: asyncio.Semaphore) -> None:
+        nonlocal failures
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                await generate(TOPIC, "medium")
+            except Exception:
+                failures += 1
+                return
+            latencies.append(time.perf_counter() - started)
+
+    async def run_all() -> None:
+        semaphore = asyncio.Semaphore(concurrency)
+        await asyncio.gather(*(one(semaphore) for _ in range(calls)))
+
+    started = time.perf_counter()
+    run_coroutine(run_all())
+    wall = time.perf_counter() - started
+
+    llm_calls = fake.stats().get("calls", 0)
+    return {
+        "scenario": "generator",
+        "question_type": question_type,
+        "concurrency": concurrency,
+        "requests": calls,
+        "succeeded": len(latencies),
+        "failed": failures,
+        "wall_seconds": wall,
+        "questions_per_second": len(latencies) / wall if wall else 0.0,
+        "latency_seconds": percentiles(latencies),
+        "llm_calls": llm_calls,
+        "calls_per_accepted_question": llm_calls / len(latencies) if latencies else None,
+        "parse_validate_cpu": parse_timer.report(),
+        "injected": fake.stats(),
+    }
+
+
+def bench_quiz(
+    fake: FakeChatModel,
+    question_type: str,
+    mode: str,
+    size: int,
+    concurrency: int,
+    quizzes: int,
+) -> Dict[str, Any]:
+    """Time `quizzes` quizzes of `size` questions through `QuizManager`."""
+    parse_timer = CpuTimer()
+    dedupe_timer = CpuTimer()
+    generator = build_generator(fake, parse_timer)
+    fake.reset_stats()
+
+    latencies: List[float] = []
+    accepted = 0
+    failed = 0
+
+    for _ in range(quizzes):
+        # A fresh manager per quiz, like a new session
+        manager = QuizManager()
+        manager._accept = dedupe_timer.wrap(manager._accept)
+
+        started = time.perf_counter()
+        ok = manager.generate_questions(
+            generator,
+            TOPIC,
+            question_type,
+            "medium",
+            size,
+            mode=mode,
+            max_concurrency=concurrency,
+        )
+        latencies.append(time.perf_counter() - started)
+        accepted += len(manager.questions)
+        failed += 0 if ok else 1
+
+    llm_calls = fake.stats().get("calls", 0)
+    return {
+        "scenario": "quiz",
+        "question_type": question_type,
+        "mode": mode,
+        "quiz_size": size,
+        "concurrency": concurrency,
+        "quizzes": quizzes,
+        "failed_quizzes": failed,
+        "accepted_questions": accepted,
+        "shortfall": size * quizzes - accepted,
+        "latency_seconds": percentiles(latencies),
+        "llm_calls": llm_calls,
+        "calls_per_accepted_question": llm_calls / accepted if accepted else None,
+        "parse_validate_cpu": parse_timer.report(),
+        "dedupe_cpu": dedupe_timer.report(),
+        "injected": fake.stats(),
+    }
+
+
+# --------------------------------------------------------------
+# Reporting
+# --------------------------------------------------------------
+def _git_revision() -> str | None:
+    """Return the current git commit, if available."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _summary_line(result: Dict[str, Any]) -> str:
+    """Format one result as a console line."""
+    latency = result["latency_seconds"]
+    calls = result["calls_per_accepted_question"]
+    label = (
+        f"generator c={result['concurrency']}"
+        if result["scenario"] == "generator"
+        else f"quiz {result['mode']:<10} n={result['quiz_size']:<3} c={result['concurrency']}"
+    )
+    return (
+        f"{label:<34} p50={latency['p50']:.3f}s p95={latency['p95']:.3f}s "
+        f"p99={latency['p99']:.3f}s calls/q={calls if calls is None else f'{calls:.2f}'} "
+        f"parse={result['parse_validate_cpu']['per_call_ms']:.3f}ms/call"
+    )
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(item) for item in value.split(",") if item]
+
+
+def _str_list(value: str) -> List[str]:
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
+    """Parse command-line options."""
+    parser = argparse.ArgumentParser(description="Offline StudyBuddy generation benchmark.")
+    parser.add_argument("--question-type", default="Multiple Choice",
+                        choices=["Multiple Choice", "Fill in the Blank"])
+    parser.add_argument("--scenarios", type=_str_list, default=["generator", "quiz"])
+    parser.add_argument("--modes", type=_str_list, default=["sequential", "concurrent", "batch"])
+    parser.add_argument("--sizes", type=_int_list, default=[5, 10])
+    parser.add_argument("--concurrency", type=_int_list, default=[1, 4])
+    parser.add_argument("--calls", type=int, default=40,
+                        help="Single-question calls per generator run.")
+    parser.add_argument("--quizzes", type=int, default=5, help="Quizzes per quiz run.")
+    parser.add_argument("--latency", default="lognormal:0.3:0.5",
+                        help="fixed:S, uniform:LO:HI or lognormal:MEDIAN:SIGMA (seconds).")
+    parser.add_argument("--malformed", type=float, default=0.05)
+    parser.add_argument("--duplicates", type=float, default=0.1)
+    parser.add_argument("--rate-limits", type=float, default=0.0, help="Fraction of calls failing with 429.")
+    parser.add_argument("--retry-after", type=float, default=0.5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="JSON output path.")
+    parser.add_argument("--verbose", action="store_true", help="Keep application logging.")
+    return parser.parse_args(argv)
+
+
+def main(argv: Sequence[str] | None = None) -> Dict[str, Any]:
+    """Run the configured benchmarks and write the JSON report."""
+    args = parse_args(argv)
+    if not args.verbose:
+        logging.disable(logging.CRITICAL)
+
+    fake = FakeChatModel(
+        latency=args.latency,
+        malformed_rate=args.malformed,
+        duplicate_rate=args.duplicates,
+        rate_limit_rate=args.rate_limits,
+        retry_after=args.retry_after,
+        seed=args.seed,
+    )
+
+    results: List[Dict[str, Any]] = []
+    if "generator" in args.scenarios:
+        for concurrency in args.concurrency:
+            results.append(bench_generator(fake, args.question_type, concurrency, args.calls))
+            print(_summary_line(results[-1]))
+
+    if "quiz" in args.scenarios:
+        for mode in args.modes:
+            # Concurrency only changes anything in concurrent mode
+            levels = args.concurrency if mode == "concurrent" else [1]
+            for size in args.sizes:
+                for concurrency in levels:
+                    results.append(
+                        bench_quiz(fake, args.question_type, mode, size, concurrency, args.quizzes)
+                    )
+                    print(_summary_line(results[-1]))
+
+    report = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "git_revision": _git_revision(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "config": {key: value for key, value in vars(args).items() if key not in ("output", "verbose")},
+        "results": results,
+    }
+
+    output = args.output or os.path.join(
+        "benchmarks", "results", f"generation_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {output}")
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+event_loop.py
+-------------
+Process-wide asyncio event loop for the LLMOps StudyBuddy project.
+
+Streamlit executes each script run in its own worker thread, none of which
+owns a running event loop. Rather than creating and tearing down a loop for
+every quiz (and losing any loop-bound resources in the process), this module
+keeps a single daemon thread running one event loop for the lifetime of the
+process. Synchronous code submits coroutines to it and waits on the result.
+
+Usage
+-----
+Example:
+    from src.common.event_loop import run_coroutine
+
+    questions = run_coroutine(generator.agenerate_mcq("algebra", "easy"))
+
+Notes
+-----
+- The loop thread is started lazily on first use and is a daemon thread.
+- If the waiting thread is interrupted (e.g. by a Streamlit rerun), the
+  submitted coroutine is cancelled rather than left running in the background.
+- `run_coroutine` must not be called from the loop's own thread (it would
+  wait forever for work that can never run); it raises instead. Code that
+  may run there checks `in_loop_thread()` first.
+"""
+
+from __future__ import annotations
+
+# -------------------------------------------------------------------
+# Standard Library Imports
+# -------------------------------------------------------------------
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Coroutine, Optional, TypeVar
+
+T = TypeVar("T")
+
+# -------------------------------------------------------------------
+# Module State
+# -------------------------------------------------------------------
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+
+
+# -------------------------------------------------------------------
+# Loop Management
+# -------------------------------------------------------------------
+def get_event_loop() -> asyncio.AbstractEventLoop:
+    """
+    Return the shared background event loop, starting it if necessary.
+
+    Returns
+    -------
+    asyncio.AbstractEventLoop
+        A running event loop owned by a daemon thread.
+    """
+    global _loop
+
+    # Fast path: loop already running
+    if _loop is not None and _loop.is_running():
+        return _loop
+
+    with _loop_lock:
+        if _loop is None or not _loop.is_running():
+            loop = asyncio.new_event_loop()
+            started = threading.Event()
+
+            def _run() -> None:
+                asyncio.set_event_loop(loop)
+                loop.call_soon(started.set)
+                loop.run_forever()
+
+            thread = threading.Thread(
+                target=_run,
+                name="studybuddy-event-loop",
+                daemon=True,
+            )
+            thread.start()
+            started.wait()
+            _loop = loop
+
+    return _loop
+
+
+def in_loop_thread() -> bool:
+    """Return True if the caller is running on the shared loop's thread."""
+    try:
+        return asyncio.get_running_loop() is _loop
+    except RuntimeError:
+        return False
+
+
+def submit_coroutine(coro: Coroutine[Any, Any, T]) -> "Future[T]":
+    """
+    Schedule a coroutine on the shared loop without waiting for it.
+
+    Parameters
+    ----------
+    coro : Coroutine
+        The coroutine to schedule.
+
+    Returns
+    -------
+    concurrent.futures.Future
+        A thread-safe future resolving to the coroutine's result.
+    """
+    return asyncio.run_coroutine_threadsafe(coro, get_event_loop())
+
+
+def run_coroutine(coro: Coroutine[Any, Any, T], timeout: Optional[float] = None) -> T:
+    """
+    Run a coroutine on the shared loop and block until it completes.
+
+    Parameters
+    ----------
+    coro : Coroutine
+        The coroutine to run.
+    timeout : float, optional
+        Maximum number of seconds to wait, by default no limit.
+
+    Returns
+    -------
+    T
+        The coroutine's return value.
+
+    Raises
+    ------
+    RuntimeError
+        If called from the shared loop's thread, where waiting would deadlock.
+    Exception
+        Any exception raised by the coroutine is re-raised in the caller.
+    """
+    if in_loop_thread():
+        coro.close()
+        raise RuntimeError(
+            "run_coroutine() called on the shared event loop thread; await the coroutine instead."
+        )
+    future = submit_coroutine(coro)
+    try:
+        return future.result(timeout=timeout)
+    except BaseException:
+        # Caller gave up (error, timeout or interruption) -> stop the work
+        future.cancel()
+        raise
@@ -23,7 +23,8 @@ Example:
 
 Notes
 -----
-- Logs are written to `logs/log_YYYY-MM-DD.log` (UTF-8 encoded)
+- Logs are written to `logs/log_YYYY-MM-DD.log` (UTF-8 encoded); the
+  directory is created when the first logger is configured, not on import
 - Each message includes a timestamp and severity level.
 - Default level: INFO
 - Console and file outputs both support Unicode characters.
@@ -41,7 +42,6 @@ from datetime import datetime
 # Directory Setup
 # -------------------------------------------------------------------
 LOGS_DIR = "logs"
-os.makedirs(LOGS_DIR, exist_ok=True)
 
 # -------------------------------------------------------------------
 # Log File Configuration
@@ -74,6 +74,7 @@ def get_logger(name: str) -> logging.Logger:
         # -------------------------------------------------------------------
         # File Handler (UTF-8)
         # -------------------------------------------------------------------
+        os.makedirs(LOGS_DIR, exist_ok=True)
         file_handler = logging.FileHandler(LOG_FILE, encoding="utf-8")
         file_handler.setLevel(logging.INFO)
 
@@ -0,0 +1,243 @@
+"""
+metrics.py
+----------
+Prometheus metrics for the LLMOps StudyBuddy generation pipeline.
+
+Log lines are hard to turn into SLOs or autoscaling signals. This module
+defines the pipeline's counters and histograms in one place and serves them
+over HTTP (`/metrics`) from a daemon thread next to the Streamlit server:
+
+- `llm_latency` / `llm_tokens` / `llm_inflight`: every Groq call, per model
+  (recorded by a callback attached in `src.llm.groq_client`)
+- `generation_attempts` / `generation_failures` / `parse_outcomes`: attempts
+  per generation call, failures per class and parse outcomes per output mode
+  (recorded by `QuestionGenerator`)
+- `duplicate_rejections`: questions rejected as duplicates, per retry arm
+- `questions_served` / `quiz_questions`: questions handed to users, by
+  source, and questions per quiz (recorded by `QuizManager`)
+- `results_rows_written` / `results_rows_dropped`: saved answers written
+  to the results store, and rows it rejected (recorded by
+  `src.storage.results_store`)
+- `render_cpu_seconds`: CPU time per Streamlit script or fragment run, by
+  scope (recorded by `src.utils.render_stats`)
+- `sessions_active` / `sessions_evicted` / `session_memory_bytes`: live
+  sessions, idle sessions released, and measured session memory (recorded
+  by `src.utils.session_registry`)
+
+Usage
+-----
+Example:
+    from src.common import metrics
+
+    metrics.generation_failures.labels(failure="parse_error").inc()
+    metrics.start_metrics_server()
+
+Notes
+-----
+- `prometheus_client` is optional. Without it (or with METRICS_ENABLED=false)
+  every metric is a no-op, so instrumented code never needs to check.
+- Metrics are per process; Prometheus aggregates across pods.
+"""
+
+from __future__ import annotations
+
+# -------------------------------------------------------------------
+# Standard Library Imports
+# -------------------------------------------------------------------
+import threading
+from typing import Any, Optional, Sequence
+
+# -------------------------------------------------------------------
+# Internal Imports
+# -------------------------------------------------------------------
+from src.common.logger import get_logger
+from src.config.settings import settings
+
+try:
+    import prometheus_client
+except ImportError:  # pragma: no cover - optional dependency
+    prometheus_client = None
+
+logger = get_logger(__name__)
+
+# Latency buckets (seconds) sized for chat completions
+_LATENCY_BUCKETS = (0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 16.0, 32.0, 64.0)
+
+
+# -------------------------------------------------------------------
+# Metric Factory
+# -------------------------------------------------------------------
+class _NoopMetric:
+    """Stand-in used when Prometheus export is unavailable or disabled."""
+
+    def labels(self, *args: Any, **kwargs: Any) -> "_NoopMetric":
+        return self
+
+    def inc(self, amount: float = 1) -> None:
+        pass
+
+    def dec(self, amount: float = 1) -> None:
+        pass
+
+    def set(self, value: float) -> None:
+        pass
+
+    def observe(self, value: float) -> None:
+        pass
+
+
+def _enabled() -> bool:
+    """True if metrics should be recorded and exported."""
+    return settings.METRICS_ENABLED and prometheus_client is not None
+
+
+def _metric(kind: str, name: str, documentation: str, labels: Sequence[str] = (), **kwargs: Any):
+    """Create a Prometheus metric of `kind` ('Counter', 'Gauge', 'Histogram'), or a no-op."""
+    if not _enabled():
+        return _NoopMetric()
+    return getattr(prometheus_client, kind)(name, documentation, list(labels), **kwargs)
+
+
+# -------------------------------------------------------------------
+# LLM Calls
+# -------------------------------------------------------------------
+llm_latency = _metric(
+    "Histogram",
+    "studybuddy_llm_latency_seconds",
+    "Latency of Groq chat completions.",
+    ["model", "outcome"],
+    buckets=_LATENCY_BUCKETS,
+)
+llm_tokens = _metric(
+    "Counter",
+    "studybuddy_llm_tokens_total",
+    "Tokens reported by Groq, by direction (input/output).",
+    ["model", "direction"],
+)
+llm_inflight = _metric(
+    "Gauge",
+    "studybuddy_llm_inflight_requests",
+    "Groq requests currently in flight.",
+    ["model"],
+)
+
+# -------------------------------------------------------------------
+# Generation
+# -------------------------------------------------------------------
+generation_attempts = _metric(
+    "Histogram",
+    "studybuddy_generation_attempts",
+    "Attempts used per generation call (one question or one batch).",
+    ["outcome"],
+    buckets=(1, 2, 3, 4, 5, 8),
+)
+parse_outcomes = _metric(
+    "Counter",
+    "studybuddy_parse_outcomes_total",
+    "Parse outcomes per output mode (structured/text): ok, fallback or failed.",
+    ["mode", "outcome"],
+)
+generation_failures = _metric(
+    "Counter",
+    "studybuddy_generation_failures_total",
+    "Failed generation attempts by failure class (parse_error, rate_limit, ...).",
+    ["failure"],
+)
+
+# -------------------------------------------------------------------
+# Quizzes
+# -------------------------------------------------------------------
+duplicate_rejections = _metric(
+    "Counter",
+    "studybuddy_duplicate_rejections_total",
+    "Generated questions rejected as duplicates, by retry arm.",
+    ["arm"],
+)
+questions_served = _metric(
+    "Counter",
+    "studybuddy_questions_served_total",
+    "Questions added to quizzes, by kind and source (generated/cached).",
+    ["kind", "source"],
+)
+quiz_questions = _metric(
+    "Histogram",
+    "studybuddy_quiz_questions",
+    "Questions served per quiz.",
+    buckets=(1, 2, 3, 5, 8, 10, 15, 20),
+)
+results_rows_written = _metric(
+    "Counter",
+    "studybuddy_results_rows_written_total",
+    "Saved quiz answers written to the results store.",
+)
+results_rows_dropped = _metric(
+    "Counter",
+    "studybuddy_results_rows_dropped_total",
+    "Saved quiz answers the results store rejected and dropped.",
+)
+
+# -------------------------------------------------------------------
+# UI
+# -------------------------------------------------------------------
+render_cpu_seconds = _metric(
+    "Histogram",
+    "studybuddy_render_cpu_seconds",
+    "CPU time per Streamlit run, by scope (app, quiz fragment, results fragment).",
+    ["scope"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+sessions_active = _metric(
+    "Gauge",
+    "studybuddy_sessions_active",
+    "Sessions that ran within the idle timeout (as of the last sweep).",
+)
+sessions_evicted = _metric(
+    "Counter",
+    "studybuddy_sessions_evicted_total",
+    "Sessions whose quiz state was released after inactivity.",
+)
+session_memory_bytes = _metric(
+    "Gauge",
+    "studybuddy_session_memory_bytes",
+    "Quiz state held by all sessions (shared questions counted once), as last measured.",
+)
+
+
+# -------------------------------------------------------------------
+# HTTP Exporter
+# -------------------------------------------------------------------
+_server_started = False
+_server_lock = threading.Lock()
+
+
+def start_metrics_server(port: Optional[int] = None) -> bool:
+    """
+    Serve `/metrics` from a daemon thread (once per process).
+
+    Parameters
+    ----------
+    port : int, optional
+        Port to listen on. Defaults to `settings.METRICS_PORT`.
+
+    Returns
+    -------
+    bool
+        True if the exporter is running.
+    """
+    global _server_started
+
+    if not _enabled():
+        return False
+
+    with _server_lock:
+        if not _server_started:
+            port = port or settings.METRICS_PORT
+            try:
+                prometheus_client.start_http_server(port)
+            except OSError as exc:
+                # e.g. port already taken; the app keeps working without export
+                logger.error(f"Could not start metrics server on port {port}: {exc}")
+                return False
+            _server_started = True
+            logger.info(f"Serving Prometheus metrics on port {port}.")
+        return True
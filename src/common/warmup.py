@@ -0,0 +1,106 @@
+"""
+warmup.py
+---------
+Background preloading of heavy modules for the LLMOps StudyBuddy project.
+
+The app imports LangChain and the Groq client lazily, so a pod becomes
+ready (and the first page renders) without paying for them. This module
+pays that cost once per process on a daemon thread right after startup, so
+the first "Generate Quiz" click normally finds everything already imported.
+pandas is left out: it is only needed for CSV export.
+
+Usage
+-----
+Example:
+    from src.common.warmup import start_warmup
+
+    start_warmup()  # returns immediately; safe to call repeatedly
+
+Notes
+-----
+- Imports are idempotent and guarded by Python's per-module import locks,
+  so a request that needs a module before the warm-up reaches it simply
+  imports it itself (or waits for the in-flight import).
+- A module that fails to import is logged and skipped; the real import
+  site reports the error to the user.
+"""
+
+from __future__ import annotations
+
+# -------------------------------------------------------------------
+# Standard Library Imports
+# -------------------------------------------------------------------
+import importlib
+import threading
+import time
+from typing import Dict, Optional, Sequence
+
+# -------------------------------------------------------------------
+# Internal Imports
+# -------------------------------------------------------------------
+from src.common.logger import get_logger
+from src.config.settings import settings
+
+logger = get_logger(__name__)
+
+# Modules preloaded in the background, heaviest first
+WARMUP_MODULES = (
+    "src.generator.question_generator",
+    "src.generator.coalescing",
+    "src.generator.prefetch",
+)
+
+_lock = threading.Lock()
+_thread: Optional[threading.Thread] = None
+_timings: Dict[str, float] = {}
+
+
+# -------------------------------------------------------------------
+# Warm-up
+# -------------------------------------------------------------------
+def _run(modules: Sequence[str]) -> None:
+    """Import each module, recording how long it took."""
+    started = time.perf_counter()
+    for name in modules:
+        module_started = time.perf_counter()
+        try:
+            importlib.import_module(name)
+        except Exception as exc:
+            logger.warning(f"Warm-up could not import {name}: {exc}")
+            continue
+        _timings[name] = time.perf_counter() - module_started
+    logger.info(f"Warm-up finished in {time.perf_counter() - started:.2f}s ({warmup_stats()['modules']}).")
+
+
+def start_warmup(modules: Sequence[str] = WARMUP_MODULES) -> bool:
+    """
+    Start preloading `modules` on a daemon thread (once per process).
+
+    Parameters
+    ----------
+    modules : sequence of str, optional
+        Dotted module names to import. Defaults to `WARMUP_MODULES`.
+
+    Returns
+    -------
+    bool
+        True if a warm-up is running or has run.
+    """
+    global _thread
+
+    if not settings.WARMUP_ENABLED:
+        return False
+
+    with _lock:
+        if _thread is None:
+            _thread = threading.Thread(target=_run, args=(tuple(modules),), name="warmup", daemon=True)
+            _thread.start()
+    return True
+
+
+def warmup_stats() -> Dict[str, object]:
+    """Return whether the warm-up finished and the seconds spent per module."""
+    return {
+        "done": _thread is not None and not _thread.is_alive(),
+        "modules": {name: round(seconds, 3) for name, seconds in _timings.items()},
+    }
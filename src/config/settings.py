@@ -6,16 +6,54 @@ Configuration module for the LLMOps StudyBuddy project.
 This file loads environment variables and defines project-wide settings 
 such as API keys, model configuration, retry limits, and other parameters 
 required across pipelines, utilities, and application layers.
+
+The `.env` file is read from the project root only if it exists, so
+containers configured through real environment variables skip the
+`python-dotenv` import and its directory search entirely.
 """
 
 # --------------------------------------------------------------
 # Imports
 # --------------------------------------------------------------
+import json
 import os
-from dotenv import load_dotenv
+
+# Project-root .env file (two levels above src/config/)
+_ENV_FILE = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), ".env"
+)
 
 # Load environment variables from the .env file
-load_dotenv()
+if os.path.isfile(_ENV_FILE):
+    from dotenv import load_dotenv
+
+    load_dotenv(_ENV_FILE)
+
+
+def _json_object_env(name: str) -> dict:
+    """
+    Read a JSON object of strings from environment variable `name` ({} if unset).
+
+    A malformed value is logged and ignored, so a typo in the deployment
+    configuration falls back to the defaults instead of failing every import.
+    """
+    raw = os.getenv(name, "").strip()
+    if not raw:
+        return {}
+    try:
+        value = json.loads(raw)
+    except json.JSONDecodeError as exc:
+        problem = f"is not valid JSON ({exc})"
+    else:
+        if isinstance(value, dict) and all(isinstance(item, str) for item in value.values()):
+            return value
+        problem = "must be a JSON object of strings"
+
+    # Imported here: settings is imported everywhere, the logger rarely needed
+    from src.common.logger import get_logger
+
+    get_logger(__name__).warning(f"Ignoring {name}: it {problem}. Using the defaults.")
+    return {}
 
 
 class Settings:
@@ -36,8 +74,90 @@ class Settings:
     TEMPERATURE : float
         Sampling temperature controlling creativity and variability 
         in generated outputs.
+    MODEL_ROUTING_ENABLED : bool
+        Whether requests are routed between model tiers.
+    MODEL_TIERS : dict
+        Tier name to Groq model name.
+    MODEL_ROUTES : dict
+        '<kind>:<difficulty>' to tier routing table.
     MAX_RETRIES : int
-        Maximum number of retry attempts when calling external services.
+        Maximum number of attempts per generation when calling external services.
+    RETRY_BASE_DELAY : float
+        Base delay (seconds) for exponential backoff on transient errors.
+    RETRY_MAX_DELAY : float
+        Upper bound (seconds) on a single backoff delay.
+    RETRY_BUDGET_RATIO : float
+        Process-wide retries allowed per first attempt.
+    GENERATION_MODE : str
+        How `QuizManager` generates a quiz: 'sequential', 'concurrent' or 'batch'.
+    MAX_CONCURRENCY : int
+        Maximum number of in-flight LLM requests per quiz in concurrent mode.
+    PROGRESSIVE_RENDERING : bool
+        Whether the app previews each question as soon as it is generated.
+    QUESTION_BANK_ENABLED : bool
+        Whether quizzes are served from the persistent question bank first.
+    QUESTION_BANK_PATH : str
+        Location of the SQLite question bank.
+    QUESTION_BANK_MAX_ROWS : int
+        Maximum number of stored questions before LRU eviction.
+    RESULTS_BACKEND : str
+        Where saved results go: 'sqlite' (append-only store) or 'csv'
+        (legacy timestamped files under `results/`).
+    RESULTS_STORE_PATH : str
+        Location of the SQLite results store.
+    PREFETCH_ENABLED : bool
+        Whether a background worker keeps questions ready for preset topics.
+    PREFETCH_LOW_WATER : int
+        Buffer size below which the prefetch worker refills a preset.
+    PREFETCH_HIGH_WATER : int
+        Buffer size the prefetch worker refills up to.
+    RATE_LIMIT_ENABLED : bool
+        Whether LLM calls queue for Groq RPM/TPM quota.
+    GROQ_REQUESTS_PER_MINUTE : int
+        Requests-per-minute quota enforced by the rate limiter.
+    GROQ_TOKENS_PER_MINUTE : int
+        Tokens-per-minute quota enforced by the rate limiter.
+    RATE_LIMIT_BACKEND : str
+        Rate limiter state backend: 'memory' or 'redis'.
+    HEDGING_ENABLED : bool
+        Whether slow LLM calls are hedged with a second identical call.
+    HEDGE_PERCENTILE : float
+        Latency quantile after which a hedge is sent.
+    METRICS_ENABLED : bool
+        Whether Prometheus metrics are recorded and exported.
+    METRICS_PORT : int
+        Port of the `/metrics` HTTP endpoint.
+    PROMPT_VARIANT : str
+        Prompt template variant: 'full' or 'compact'.
+    STRUCTURED_OUTPUT_METHOD : str
+        Provider-native structured output: 'off', 'function_calling',
+        'json_mode' or 'json_schema'.
+    LLM_CASSETTE_MODE : str
+        LLM call logging/replay: 'off', 'record' or 'replay'.
+    LLM_CASSETTE_PATH : str
+        JSONL call log used by record and replay modes.
+    COALESCING_ENABLED : bool
+        Whether identical concurrent requests share one batched LLM call.
+    COALESCE_WINDOW_SECONDS : float
+        How long a coalesced flight waits for other callers to join.
+    COALESCE_RESULT_TIMEOUT : float
+        Longest a caller waits for its share of a flight before giving up.
+    WARMUP_ENABLED : bool
+        Whether heavy modules are preloaded in the background at startup.
+    RENDER_STATS_PANEL : bool
+        Whether the sidebar shows the session's rerun counts and CPU time.
+    SESSION_IDLE_SECONDS : float
+        Inactivity after which a session's quiz state is released.
+    SESSION_MEMORY_PANEL : bool
+        Whether the sidebar shows bytes per session and total session memory.
+    SIMILARITY_INDEX : str
+        Duplicate detection index: 'minhash' or 'exact'.
+    SIMILARITY_THRESHOLD : float
+        Similarity at which two questions are treated as duplicates.
+    AVOID_PROMPTING_ENABLED : bool
+        Whether duplicate retries list existing questions in the prompt.
+    AVOID_TOKEN_BUDGET : int
+        Approximate token cap on that avoid list.
     """
 
     # ----------------------------------------------------------
@@ -57,6 +177,42 @@ class Settings:
     # Degree of randomness in the model's output generation
     TEMPERATURE: float = 0.9
 
+    # ----------------------------------------------------------
+    # Model routing (cheap tier first, escalate on bad output)
+    # ----------------------------------------------------------
+
+    # Route requests to model tiers by question type and difficulty (opt-in:
+    # it moves Easy traffic to a smaller model)
+    MODEL_ROUTING_ENABLED: bool = os.getenv("MODEL_ROUTING_ENABLED", "false").lower() == "true"
+
+    # Tier name -> Groq model
+    MODEL_TIERS: dict = {
+        "small": os.getenv("SMALL_MODEL_NAME", "llama-3.1-8b-instant"),
+        "large": MODEL_NAME,
+    }
+
+    # Escalation order, cheapest first
+    MODEL_TIER_ORDER: list = ["small", "large"]
+
+    # '<kind>:<difficulty>' -> tier; '*' matches any kind. Override with a
+    # JSON object in MODEL_ROUTES, e.g. '{"mcq:medium": "small"}' (a malformed
+    # value is logged and ignored)
+    MODEL_ROUTES: dict = {
+        "*:easy": "small",
+        "*:medium": "large",
+        "*:hard": "large",
+        **_json_object_env("MODEL_ROUTES"),
+    }
+
+    # Under pressure (long limiter queue or slow large tier), route every
+    # difficulty except these to the cheapest tier. Latency is the p50 per
+    # requested question over samples younger than the max age (seconds)
+    MODEL_PRESSURE_QUEUE_DEPTH: int = 5
+    MODEL_PRESSURE_LATENCY_P50: float = 4.0
+    MODEL_PRESSURE_SAMPLE_MAX_AGE: float = 120.0
+    MODEL_PRESSURE_MIN_SAMPLES: int = 5
+    MODEL_PRESSURE_PROTECTED: tuple = ("hard",)
+
     # ----------------------------------------------------------
     # Operational parameters
     # ----------------------------------------------------------
@@ -64,6 +220,225 @@ class Settings:
     # Number of retry attempts before raising a failure
     MAX_RETRIES: int = 3
 
+    # Exponential backoff (with full jitter) for rate limits, timeouts and 5xx
+    RETRY_BASE_DELAY: float = 0.5
+    RETRY_MAX_DELAY: float = 20.0
+
+    # Retry budget: retries may add at most this fraction of extra requests,
+    # plus a small per-second allowance, up to a burst capacity
+    RETRY_BUDGET_RATIO: float = 0.2
+    RETRY_BUDGET_MIN_PER_SECOND: float = 1.0
+    RETRY_BUDGET_MAX_TOKENS: float = 50.0
+
+    # Retries performed inside the Groq SDK itself; kept at 0 so that the
+    # application's retry policy is the only place retries happen
+    LLM_CLIENT_MAX_RETRIES: int = 0
+
+    # ----------------------------------------------------------
+    # LLM HTTP connection pool (shared by all sessions in a process)
+    # ----------------------------------------------------------
+
+    # Maximum open connections, and how many idle ones to keep alive
+    LLM_POOL_MAX_CONNECTIONS: int = int(os.getenv("LLM_POOL_MAX_CONNECTIONS", "20"))
+    LLM_POOL_MAX_KEEPALIVE: int = int(os.getenv("LLM_POOL_MAX_KEEPALIVE", "10"))
+
+    # Seconds an idle keep-alive connection is retained
+    LLM_POOL_KEEPALIVE_EXPIRY: float = 60.0
+
+    # Connect and overall request timeouts (seconds)
+    LLM_CONNECT_TIMEOUT: float = 5.0
+    LLM_READ_TIMEOUT: float = 60.0
+
+    # ----------------------------------------------------------
+    # Groq quota (rate limiting)
+    # ----------------------------------------------------------
+
+    # Queue LLM calls so they stay within the RPM/TPM quota
+    RATE_LIMIT_ENABLED: bool = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+
+    # Quota enforced by the limiter. With the 'memory' backend each pod
+    # enforces these on its own, so set them to the pod's share of the quota
+    GROQ_REQUESTS_PER_MINUTE: int = int(os.getenv("GROQ_REQUESTS_PER_MINUTE", "30"))
+    GROQ_TOKENS_PER_MINUTE: int = int(os.getenv("GROQ_TOKENS_PER_MINUTE", "12000"))
+
+    # Where bucket state lives: 'memory' (per process) or 'redis' (shared by all pods)
+    RATE_LIMIT_BACKEND: str = os.getenv("RATE_LIMIT_BACKEND", "memory")
+    RATE_LIMIT_REDIS_URL: str = os.getenv("RATE_LIMIT_REDIS_URL", "redis://localhost:6379/0")
+
+    # Longest a call may queue for quota before it counts as a timeout
+    RATE_LIMIT_MAX_WAIT: float = 60.0
+
+    # Expected completion size per generated question, used in token estimates
+    RATE_LIMIT_OUTPUT_TOKENS_PER_QUESTION: int = 250
+
+    # ----------------------------------------------------------
+    # Hedged requests (tail latency)
+    # ----------------------------------------------------------
+
+    # Send a second identical call when the first is slower than usual (opt-in)
+    HEDGING_ENABLED: bool = os.getenv("HEDGING_ENABLED", "false").lower() == "true"
+
+    # Hedge once a call exceeds this quantile of recent latencies for its tier,
+    # after enough samples, and never earlier than the minimum delay (seconds)
+    HEDGE_PERCENTILE: float = float(os.getenv("HEDGE_PERCENTILE", "0.95"))
+    HEDGE_MIN_SAMPLES: int = 20
+    HEDGE_MIN_DELAY: float = 0.5
+
+    # Hedges allowed per primary call (0.1 -> at most 10% extra requests)
+    HEDGE_MAX_FRACTION: float = 0.1
+
+    # ----------------------------------------------------------
+    # Observability (Prometheus)
+    # ----------------------------------------------------------
+
+    # Record pipeline metrics and serve them on http://<pod>:METRICS_PORT/metrics
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+    METRICS_PORT: int = int(os.getenv("METRICS_PORT", "9100"))
+
+    # ----------------------------------------------------------
+    # LLM call log (record/replay)
+    # ----------------------------------------------------------
+
+    # 'record' appends every LLM call to the log; 'replay' serves responses
+    # from it instead of calling Groq (no network or API key needed)
+    LLM_CASSETTE_MODE: str = os.getenv("LLM_CASSETTE_MODE", "off").lower()
+    LLM_CASSETTE_PATH: str = os.getenv("LLM_CASSETTE_PATH", "logs/llm_calls.jsonl")
+
+    # Replay each call's recorded latency (divided by the speed factor)
+    LLM_CASSETTE_SIMULATE_LATENCY: bool = (
+        os.getenv("LLM_CASSETTE_SIMULATE_LATENCY", "false").lower() == "true"
+    )
+    LLM_CASSETTE_SPEED: float = float(os.getenv("LLM_CASSETTE_SPEED", "1.0"))
+
+    # ----------------------------------------------------------
+    # Request coalescing (single-flight)
+    # ----------------------------------------------------------
+
+    # Share LLM calls between identical concurrent quiz requests
+    COALESCING_ENABLED: bool = os.getenv("COALESCING_ENABLED", "true").lower() == "true"
+
+    # How long a flight waits for other callers to join (seconds)
+    COALESCE_WINDOW_SECONDS: float = float(os.getenv("COALESCE_WINDOW_SECONDS", "0.05"))
+
+    # Most questions requested by one flight, and flights run at the same time
+    COALESCE_MAX_BATCH: int = 10
+    COALESCE_MAX_FLIGHTS: int = 8
+
+    # Longest a caller waits for its share: queueing for quota plus one read
+    # timeout per attempt, so a wedged flight cannot hang a session forever
+    COALESCE_RESULT_TIMEOUT: float = float(
+        os.getenv("COALESCE_RESULT_TIMEOUT", str(RATE_LIMIT_MAX_WAIT + LLM_READ_TIMEOUT * (MAX_RETRIES + 1)))
+    )
+
+    # ----------------------------------------------------------
+    # Duplicate detection
+    # ----------------------------------------------------------
+
+    # Duplicate index: 'minhash' (near-duplicates) or 'exact' (text match only)
+    SIMILARITY_INDEX: str = os.getenv("SIMILARITY_INDEX", "minhash")
+
+    # Word-set similarity at which two questions count as duplicates, and the
+    # lower similarity that suffices when both have the same answer
+    SIMILARITY_THRESHOLD: float = float(os.getenv("SIMILARITY_THRESHOLD", "0.7"))
+    SIMILARITY_ANSWER_THRESHOLD: float = 0.4
+
+    # Steer duplicate retries away from existing questions via the prompt
+    AVOID_PROMPTING_ENABLED: bool = os.getenv("AVOID_PROMPTING_ENABLED", "true").lower() == "true"
+
+    # Maximum size (approximate tokens) of the avoid list added to a prompt
+    AVOID_TOKEN_BUDGET: int = int(os.getenv("AVOID_TOKEN_BUDGET", "200"))
+
+    # Prompt templates: 'full' (long instructions + example) or 'compact'
+    # (same JSON contract, far fewer input tokens)
+    PROMPT_VARIANT: str = os.getenv("PROMPT_VARIANT", "full")
+
+    # Ask the provider for schema-conforming output instead of parsing free
+    # text: 'off', 'function_calling', 'json_mode' or 'json_schema'
+    STRUCTURED_OUTPUT_METHOD: str = os.getenv("STRUCTURED_OUTPUT_METHOD", "off").lower()
+
+    # ----------------------------------------------------------
+    # Quiz generation parameters
+    # ----------------------------------------------------------
+
+    # Default quiz generation strategy ('sequential', 'concurrent' or 'batch')
+    GENERATION_MODE: str = os.getenv("GENERATION_MODE", "concurrent")
+
+    # Upper bound on simultaneous LLM calls for a single quiz
+    MAX_CONCURRENCY: int = int(os.getenv("MAX_CONCURRENCY", "5"))
+
+    # Render questions in the UI as they arrive instead of after the whole quiz
+    PROGRESSIVE_RENDERING: bool = os.getenv("PROGRESSIVE_RENDERING", "true").lower() == "true"
+
+    # ----------------------------------------------------------
+    # Question bank parameters
+    # ----------------------------------------------------------
+
+    # Serve quizzes from previously validated questions before calling the LLM
+    QUESTION_BANK_ENABLED: bool = os.getenv("QUESTION_BANK_ENABLED", "true").lower() == "true"
+
+    # SQLite file holding the question bank
+    QUESTION_BANK_PATH: str = os.getenv("QUESTION_BANK_PATH", "data/question_bank.sqlite3")
+
+    # Upper bound on stored questions; least recently served are evicted first
+    QUESTION_BANK_MAX_ROWS: int = int(os.getenv("QUESTION_BANK_MAX_ROWS", "50000"))
+
+    # ----------------------------------------------------------
+    # Results store parameters
+    # ----------------------------------------------------------
+
+    # 'sqlite' appends saved results to one store; 'csv' writes a file per save
+    RESULTS_BACKEND: str = os.getenv("RESULTS_BACKEND", "sqlite").lower()
+
+    # SQLite file holding every saved result
+    RESULTS_STORE_PATH: str = os.getenv("RESULTS_STORE_PATH", "data/quiz_results.sqlite3")
+
+    # Buffered rows are written once this many are waiting, or after this
+    # many seconds at the latest
+    RESULTS_FLUSH_ROWS: int = 50
+    RESULTS_FLUSH_SECONDS: float = 5.0
+
+    # ----------------------------------------------------------
+    # Prefetch parameters
+    # ----------------------------------------------------------
+
+    # Keep ready-made questions for preset topics (spends quota in the background)
+    PREFETCH_ENABLED: bool = os.getenv("PREFETCH_ENABLED", "false").lower() == "true"
+
+    # Refill a preset buffer once it drops below this many questions
+    PREFETCH_LOW_WATER: int = int(os.getenv("PREFETCH_LOW_WATER", "5"))
+
+    # Refill a preset buffer up to this many questions
+    PREFETCH_HIGH_WATER: int = int(os.getenv("PREFETCH_HIGH_WATER", "10"))
+
+    # Initial pause (seconds) after a rate-limit error; doubles while it persists
+    PREFETCH_RATE_LIMIT_PAUSE: float = 30.0
+
+    # How long the worker sleeps when every buffer is full
+    PREFETCH_IDLE_SECONDS: float = 60.0
+
+    # How long the worker waits before re-checking while interactive calls
+    # are queued for quota (refills never join that queue)
+    PREFETCH_YIELD_SECONDS: float = 2.0
+
+    # ----------------------------------------------------------
+    # Startup and diagnostics
+    # ----------------------------------------------------------
+
+    # Preload LangChain/Groq/pandas in a background thread at process start
+    WARMUP_ENABLED: bool = os.getenv("WARMUP_ENABLED", "true").lower() == "true"
+
+    # Show per-session rerun counts and CPU time in the sidebar (debugging)
+    RENDER_STATS_PANEL: bool = os.getenv("RENDER_STATS_PANEL", "false").lower() == "true"
+
+    # Release a session's quiz state after this much inactivity (seconds)
+    SESSION_IDLE_SECONDS: float = float(os.getenv("SESSION_IDLE_SECONDS", "1800"))
+
+    # Minimum interval between idle-session sweeps (seconds)
+    SESSION_SWEEP_SECONDS: float = 60.0
+
+    # Show bytes per session and total session memory in the sidebar (debugging)
+    SESSION_MEMORY_PANEL: bool = os.getenv("SESSION_MEMORY_PANEL", "false").lower() == "true"
+
 
 # Instantiate a global settings object for project-wide use
 settings = Settings()
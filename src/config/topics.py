@@ -0,0 +1,47 @@
+"""
+topics.py
+
+Preset quiz topics for the LLMOps StudyBuddy project.
+
+The Streamlit sidebar offers these presets, and background components such as
+the prefetch pool warm questions for them ahead of time. Keeping them in one
+place ensures the UI and the warm caches always agree on the topic strings.
+`question_kind` maps the sidebar's question types to the internal kind used
+by the question bank, the prefetch pool, coalescing and model routing.
+"""
+
+# --------------------------------------------------------------
+# Imports
+# --------------------------------------------------------------
+from typing import Dict, List, Optional
+
+# --------------------------------------------------------------
+# Preset Topics
+# --------------------------------------------------------------
+
+# Sidebar label -> topic string sent to the model (None = custom topic)
+TOPIC_OPTIONS: Dict[str, Optional[str]] = {
+    "📜 History": "history, covering different periods, regions, and major events",
+    "🌍 Geography": "world geography, including countries, capitals, landforms, and climate",
+    "🧪 Science": "general science, including physics, chemistry, and basic scientific principles",
+    "🧬 Biology": "biology, including cells, genetics, evolution, and ecosystems",
+    "📐 Mathematics": "mathematics, including algebra, geometry, and basic calculus ideas",
+    "💻 Computer Science": "computer science fundamentals, including algorithms and data structures",
+    "📈 Economics": "economics, including microeconomics and macroeconomics concepts",
+    "⚽ Sports": "general sports knowledge, including rules, famous events, and athletes",
+    "📝 Custom topic": None,
+}
+
+# Question types and difficulty levels offered in the sidebar
+QUESTION_TYPES: List[str] = ["Multiple Choice", "Fill in the Blank"]
+DIFFICULTIES: List[str] = ["Easy", "Medium", "Hard"]
+
+
+def question_kind(question_type: str) -> str:
+    """Map a UI question type to its internal kind ('mcq' or 'fill_blank')."""
+    return "mcq" if question_type == "Multiple Choice" else "fill_blank"
+
+
+def preset_topics() -> List[str]:
+    """Return the topic strings of all presets (excluding the custom entry)."""
+    return [topic for topic in TOPIC_OPTIONS.values() if topic]
@@ -0,0 +1,402 @@
+"""
+coalescing.py
+
+Request coalescing (single-flight) for question generation in the LLMOps
+StudyBuddy project.
+
+During class sessions many students request the same preset quiz within
+seconds, and each click used to start its own chain of LLM calls.
+`CoalescingGenerator` wraps a `QuestionGenerator` and exposes the same
+methods, but requests for the same (topic, type, difficulty) from
+*different quizzes* that arrive within a short window join one "flight": a
+single batched LLM call whose questions are split between the callers.
+Every caller still receives distinct questions, and the per-user API does
+not change.
+
+- Calls belonging to one quiz (see `quiz_scope`) never share a flight, so a
+  quiz's concurrent fan-out keeps one call per question and questions can
+  still be previewed as each call returns
+- While no other quiz is generating the same key, calls go straight to the
+  wrapped generator: a lone user never waits for the join window
+
+If a flight returns fewer questions than were requested, callers left
+without a share fall back to their own direct generation call. Callers wait
+at most `COALESCE_RESULT_TIMEOUT` for their share. Requests that carry an
+avoid list are specific to one quiz and are never coalesced.
+"""
+
+# --------------------------------------------------------------
+# Imports
+# --------------------------------------------------------------
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from src.common.custom_exception import CustomException
+from src.common.logger import get_logger
+from src.config.settings import settings
+from src.config.topics import question_kind
+from src.models.question_schemas import FillBlankQuestion, MCQQuestion
+from src.storage.question_bank import normalise_topic
+
+if TYPE_CHECKING:
+    # Only for annotations; the generator pulls in LangChain and Groq
+    from src.generator.question_generator import QuestionGenerator
+
+FlightKey = Tuple[str, str, str]
+
+# The quiz the current call belongs to (None: the call is its own quiz)
+_current_quiz: ContextVar[Optional[object]] = ContextVar("studybuddy_quiz", default=None)
+
+
+@contextmanager
+def quiz_scope() -> Iterator[object]:
+    """
+    Mark every generator call made in this context as part of one quiz.
+
+    Tasks created inside the scope inherit it, so the concurrent slots of
+    one quiz are recognised as siblings and never coalesced with each other.
+    """
+    quiz = object()
+    token = _current_quiz.set(quiz)
+    try:
+        yield quiz
+    finally:
+        _current_quiz.reset(token)
+
+
+# --------------------------------------------------------------
+# Flight
+# --------------------------------------------------------------
+class _Flight:
+    """One pending batched call and the callers waiting on it."""
+
+    def __init__(self, topic: str, question_type: str, difficulty: str) -> None:
+        self.topic = topic
+        self.question_type = question_type
+        self.difficulty = difficulty
+        self.requests: List[Tuple[int, Future]] = []
+        self.quizzes: set = set()
+        self.total = 0
+
+
+# --------------------------------------------------------------
+# Coalescing Generator
+# --------------------------------------------------------------
+class CoalescingGenerator:
+    """
+    Share in-flight LLM calls between identical concurrent requests.
+
+    Parameters
+    ----------
+    generator : QuestionGenerator
+        Generator used for the batched calls and for fallbacks.
+    window : float, optional
+        Seconds a flight stays open for other callers to join.
+    max_batch : int, optional
+        Most questions one flight may request; later callers open a new one.
+    max_workers : int, optional
+        Flights that may run at the same time.
+    result_timeout : float, optional
+        Longest a caller waits for its share of a flight.
+
+    Methods
+    -------
+    generate_mcq / generate_fill_blank
+        Same contract as `QuestionGenerator`, served from a shared flight.
+    agenerate_mcq / agenerate_fill_blank
+        Async variants; the event loop is never blocked.
+    generate_batch(topic, difficulty, n, question_type)
+        Join a flight for `n` questions.
+    stats()
+        Flight, coalesced-caller and direct-call counters.
+
+    Notes
+    -----
+    Any other attribute is delegated to the wrapped generator.
+    """
+
+    def __init__(
+        self,
+        generator: QuestionGenerator,
+        window: Optional[float] = None,
+        max_batch: Optional[int] = None,
+        max_workers: Optional[int] = None,
+        result_timeout: Optional[float] = None,
+    ) -> None:
+        self.generator = generator
+        self.window = settings.COALESCE_WINDOW_SECONDS if window is None else window
+        self.max_batch = max_batch or settings.COALESCE_MAX_BATCH
+        self.result_timeout = settings.COALESCE_RESULT_TIMEOUT if result_timeout is None else result_timeout
+        self.logger = get_logger(self.__class__.__name__)
+
+        self._lock = threading.Lock()
+        self._open: Dict[FlightKey, List[_Flight]] = {}
+
+        # Calls in progress per key, by quiz (quiz -> count)
+        self._active: Dict[FlightKey, Dict[object, int]] = {}
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or settings.COALESCE_MAX_FLIGHTS,
+            thread_name_prefix="studybuddy-flight",
+        )
+
+        # Observability counters (guarded by `_lock`)
+        self._flights = 0
+        self._callers = 0
+        self._direct = 0
+
+    def __getattr__(self, name: str) -> Any:
+        """Delegate everything else (llm, logger, ...) to the wrapped generator."""
+        return getattr(self.generator, name)
+
+    # ----------------------------------------------------------
+    # Flights
+    # ----------------------------------------------------------
+    @staticmethod
+    def _key(topic: str, question_type: str, difficulty: str) -> FlightKey:
+        """Build the normalised flight key."""
+        return (normalise_topic(topic), question_kind(question_type), difficulty.lower())
+
+    @contextmanager
+    def _activity(self, key: FlightKey) -> Iterator[object]:
+        """Register a call of the current quiz on `key` for its duration."""
+        quiz = _current_quiz.get() or object()
+        with self._lock:
+            quizzes = self._active.setdefault(key, {})
+            quizzes[quiz] = quizzes.get(quiz, 0) + 1
+        try:
+            yield quiz
+        finally:
+            with self._lock:
+                quizzes = self._active[key]
+                quizzes[quiz] -= 1
+                if not quizzes[quiz]:
+                    del quizzes[quiz]
+                if not quizzes:
+                    del self._active[key]
+
+    def _join(
+        self,
+        key: FlightKey,
+        quiz: object,
+        topic: str,
+        question_type: str,
+        difficulty: str,
+        count: int,
+    ) -> Optional[Future]:
+        """
+        Join (or open) a flight for `key` and return a future for our share.
+
+        The future resolves to a list of up to `count` questions, or to the
+        exception raised by the batched call. Returns None when no other quiz
+        is generating `key`; the caller then calls the generator directly.
+        """
+        future: Future = Future()
+
+        with self._lock:
+            if all(other is quiz for other in self._active.get(key, ())):
+                self._direct += 1
+                return None
+
+            # First open flight with room that holds no sibling of this call
+            flights = self._open.setdefault(key, [])
+            flight = next(
+                (
+                    open_flight
+                    for open_flight in flights
+                    if quiz not in open_flight.quizzes and open_flight.total + count <= self.max_batch
+                ),
+                None,
+            )
+            if flight is None:
+                # Leader: open a new flight and schedule it after the window
+                flight = _Flight(topic, question_type, difficulty)
+                flights.append(flight)
+                self._flights += 1
+                self._executor.submit(self._fly, key, flight)
+
+            flight.requests.append((count, future))
+            flight.quizzes.add(quiz)
+            flight.total += count
+            self._callers += 1
+
+        return future
+
+    def _fly(self, key: FlightKey, flight: _Flight) -> None:
+        """Close a flight after the join window, run it and split the results."""
+        time.sleep(self.window)
+        with self._lock:
+            flights = self._open.get(key, [])
+            flights.remove(flight)
+            if not flights:
+                self._open.pop(key, None)
+
+        # Claim every share before the call. A claimed future can no longer be
+        # cancelled, so handing it out below cannot race with the caller;
+        # callers that gave up during the window drop out of the batch.
+        requests = [(count, future) for count, future in flight.requests if future.set_running_or_notify_cancel()]
+        if not requests:
+            return
+        total = sum(count for count, _ in requests)
+
+        if len(requests) > 1:
+            self.logger.info(f"Coalesced {len(requests)} requests ({total} questions) for {key}.")
+
+        try:
+            try:
+                questions = self.generator.generate_batch(
+                    flight.topic,
+                    flight.difficulty,
+                    total,
+                    flight.question_type,
+                )
+            except Exception as exc:
+                for _, future in requests:
+                    future.set_exception(exc)
+                return
+
+            # Hand out distinct slices in arrival order
+            offset = 0
+            for count, future in requests:
+                future.set_result(questions[offset:offset + count])
+                offset += count
+        finally:
+            # Whatever went wrong above, no caller is left waiting
+            for _, future in requests:
+                if not future.done():
+                    future.set_exception(CustomException("Coalesced generation ended without a result."))
+
+    # ----------------------------------------------------------
+    # Generator API
+    # ----------------------------------------------------------
+    def generate_mcq(
+        self,
+        topic: str,
+        difficulty: str = "medium",
+        avoid: Optional[Sequence[str]] = None,
+    ) -> MCQQuestion:
+        """Generate an MCQ, sharing the LLM call with other quizzes' identical requests."""
+        if avoid:
+            return self.generator.generate_mcq(topic, difficulty, avoid=avoid)
+
+        key = self._key(topic, "Multiple Choice", difficulty)
+        with self._activity(key) as quiz:
+            future = self._join(key, quiz, topic, "Multiple Choice", difficulty, 1)
+            if future is None:
+                return self.generator.generate_mcq(topic, difficulty)
+            try:
+                share = future.result(timeout=self.result_timeout)
+            except Exception as exc:
+                raise CustomException("MCQ generation failed.", exc) from exc
+            return share[0] if share else self.generator.generate_mcq(topic, difficulty)
+
+    def generate_fill_blank(
+        self,
+        topic: str,
+        difficulty: str = "medium",
+        avoid: Optional[Sequence[str]] = None,
+    ) -> FillBlankQuestion:
+        """Generate a fill-in-the-blank question, possibly via a shared flight."""
+        if avoid:
+            return self.generator.generate_fill_blank(topic, difficulty, avoid=avoid)
+
+        key = self._key(topic, "Fill in the Blank", difficulty)
+        with self._activity(key) as quiz:
+            future = self._join(key, quiz, topic, "Fill in the Blank", difficulty, 1)
+            if future is None:
+                return self.generator.generate_fill_blank(topic, difficulty)
+            try:
+                share = future.result(timeout=self.result_timeout)
+            except Exception as exc:
+                raise CustomException("Fill-in-the-blank generation failed.", exc) from exc
+            return share[0] if share else self.generator.generate_fill_blank(topic, difficulty)
+
+    async def agenerate_mcq(
+        self,
+        topic: str,
+        difficulty: str = "medium",
+        avoid: Optional[Sequence[str]] = None,
+    ) -> MCQQuestion:
+        """Async variant of `generate_mcq`; cancelling the caller abandons its share."""
+        if avoid:
+            return await self.generator.agenerate_mcq(topic, difficulty, avoid=avoid)
+
+        key = self._key(topic, "Multiple Choice", difficulty)
+        with self._activity(key) as quiz:
+            future = self._join(key, quiz, topic, "Multiple Choice", difficulty, 1)
+            if future is None:
+                return await self.generator.agenerate_mcq(topic, difficulty)
+            try:
+                share = await asyncio.wait_for(asyncio.wrap_future(future), self.result_timeout)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                raise CustomException("MCQ generation failed.", exc) from exc
+            return share[0] if share else await self.generator.agenerate_mcq(topic, difficulty)
+
+    async def agenerate_fill_blank(
+        self,
+        topic: str,
+        difficulty: str = "medium",
+        avoid: Optional[Sequence[str]] = None,
+    ) -> FillBlankQuestion:
+        """Async variant of `generate_fill_blank`."""
+        if avoid:
+            return await self.generator.agenerate_fill_blank(topic, difficulty, avoid=avoid)
+
+        key = self._key(topic, "Fill in the Blank", difficulty)
+        with self._activity(key) as quiz:
+            future = self._join(key, quiz, topic, "Fill in the Blank", difficulty, 1)
+            if future is None:
+                return await self.generator.agenerate_fill_blank(topic, difficulty)
+            try:
+                share = await asyncio.wait_for(asyncio.wrap_future(future), self.result_timeout)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                raise CustomException("Fill-in-the-blank generation failed.", exc) from exc
+            return share[0] if share else await self.generator.agenerate_fill_blank(topic, difficulty)
+
+    def generate_batch(
+        self,
+        topic: str,
+        difficulty: str,
+        n: int,
+        question_type: str = "Multiple Choice",
+        avoid: Optional[Sequence[str]] = None,
+    ) -> List[MCQQuestion] | List[FillBlankQuestion]:
+        """
+        Generate up to `n` distinct questions through a shared flight.
+
+        Requests larger than `max_batch`, or with an avoid list, bypass
+        coalescing.
+
+        Raises
+        ------
+        CustomException
+            If no valid question could be generated.
+        """
+        if n > self.max_batch or avoid:
+            return self.generator.generate_batch(topic, difficulty, n, question_type, avoid=avoid)
+
+        key = self._key(topic, question_type, difficulty)
+        with self._activity(key) as quiz:
+            future = self._join(key, quiz, topic, question_type, difficulty, n)
+            try:
+                questions = future.result(timeout=self.result_timeout) if future is not None else None
+            except TimeoutError as exc:
+                raise CustomException("Batch generation timed out.", exc) from exc
+            if not questions:
+                return self.generator.generate_batch(topic, difficulty, n, question_type)
+            return questions
+
+    def stats(self) -> Dict[str, int]:
+        """Return flights flown, callers served by flights and direct calls."""
+        with self._lock:
+            return {"flights": self._flights, "callers": self._callers, "direct": self._direct}
@@ -0,0 +1,279 @@
+"""
+prefetch.py
+
+Background prefetch pool for the LLMOps StudyBuddy project.
+
+Even with a question bank, the first request for a (topic, type, difficulty)
+combination pays for a full generation round. `PrefetchPool` runs a daemon
+worker that keeps a small buffer of pre-validated questions for every preset
+topic, so interactive quiz requests for presets can be served from memory.
+
+The worker:
+- Refills any buffer that has drained below the low-water mark up to the
+  high-water mark, using batched generation
+- Writes every generated question to the question bank, if one is attached
+- Yields to interactive traffic: no refill starts while callers are queued
+  in the shared `RateLimiter`, and every LLM call of a refill (retries
+  included) runs under `background_priority()`, so it only takes quota
+  nobody queued is waiting for and never sits ahead of a user's request
+- Backs off when the LLM provider signals rate limiting anyway
+"""
+
+# --------------------------------------------------------------
+# Imports
+# --------------------------------------------------------------
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from typing import TYPE_CHECKING, Container, Deque, Dict, Iterable, List, Optional, Tuple
+
+from src.common.logger import get_logger
+from src.config.settings import settings
+from src.config.topics import question_kind
+from src.llm.rate_limiter import background_priority, get_rate_limiter
+from src.llm.retry import FailureClass, classify_error, retry_after_seconds
+from src.models.question_schemas import FillBlankQuestion, MCQQuestion
+from src.storage.question_bank import QuestionBank, normalise_topic, question_key
+
+if TYPE_CHECKING:
+    # Only for annotations; the generator pulls in LangChain and Groq
+    from src.generator.question_generator import QuestionGenerator
+
+BufferKey = Tuple[str, str, str]
+
+
+# --------------------------------------------------------------
+# Prefetch Pool
+# --------------------------------------------------------------
+class PrefetchPool:
+    """
+    Keep per-(topic, type, difficulty) buffers of ready-made questions.
+
+    Parameters
+    ----------
+    generator : QuestionGenerator
+        Generator used by the background worker.
+    topics : iterable of str
+        Topic strings to keep warm (typically the sidebar presets).
+    question_types : iterable of str
+        UI question types to keep warm.
+    difficulties : iterable of str
+        Difficulty levels to keep warm.
+    bank : QuestionBank, optional
+        Bank that receives every prefetched question.
+    low_water : int, optional
+        Refill a buffer once it holds fewer questions than this.
+    high_water : int, optional
+        Target buffer size after a refill.
+
+    Methods
+    -------
+    start()
+        Launch the background refill worker.
+    stop()
+        Ask the worker to exit.
+    take(topic, question_type, difficulty, k, exclude)
+        Remove and return up to `k` buffered questions.
+    """
+
+    def __init__(
+        self,
+        generator: QuestionGenerator,
+        topics: Iterable[str],
+        question_types: Iterable[str],
+        difficulties: Iterable[str],
+        bank: Optional[QuestionBank] = None,
+        low_water: Optional[int] = None,
+        high_water: Optional[int] = None,
+    ) -> None:
+        self.generator = generator
+        self.bank = bank
+        self.low_water = low_water or settings.PREFETCH_LOW_WATER
+        self.high_water = max(high_water or settings.PREFETCH_HIGH_WATER, self.low_water)
+        self.logger = get_logger(self.__class__.__name__)
+
+        # Original (topic, type, difficulty) arguments, needed to call the generator
+        self._targets: Dict[BufferKey, Tuple[str, str, str]] = {}
+        self._buffers: Dict[BufferKey, Deque[MCQQuestion | FillBlankQuestion]] = {}
+        for topic in topics:
+            for question_type in question_types:
+                for difficulty in difficulties:
+                    key = self._key(topic, question_type, difficulty)
+                    self._targets[key] = (topic, question_type, difficulty)
+                    self._buffers[key] = deque()
+
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        # Rate-limit backoff state
+        self._paused_until = 0.0
+        self._pause_seconds = settings.PREFETCH_RATE_LIMIT_PAUSE
+
+    @staticmethod
+    def _key(topic: str, question_type: str, difficulty: str) -> BufferKey:
+        """Build the normalised buffer key."""
+        return (normalise_topic(topic), question_kind(question_type), difficulty.lower())
+
+    # ----------------------------------------------------------
+    # Lifecycle
+    # ----------------------------------------------------------
+    def start(self) -> "PrefetchPool":
+        """Start the background worker (idempotent) and return the pool."""
+        if self._thread is None or not self._thread.is_alive():
+            self._stopped.clear()
+            self._thread = threading.Thread(
+                target=self._run,
+                name="studybuddy-prefetch",
+                daemon=True,
+            )
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Signal the worker to stop after its current refill."""
+        self._stopped.set()
+        self._wakeup.set()
+
+    def pause(self, seconds: float) -> None:
+        """Suspend refills for at least `seconds` (e.g. under rate limiting)."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    # ----------------------------------------------------------
+    # Consumer API
+    # ----------------------------------------------------------
+    def take(
+        self,
+        topic: str,
+        question_type: str,
+        difficulty: str,
+        k: int,
+        exclude: Container[str] = (),
+    ) -> List[MCQQuestion | FillBlankQuestion]:
+        """
+        Remove and return up to `k` buffered questions for a key.
+
+        Questions whose keys appear in `exclude` stay in the buffer for
+        other sessions.
+
+        Returns
+        -------
+        list of MCQQuestion or FillBlankQuestion
+            Between 0 and `k` questions; always empty for non-preset topics.
+        """
+        key = self._key(topic, question_type, difficulty)
+        taken: List[MCQQuestion | FillBlankQuestion] = []
+
+        with self._lock:
+            buffer = self._buffers.get(key)
+            if buffer is None:
+                return taken
+
+            kept: Deque[MCQQuestion | FillBlankQuestion] = deque()
+            while buffer and len(taken) < k:
+                question = buffer.popleft()
+                if question_key(question.question) in exclude:
+                    kept.append(question)
+                else:
+                    taken.append(question)
+            buffer.extendleft(reversed(kept))
+            drained = len(buffer) < self.low_water
+
+        # Let the worker know it has something to do
+        if drained:
+            self._wakeup.set()
+        return taken
+
+    def levels(self) -> Dict[BufferKey, int]:
+        """Return the current size of every buffer."""
+        with self._lock:
+            return {key: len(buffer) for key, buffer in self._buffers.items()}
+
+    # ----------------------------------------------------------
+    # Worker
+    # ----------------------------------------------------------
+    def _next_target(self) -> Optional[BufferKey]:
+        """Return the emptiest buffer below the low-water mark, if any."""
+        with self._lock:
+            drained = [
+                (len(buffer), key)
+                for key, buffer in self._buffers.items()
+                if len(buffer) < self.low_water
+            ]
+        return min(drained)[1] if drained else None
+
+    def _refill(self, key: BufferKey) -> None:
+        """Top a single buffer up to the high-water mark."""
+        topic, question_type, difficulty = self._targets[key]
+        with self._lock:
+            wanted = self.high_water - len(self._buffers[key])
+            known = {question_key(q.question) for q in self._buffers[key]}
+        if wanted <= 0:
+            return
+
+        # Every attempt (retries included) waits in the limiter's background lane
+        with background_priority():
+            questions = self.generator.generate_batch(
+                topic,
+                difficulty.lower(),
+                wanted,
+                question_type,
+            )
+        fresh = [q for q in questions if question_key(q.question) not in known]
+
+        with self._lock:
+            self._buffers[key].extend(fresh)
+
+        if self.bank is not None and fresh:
+            self.bank.add(topic, question_type, difficulty, fresh)
+
+        self.logger.info(f"Prefetched {len(fresh)} questions for {key}.")
+
+    @staticmethod
+    def _quota_contended() -> bool:
+        """True while other callers are queued for LLM quota."""
+        limiter = get_rate_limiter()
+        return limiter is not None and limiter.stats()["queue_depth"] > 0
+
+    def _run(self) -> None:
+        """Refill drained buffers until stopped."""
+        while not self._stopped.is_set():
+            # Respect any active rate-limit pause
+            with self._lock:
+                delay = self._paused_until - time.monotonic()
+            if delay > 0:
+                self._stopped.wait(delay)
+                continue
+
+            # Interactive requests are waiting for quota -> let them go first
+            if self._quota_contended():
+                self._stopped.wait(settings.PREFETCH_YIELD_SECONDS)
+                continue
+
+            key = self._next_target()
+            if key is None:
+                # Everything is full -> sleep until a consumer drains a buffer
+                self._wakeup.wait(settings.PREFETCH_IDLE_SECONDS)
+                self._wakeup.clear()
+                continue
+
+            try:
+                self._refill(key)
+                # Successful call -> reset the backoff
+                self._pause_seconds = settings.PREFETCH_RATE_LIMIT_PAUSE
+
+            except Exception as exc:
+                if classify_error(exc) is FailureClass.RATE_LIMIT:
+                    # Honour the provider's hint if it asks for a longer pause
+                    pause = max(self._pause_seconds, retry_after_seconds(exc) or 0.0)
+                    self.logger.warning(f"Prefetch rate limited; pausing for {pause:.0f}s.")
+                    self.pause(pause)
+                    # Back off exponentially while pressure persists
+                    self._pause_seconds = min(self._pause_seconds * 2, 600.0)
+                else:
+                    self.logger.error(f"Prefetch failed for {key}: {exc}")
+                    self.pause(settings.PREFETCH_RATE_LIMIT_PAUSE)
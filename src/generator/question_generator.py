@@ -6,7 +6,25 @@ High-level question generation service for the LLMOps StudyBuddy project.
 This module provides the `QuestionGenerator` class, which:
 - Uses LangChain prompt templates and the Groq Chat model
 - Parses outputs into Pydantic models
-- Retries on failure, with logging and structured error handling
+- Retries on failure with an error-aware policy (backoff, jitter, retry
+  budget), with logging and structured error handling
+- Offers async variants built on the chat model's `ainvoke` so callers can
+  generate several questions concurrently
+- Offers batched generation of N questions in a single LLM call
+- Waits for Groq RPM/TPM quota before every call via the shared rate limiter
+- Routes each request to a model tier by question type, difficulty and load,
+  escalating to a stronger model when a cheaper one produces bad output
+- Accepts an optional list of questions to avoid, which is added to the
+  prompt (within a token budget) to steer the model away from duplicates
+- Optionally hedges slow calls with a second identical request; the first
+  valid parse wins and the other is cancelled
+- Exports attempts per call and failures per class as Prometheus metrics
+- Optionally uses the model's structured-output mode (tool calling / JSON
+  mode) with a schema derived from the question model, falling back to
+  text parsing of whatever the model returned
+- Decodes responses on a fast path: parsers are built once, well-formed
+  JSON goes straight to Pydantic's native JSON validation, and batch items
+  are validated as one list
 """
 
 # --------------------------------------------------------------
@@ -14,17 +32,134 @@ This module provides the `QuestionGenerator` class, which:
 # --------------------------------------------------------------
 from __future__ import annotations
 
-from typing import Any
+import asyncio
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Type
 
+from langchain_core.exceptions import OutputParserException
 from langchain_core.output_parsers import PydanticOutputParser
-from src.models.question_schemas import MCQQuestion, FillBlankQuestion
-from src.prompts.templates import mcq_prompt_template, fill_blank_prompt_template
+from pydantic import BaseModel, TypeAdapter, ValidationError
+from src.models.question_schemas import (
+    FILL_BLANK_LIST_ADAPTER,
+    MCQ_LIST_ADAPTER,
+    FillBlankBatch,
+    FillBlankQuestion,
+    MCQBatch,
+    MCQQuestion,
+)
+from src.prompts.templates import format_avoid_block, get_prompt_template
 from src.llm.groq_client import get_groq_llm
+from src.llm.hedging import get_hedger
+from src.llm.rate_limiter import estimate_tokens, get_rate_limiter, usage_tokens
+from src.llm.retry import retry_policy
+from src.llm.router import get_model_router
+from src.llm.structured import StructuredCaller, parse_stats
+from src.utils.json_repair import loads_tolerant, repair_stats
 from src.config.settings import settings
+from src.common import metrics
+from src.common.event_loop import in_loop_thread, run_coroutine
 from src.common.logger import get_logger
 from src.common.custom_exception import CustomException
 
 
+# --------------------------------------------------------------
+# Output Parsers
+# --------------------------------------------------------------
+class _FastOutputParser(PydanticOutputParser):
+    """
+    `PydanticOutputParser` with a fast path for well-formed JSON.
+
+    Most responses are a bare JSON object, which Pydantic validates straight
+    from the string (`model_validate_json`) without LangChain's Markdown
+    handling and an intermediate dict. Anything else goes through the
+    regular parser, so errors and fallbacks are unchanged.
+    """
+
+    def parse(self, text: str) -> Any:
+        try:
+            return self.pydantic_object.model_validate_json(text)
+        except ValidationError:
+            return super().parse(text)
+
+
+# Parsers are stateless, so one instance per model serves every call
+_MCQ_PARSER = _FastOutputParser(pydantic_object=MCQQuestion)
+_FILL_BLANK_PARSER = _FastOutputParser(pydantic_object=FillBlankQuestion)
+
+
+class _BatchOutputParser:
+    """
+    Parse a JSON array of questions, dropping invalid items individually.
+
+    A single malformed item should not discard an otherwise useful batch,
+    so invalid elements are dropped and only the survivors are kept. The
+    whole list is validated in one `TypeAdapter` call first; items are only
+    validated one by one when that fails. The parser raises only when
+    nothing in the response is usable, which lets `_retry_and_parse` treat
+    it like any other failed attempt.
+    """
+
+    def __init__(
+        self,
+        batch_model: Type[BaseModel],
+        item_model: Type[BaseModel],
+        validate: Callable[[Any], Any],
+        logger,
+        list_adapter: Optional[TypeAdapter] = None,
+    ) -> None:
+        self.batch_model = batch_model
+        self.item_model = item_model
+        self.validate = validate
+        self.logger = logger
+        self.list_adapter = list_adapter or TypeAdapter(List[item_model])
+
+    @staticmethod
+    def _load_items(text: str) -> List[Any]:
+        """Decode (and locally repair) the response into raw question objects."""
+        data = loads_tolerant(text)
+
+        # Accept either a bare array or a {"questions": [...]} wrapper
+        if isinstance(data, dict):
+            data = data.get("questions", [data])
+        if not isinstance(data, list):
+            raise ValueError("Batch response is not a JSON array.")
+        return data
+
+    def parse(self, text: str) -> BaseModel:
+        """
+        Parse and validate a batch response.
+
+        Returns
+        -------
+        BaseModel
+            A batch model (e.g. `MCQBatch`) holding the valid questions.
+
+        Raises
+        ------
+        ValueError
+            If the response is not JSON or contains no valid questions.
+        """
+        items = self._load_items(text)
+
+        # Bulk validation; fall back to per-item validation to drop bad items
+        try:
+            models = self.list_adapter.validate_python(items)
+        except ValidationError:
+            models = None
+
+        valid = []
+        for index, item in enumerate(items):
+            try:
+                model = models[index] if models is not None else self.item_model.model_validate(item)
+                valid.append(self.validate(model))
+            except Exception as exc:
+                self.logger.warning(f"Dropping invalid batch item {index}: {exc}")
+
+        if not valid:
+            raise ValueError("Batch response contained no valid questions.")
+        return self.batch_model(questions=valid)
+
+
 # --------------------------------------------------------------
 # Question Generator
 # --------------------------------------------------------------
@@ -45,26 +180,317 @@ class QuestionGenerator:
         Generate a structured multiple-choice question.
     generate_fill_blank(topic, difficulty)
         Generate a structured fill-in-the-blank question.
+    agenerate_mcq(topic, difficulty)
+        Async variant of `generate_mcq`.
+    agenerate_fill_blank(topic, difficulty)
+        Async variant of `generate_fill_blank`.
+    generate_batch(topic, difficulty, n, question_type)
+        Generate up to `n` distinct questions using one LLM call per round.
     """
 
     def __init__(self) -> None:
-        """Initialise the generator with an LLM client and logger."""
+        """Initialise the generator with an LLM client, retry policy and logger."""
         # Groq chat model client
         self.llm = get_groq_llm()
 
+        # Shared, error-aware retry policy (backoff, jitter, retry budget)
+        self.retry_policy = retry_policy
+
+        # Shared RPM/TPM limiter (None when rate limiting is disabled)
+        self.rate_limiter = get_rate_limiter()
+
+        # Shared model-tier router (None when routing is disabled -> `self.llm`)
+        self.router = get_model_router()
+
+        # Shared hedger for slow calls (None unless hedging is enabled)
+        self.hedger = get_hedger()
+
+        # Provider-native structured output (None -> plain-text JSON parsing)
+        self.structured = (
+            StructuredCaller(settings.STRUCTURED_OUTPUT_METHOD)
+            if settings.STRUCTURED_OUTPUT_METHOD != "off"
+            else None
+        )
+
         # Module-level logger
         self.logger = get_logger(self.__class__.__name__)
 
+        # Output parsers per template, built once (batch parsers bind this
+        # instance's validators and logger)
+        self._parsers: Dict[str, Any] = {
+            "mcq": _MCQ_PARSER,
+            "fill_blank": _FILL_BLANK_PARSER,
+            "mcq_batch": _BatchOutputParser(
+                MCQBatch, MCQQuestion, self._validate_mcq, self.logger, MCQ_LIST_ADAPTER
+            ),
+            "fill_blank_batch": _BatchOutputParser(
+                FillBlankBatch,
+                FillBlankQuestion,
+                self._validate_fill_blank,
+                self.logger,
+                FILL_BLANK_LIST_ADAPTER,
+            ),
+        }
+
+    def _parse(
+        self,
+        content: str,
+        parser: PydanticOutputParser,
+        validate: Optional[Callable[[Any], Any]] = None,
+    ) -> Any:
+        """
+        Parse raw model output and apply any structural validation.
+
+        The strict parser runs first. If it fails, the output goes through
+        local extraction and repair (code fences, leading prose, single
+        quotes, trailing commas, nested `question` objects) before the
+        attempt is counted as failed, so a new LLM call is only needed when
+        repair cannot rescue the response.
+
+        Parameters
+        ----------
+        content : str
+            Raw text returned by the LLM.
+        parser : PydanticOutputParser
+            Output parser bound to the target Pydantic model.
+        validate : callable, optional
+            Structural check applied to the parsed model.
+
+        Returns
+        -------
+        Any
+            Parsed (and validated) model instance.
+        """
+        try:
+            parsed = parser.parse(content)
+            repair_stats.record("direct")
+        except OutputParserException as exc:
+            parsed = self._parse_repaired(content, parser, exc)
+
+        return validate(parsed) if validate is not None else parsed
+
+    def _parse_repaired(
+        self,
+        content: str,
+        parser: PydanticOutputParser,
+        error: OutputParserException,
+    ) -> Any:
+        """
+        Retry parsing after local JSON repair.
+
+        Raises
+        ------
+        OutputParserException
+            The original parse error, if repair does not produce a valid model.
+        """
+        try:
+            parsed = parser.pydantic_object.model_validate(loads_tolerant(content))
+        except Exception:
+            repair_stats.record("failed")
+            self.logger.info(
+                f"JSON repair failed; repair hit rate {repair_stats.hit_rate():.0%} "
+                f"({repair_stats.snapshot()})."
+            )
+            raise error
+
+        repair_stats.record("repaired")
+        self.logger.info(
+            f"Recovered response with local JSON repair; repair hit rate "
+            f"{repair_stats.hit_rate():.0%} ({repair_stats.snapshot()})."
+        )
+        return parsed
+
+    @staticmethod
+    def _avoid_vars(avoid: Optional[Sequence[str]]) -> Dict[str, str]:
+        """Build the `{avoid}` prompt variable (empty if there is nothing to avoid)."""
+        if not avoid or not settings.AVOID_PROMPTING_ENABLED:
+            return {}
+        block = format_avoid_block(avoid, settings.AVOID_TOKEN_BUDGET)
+        return {"avoid": block} if block else {}
+
+    @staticmethod
+    def _estimate_tokens(formatted_prompt: str, prompt_vars: dict) -> int:
+        """Estimate the quota cost of one call (batch prompts expect `n` questions)."""
+        expected_output = settings.RATE_LIMIT_OUTPUT_TOKENS_PER_QUESTION * prompt_vars.get("n", 1)
+        return estimate_tokens(formatted_prompt, expected_output)
+
+    def _route(self, question_type: str, difficulty: str) -> Optional[str]:
+        """Return the model tier for a request (None when routing is disabled)."""
+        if self.router is None:
+            return None
+        return self.router.route(question_type, difficulty)
+
+    def _llm_for(self, tier: Optional[str]):
+        """Return the chat model serving a tier."""
+        return self.llm if tier is None else self.router.llm(tier)
+
+    def _after_attempt(
+        self,
+        tier: Optional[str],
+        started: Optional[float],
+        exc: Optional[Exception] = None,
+        questions: int = 1,
+    ) -> Optional[str]:
+        """
+        Record a tier's latency and outcome, and return the tier for the next attempt.
+
+        `started` is None if the attempt failed before reaching the model;
+        `questions` is how many questions the call asked for.
+        """
+        if tier is None:
+            return None
+        if started is not None:
+            self.router.metrics.record(
+                tier,
+                time.monotonic() - started,
+                success=exc is None,
+                questions=questions,
+            )
+        return tier if exc is None else self.router.escalate(tier, exc)
+
+    def _use_structured(self, llm) -> bool:
+        """True if this call should use provider-native structured output."""
+        return self.structured is not None and self.structured.supports(llm)
+
+    @staticmethod
+    def _schema_of(parser) -> Type[BaseModel]:
+        """Return the Pydantic model a parser produces (batch parsers: the batch model)."""
+        return getattr(parser, "pydantic_object", None) or parser.batch_model
+
+    def _finish_call(
+        self,
+        response: Any,
+        content: str,
+        parser: PydanticOutputParser,
+        validate: Optional[Callable[[Any], Any]],
+        tokens: int,
+        mode: str,
+        native: bool = False,
+    ) -> Any:
+        """Reconcile quota, then parse and validate, recording the outcome per mode."""
+        if self.rate_limiter is not None and response is not None:
+            self.rate_limiter.reconcile(tokens, usage_tokens(response))
+
+        try:
+            parsed = self._parse(content, parser, validate)
+        except Exception:
+            outcome = "failed"
+            raise
+        else:
+            outcome = "ok" if native or mode == "text" else "fallback"
+            return parsed
+        finally:
+            parse_stats.record(mode, outcome)
+            metrics.parse_outcomes.labels(mode=mode, outcome=outcome).inc()
+            if outcome != "ok":
+                self.logger.info(f"Parse outcome '{outcome}' ({mode}); rates: {parse_stats.snapshot()}")
+
+    def _call(
+        self,
+        tier: Optional[str],
+        formatted_prompt: str,
+        parser: PydanticOutputParser,
+        validate: Optional[Callable[[Any], Any]],
+        tokens: int,
+    ) -> Any:
+        """Call the model once and parse the reply."""
+        llm = self._llm_for(tier)
+        if self._use_structured(llm):
+            response, content, native = self.structured.invoke(
+                llm, formatted_prompt, self._schema_of(parser)
+            )
+            return self._finish_call(response, content, parser, validate, tokens, "structured", native)
+
+        response = llm.invoke(formatted_prompt)
+        return self._finish_call(response, response.content, parser, validate, tokens, "text")
+
+    async def _acall(
+        self,
+        tier: Optional[str],
+        formatted_prompt: str,
+        parser: PydanticOutputParser,
+        validate: Optional[Callable[[Any], Any]],
+        tokens: int,
+    ) -> Any:
+        """Async variant of `_call` (one hedgeable unit)."""
+        llm = self._llm_for(tier)
+        if self._use_structured(llm):
+            response, content, native = await self.structured.ainvoke(
+                llm, formatted_prompt, self._schema_of(parser)
+            )
+            return self._finish_call(response, content, parser, validate, tokens, "structured", native)
+
+        response = await llm.ainvoke(formatted_prompt)
+        return self._finish_call(response, response.content, parser, validate, tokens, "text")
+
+    async def _ahedged(
+        self,
+        tier: Optional[str],
+        formatted_prompt: str,
+        parser: PydanticOutputParser,
+        validate: Optional[Callable[[Any], Any]],
+        tokens: int,
+    ) -> Any:
+        """
+        Run `_acall` through the hedger.
+
+        A hedge is sent only if quota is free right now, so hedges never
+        queue ahead of other sessions' first attempts.
+        """
+        return await self.hedger.arun(
+            lambda: self._acall(tier, formatted_prompt, parser, validate, tokens),
+            key=tier or "default",
+            can_hedge=lambda: self.rate_limiter is None or self.rate_limiter.try_acquire(tokens),
+        )
+
+    def _handle_failure(self, exc: Exception, attempt: int) -> float:
+        """
+        Classify a failed attempt and return the delay before retrying.
+
+        Raises
+        ------
+        CustomException
+            If the policy decides not to retry (attempts exhausted,
+            non-retryable error or retry budget exhausted).
+        """
+        failure, delay = self.retry_policy.next_delay(exc, attempt)
+        self.logger.error(f"Question generation error ({failure.value}): {exc}")
+        metrics.generation_failures.labels(failure=failure.value).inc()
+
+        if delay is None:
+            metrics.generation_attempts.labels(outcome="failure").observe(attempt + 1)
+            self.logger.info(f"Retry counters: {self.retry_policy.stats.snapshot()}")
+            raise CustomException(
+                f"Generation failed after {attempt + 1} attempts ({failure.value})",
+                exc,
+            ) from exc
+
+        if delay > 0:
+            self.logger.info(f"Retrying after {delay:.2f}s backoff.")
+        return delay
+
     def _retry_and_parse(
         self,
         prompt,
         parser: PydanticOutputParser,
         topic: str,
         difficulty: str,
+        validate: Optional[Callable[[Any], Any]] = None,
+        question_type: str = "Multiple Choice",
+        **prompt_vars: Any,
     ) -> Any:
         """
         Execute the LLM with retry logic and parse the output.
 
+        Failures are classified by `retry_policy`: rate limits honour
+        `Retry-After`, timeouts and server errors back off exponentially with
+        jitter, parse and validation errors retry immediately, and every
+        retry draws from the process-wide retry budget.
+
+        With routing enabled, the first attempt uses the tier chosen by the
+        router and a parse or validation failure escalates the next attempt
+        to a stronger tier.
+
         Parameters
         ----------
         prompt
@@ -75,6 +501,12 @@ class QuestionGenerator:
             Topic for question generation.
         difficulty : str
             Difficulty level (e.g. 'easy', 'medium', 'hard').
+        validate : callable, optional
+            Structural check applied to the parsed model; failures are retried.
+        question_type : str, optional
+            UI question type, used to pick the model tier.
+        **prompt_vars
+            Extra template variables (e.g. `n` for batch templates).
 
         Returns
         -------
@@ -84,41 +516,172 @@ class QuestionGenerator:
         Raises
         ------
         CustomException
-            If generation fails after the configured number of retries.
+            If generation fails and the retry policy gives up.
         """
-        for attempt in range(settings.MAX_RETRIES):
+        # Format the prompt once; it is identical for every attempt
+        formatted_prompt = prompt.format(
+            topic=topic,
+            difficulty=difficulty,
+            **prompt_vars,
+        )
+        tokens = self._estimate_tokens(formatted_prompt, prompt_vars)
+        tier = self._route(question_type, difficulty)
+        self.retry_policy.on_first_attempt()
+
+        for attempt in range(self.retry_policy.max_attempts):
+            started = None
             try:
                 self.logger.info(
                     f"Generating question for topic='{topic}', "
-                    f"difficulty='{difficulty}', attempt={attempt + 1}"
+                    f"difficulty='{difficulty}', attempt={attempt + 1}, tier={tier}"
                 )
 
-                # Format the prompt and call the LLM
-                formatted_prompt = prompt.format(
-                    topic=topic,
-                    difficulty=difficulty,
+                # Queue for quota instead of letting the provider reject us
+                if self.rate_limiter is not None:
+                    self.rate_limiter.acquire(tokens)
+
+                started = time.monotonic()
+                if self.hedger is not None and not in_loop_thread():
+                    # Call and parse on the shared loop, hedging if slow
+                    # (never from the loop thread itself: it would deadlock)
+                    parsed = run_coroutine(
+                        self._ahedged(tier, formatted_prompt, parser, validate, tokens)
+                    )
+                else:
+                    # Call the LLM and parse its output into a Pydantic model
+                    parsed = self._call(tier, formatted_prompt, parser, validate, tokens)
+                self._after_attempt(tier, started, questions=prompt_vars.get("n", 1))
+                metrics.generation_attempts.labels(outcome="success").observe(attempt + 1)
+
+                self.logger.info("Successfully parsed the question.")
+                return parsed
+
+            except Exception as exc:
+                next_tier = self._after_attempt(tier, started, exc, questions=prompt_vars.get("n", 1))
+                time.sleep(self._handle_failure(exc, attempt))
+                tier = next_tier
+
+        # Should never reach here
+        raise CustomException("Unexpected error in _retry_and_parse.", None)
+
+    async def _aretry_and_parse(
+        self,
+        prompt,
+        parser: PydanticOutputParser,
+        topic: str,
+        difficulty: str,
+        validate: Optional[Callable[[Any], Any]] = None,
+        question_type: str = "Multiple Choice",
+        **prompt_vars: Any,
+    ) -> Any:
+        """
+        Async variant of `_retry_and_parse` using the model's `ainvoke`.
+
+        Parameters
+        ----------
+        prompt
+            LangChain PromptTemplate used to format the request.
+        parser : PydanticOutputParser
+            Output parser bound to the target Pydantic model.
+        topic : str
+            Topic for question generation.
+        difficulty : str
+            Difficulty level (e.g. 'easy', 'medium', 'hard').
+        validate : callable, optional
+            Structural check applied to the parsed model; failures are retried.
+        question_type : str, optional
+            UI question type, used to pick the model tier.
+        **prompt_vars
+            Extra template variables (e.g. `n` for batch templates).
+
+        Returns
+        -------
+        Any
+            Parsed Pydantic model instance.
+
+        Raises
+        ------
+        CustomException
+            If generation fails and the retry policy gives up.
+        """
+        formatted_prompt = prompt.format(
+            topic=topic,
+            difficulty=difficulty,
+            **prompt_vars,
+        )
+        tokens = self._estimate_tokens(formatted_prompt, prompt_vars)
+        tier = self._route(question_type, difficulty)
+        self.retry_policy.on_first_attempt()
+
+        for attempt in range(self.retry_policy.max_attempts):
+            started = None
+            try:
+                self.logger.info(
+                    f"Generating question (async) for topic='{topic}', "
+                    f"difficulty='{difficulty}', attempt={attempt + 1}, tier={tier}"
                 )
-                response = self.llm.invoke(formatted_prompt)
 
-                # Parse LLM output into a Pydantic model
-                parsed = parser.parse(response.content)
+                if self.rate_limiter is not None:
+                    await self.rate_limiter.aacquire(tokens)
+
+                # Await the LLM (and parse) without blocking the loop
+                started = time.monotonic()
+                if self.hedger is not None:
+                    parsed = await self._ahedged(tier, formatted_prompt, parser, validate, tokens)
+                else:
+                    parsed = await self._acall(tier, formatted_prompt, parser, validate, tokens)
+                self._after_attempt(tier, started, questions=prompt_vars.get("n", 1))
+                metrics.generation_attempts.labels(outcome="success").observe(attempt + 1)
 
                 self.logger.info("Successfully parsed the question.")
                 return parsed
 
+            except asyncio.CancelledError:
+                # Never swallow cancellation; the caller no longer needs this
+                raise
+
             except Exception as exc:
-                self.logger.error(f"Question generation error: {exc}")
-                # Last attempt -> raise custom exception
-                if attempt == settings.MAX_RETRIES - 1:
-                    raise CustomException(
-                        f"Generation failed after {settings.MAX_RETRIES} attempts",
-                        exc,
-                    ) from exc
+                next_tier = self._after_attempt(tier, started, exc, questions=prompt_vars.get("n", 1))
+                await asyncio.sleep(self._handle_failure(exc, attempt))
+                tier = next_tier
 
         # Should never reach here
-        raise CustomException("Unexpected error in _retry_and_parse.", None)
+        raise CustomException("Unexpected error in _aretry_and_parse.", None)
+
+    @staticmethod
+    def _validate_mcq(question: MCQQuestion) -> MCQQuestion:
+        """
+        Apply structural checks to a parsed MCQ.
+
+        Raises
+        ------
+        ValueError
+            If the MCQ does not have 4 options or a valid correct answer.
+        """
+        if len(question.options) != 4 or question.correct_answer not in question.options:
+            raise ValueError("Invalid MCQ structure: requires 4 options and a valid correct_answer.")
+        return question
 
-    def generate_mcq(self, topic: str, difficulty: str = "medium") -> MCQQuestion:
+    @staticmethod
+    def _validate_fill_blank(question: FillBlankQuestion) -> FillBlankQuestion:
+        """
+        Apply structural checks to a parsed fill-in-the-blank question.
+
+        Raises
+        ------
+        ValueError
+            If the question text does not contain the '___' placeholder.
+        """
+        if "___" not in question.question:
+            raise ValueError("Fill-in-the-blank question must contain '___' placeholder.")
+        return question
+
+    def generate_mcq(
+        self,
+        topic: str,
+        difficulty: str = "medium",
+        avoid: Optional[Sequence[str]] = None,
+    ) -> MCQQuestion:
         """
         Generate a multiple-choice question (MCQ).
 
@@ -128,6 +691,8 @@ class QuestionGenerator:
             Topic for the MCQ.
         difficulty : str, optional
             Difficulty level, by default "medium".
+        avoid : sequence of str, optional
+            Existing questions (oldest first) the model should not repeat.
 
         Returns
         -------
@@ -140,21 +705,19 @@ class QuestionGenerator:
             If generation or validation fails.
         """
         try:
-            # Bind parser to MCQQuestion model
-            parser = PydanticOutputParser(pydantic_object=MCQQuestion)
+            # Shared parser bound to the MCQQuestion model
+            parser = self._parsers["mcq"]
 
-            # Call LLM, parse, and return the model
+            # Call LLM, parse and validate (structural failures are retried)
             question: MCQQuestion = self._retry_and_parse(
-                mcq_prompt_template,
+                get_prompt_template("mcq"),
                 parser,
                 topic,
                 difficulty,
+                validate=self._validate_mcq,
+                **self._avoid_vars(avoid),
             )
 
-            # Structural validation
-            if len(question.options) != 4 or question.correct_answer not in question.options:
-                raise ValueError("Invalid MCQ structure: requires 4 options and a valid correct_answer.")
-
             self.logger.info("Generated a valid MCQ question.")
             return question
 
@@ -166,6 +729,7 @@ class QuestionGenerator:
         self,
         topic: str,
         difficulty: str = "medium",
+        avoid: Optional[Sequence[str]] = None,
     ) -> FillBlankQuestion:
         """
         Generate a fill-in-the-blank question.
@@ -176,6 +740,8 @@ class QuestionGenerator:
             Topic for the question.
         difficulty : str, optional
             Difficulty level, by default "medium".
+        avoid : sequence of str, optional
+            Existing questions (oldest first) the model should not repeat.
 
         Returns
         -------
@@ -188,24 +754,212 @@ class QuestionGenerator:
             If generation or validation fails.
         """
         try:
-            # Bind parser to FillBlankQuestion model
-            parser = PydanticOutputParser(pydantic_object=FillBlankQuestion)
+            # Shared parser bound to the FillBlankQuestion model
+            parser = self._parsers["fill_blank"]
 
-            # Call LLM, parse, and return the model
+            # Call LLM, parse and check the placeholder (failures are retried)
             question: FillBlankQuestion = self._retry_and_parse(
-                fill_blank_prompt_template,
+                get_prompt_template("fill_blank"),
                 parser,
                 topic,
                 difficulty,
+                validate=self._validate_fill_blank,
+                question_type="Fill in the Blank",
+                **self._avoid_vars(avoid),
             )
 
-            # Ensure the placeholder is present
-            if "___" not in question.question:
-                raise ValueError("Fill-in-the-blank question must contain '___' placeholder.")
+            self.logger.info("Generated a valid fill-in-the-blank question.")
+            return question
+
+        except Exception as exc:
+            self.logger.error(f"Failed to generate fill-in-the-blank question: {exc}")
+            raise CustomException("Fill-in-the-blank generation failed.", exc) from exc
+
+    async def agenerate_mcq(
+        self,
+        topic: str,
+        difficulty: str = "medium",
+        avoid: Optional[Sequence[str]] = None,
+    ) -> MCQQuestion:
+        """
+        Generate a multiple-choice question (MCQ) without blocking the event loop.
+
+        Parameters
+        ----------
+        topic : str
+            Topic for the MCQ.
+        difficulty : str, optional
+            Difficulty level, by default "medium".
+        avoid : sequence of str, optional
+            Existing questions (oldest first) the model should not repeat.
+
+        Returns
+        -------
+        MCQQuestion
+            Validated MCQ Pydantic model.
+
+        Raises
+        ------
+        CustomException
+            If generation or validation fails.
+        """
+        try:
+            parser = self._parsers["mcq"]
+
+            question: MCQQuestion = await self._aretry_and_parse(
+                get_prompt_template("mcq"),
+                parser,
+                topic,
+                difficulty,
+                validate=self._validate_mcq,
+                **self._avoid_vars(avoid),
+            )
+
+            self.logger.info("Generated a valid MCQ question.")
+            return question
+
+        except asyncio.CancelledError:
+            raise
+
+        except Exception as exc:
+            self.logger.error(f"Failed to generate MCQ: {exc}")
+            raise CustomException("MCQ generation failed.", exc) from exc
+
+    async def agenerate_fill_blank(
+        self,
+        topic: str,
+        difficulty: str = "medium",
+        avoid: Optional[Sequence[str]] = None,
+    ) -> FillBlankQuestion:
+        """
+        Generate a fill-in-the-blank question without blocking the event loop.
+
+        Parameters
+        ----------
+        topic : str
+            Topic for the question.
+        difficulty : str, optional
+            Difficulty level, by default "medium".
+        avoid : sequence of str, optional
+            Existing questions (oldest first) the model should not repeat.
+
+        Returns
+        -------
+        FillBlankQuestion
+            Validated fill-in-the-blank Pydantic model.
+
+        Raises
+        ------
+        CustomException
+            If generation or validation fails.
+        """
+        try:
+            parser = self._parsers["fill_blank"]
+
+            question: FillBlankQuestion = await self._aretry_and_parse(
+                get_prompt_template("fill_blank"),
+                parser,
+                topic,
+                difficulty,
+                validate=self._validate_fill_blank,
+                question_type="Fill in the Blank",
+                **self._avoid_vars(avoid),
+            )
 
             self.logger.info("Generated a valid fill-in-the-blank question.")
             return question
 
+        except asyncio.CancelledError:
+            raise
+
         except Exception as exc:
             self.logger.error(f"Failed to generate fill-in-the-blank question: {exc}")
             raise CustomException("Fill-in-the-blank generation failed.", exc) from exc
+
+    def generate_batch(
+        self,
+        topic: str,
+        difficulty: str,
+        n: int,
+        question_type: str = "Multiple Choice",
+        avoid: Optional[Sequence[str]] = None,
+    ) -> List[MCQQuestion] | List[FillBlankQuestion]:
+        """
+        Generate up to `n` distinct questions, asking for all of them at once.
+
+        The instruction preamble is sent once per round instead of once per
+        question. Invalid items in a response are dropped individually and
+        only the shortfall is requested again, for at most
+        `settings.MAX_RETRIES` rounds.
+
+        Parameters
+        ----------
+        topic : str
+            Topic for the questions.
+        difficulty : str
+            Difficulty level (e.g. 'easy', 'medium', 'hard').
+        n : int
+            Number of questions wanted.
+        question_type : str, optional
+            'Multiple Choice' for MCQs; anything else yields fill-in-the-blank
+            questions. Defaults to 'Multiple Choice'.
+        avoid : sequence of str, optional
+            Existing questions (oldest first) the model should not repeat.
+            Questions collected in earlier rounds are added automatically.
+
+        Returns
+        -------
+        list of MCQQuestion or list of FillBlankQuestion
+            Between 1 and `n` distinct, validated questions.
+
+        Raises
+        ------
+        CustomException
+            If no valid question could be generated.
+        """
+        if question_type == "Multiple Choice":
+            prompt = get_prompt_template("mcq_batch")
+            parser = self._parsers["mcq_batch"]
+        else:
+            prompt = get_prompt_template("fill_blank_batch")
+            parser = self._parsers["fill_blank_batch"]
+
+        questions: list = []
+        seen_questions: set[str] = set()
+
+        try:
+            for _ in range(settings.MAX_RETRIES):
+                missing = n - len(questions)
+                if missing <= 0:
+                    break
+
+                batch = self._retry_and_parse(
+                    prompt,
+                    parser,
+                    topic,
+                    difficulty,
+                    question_type=question_type,
+                    n=missing,
+                    **self._avoid_vars([*(avoid or ()), *(q.question for q in questions)]),
+                )
+
+                # Keep only questions we have not already collected
+                for question in batch.questions:
+                    question_text = question.question.strip().lower()
+                    if question_text in seen_questions:
+                        continue
+                    seen_questions.add(question_text)
+                    questions.append(question)
+
+        except Exception as exc:
+            # Partial success is still useful to the caller
+            if not questions:
+                self.logger.error(f"Failed to generate question batch: {exc}")
+                raise CustomException("Batch generation failed.", exc) from exc
+            self.logger.warning(f"Stopping batch early with {len(questions)} questions: {exc}")
+
+        if not questions:
+            raise CustomException("Batch generation produced no valid questions.", None)
+
+        self.logger.info(f"Generated {len(questions[:n])}/{n} questions in batch mode.")
+        return questions[:n]
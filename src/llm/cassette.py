@@ -0,0 +1,463 @@
+"""
+cassette.py
+
+Record/replay of LLM calls for the LLMOps StudyBuddy project.
+
+Profiling and regression-testing the pipeline should not need a network
+connection or a Groq key. This module provides:
+
+- `CassetteRecorder`: wraps a chat model and appends every call (prompt
+  hash, model, temperature, seed, raw response, latency, token usage or
+  error) to a compact JSONL call log. Structured-output calls are logged as
+  the JSON text the generator parses, so they replay through the text path
+- `CassettePlayer`: a drop-in chat model that serves responses back from a
+  call log, optionally sleeping for each call's original latency
+- `analyze`: summarises a call log (latency percentiles, tokens per question
+  type, failure reasons); also available as a CLI:
+
+      python -m src.llm.cassette logs/llm_calls.jsonl
+
+`get_groq_llm` applies the mode configured by `LLM_CASSETTE_MODE`
+('off', 'record' or 'replay').
+"""
+
+# --------------------------------------------------------------
+# Imports
+# --------------------------------------------------------------
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import httpx
+from langchain_core.messages import AIMessage
+from pydantic import BaseModel
+
+from src.common.logger import get_logger
+from src.llm.retry import classify_error
+from src.llm.structured import failed_generation
+
+# Detects batched prompts and their size ("Generate 5 distinct ...")
+_BATCH_RE = re.compile(r"Generate (\d+) distinct")
+
+
+# --------------------------------------------------------------
+# Call Records
+# --------------------------------------------------------------
+def prompt_hash(prompt: Any) -> str:
+    """Stable short hash of a formatted prompt."""
+    return hashlib.sha256(str(prompt).encode("utf-8")).hexdigest()[:16]
+
+
+def prompt_kind(prompt: Any) -> Tuple[str, int]:
+    """
+    Return the question kind ('mcq', 'fill_blank' or 'other') and the
+    number of questions a formatted prompt asks for.
+    """
+    text = str(prompt)
+    batch = _BATCH_RE.search(text)
+    count = int(batch.group(1)) if batch else 1
+    if "multiple-choice" in text:
+        return "mcq", count
+    if "fill-in-the-blank" in text:
+        return "fill_blank", count
+    return "other", count
+
+
+def iter_records(path: str) -> Iterator[Dict[str, Any]]:
+    """Yield the records of a call log, skipping blank or corrupt lines."""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+
+class ReplayedHTTPError(Exception):
+    """A provider error recorded in a call log, raised again on replay."""
+
+    def __init__(self, message: str, status_code: Optional[int], retry_after: Optional[str]) -> None:
+        super().__init__(message)
+        self.status_code = status_code
+        if status_code is not None:
+            headers = {"retry-after": retry_after} if retry_after else {}
+            self.response = httpx.Response(status_code, headers=headers)
+
+
+class CassetteMiss(LookupError):
+    """Raised by `CassettePlayer` when the log has no response for a prompt."""
+
+
+# --------------------------------------------------------------
+# Recorder
+# --------------------------------------------------------------
+class CassetteRecorder:
+    """
+    Chat model wrapper that logs every call to a JSONL file.
+
+    Parameters
+    ----------
+    llm
+        Chat model to wrap (e.g. `ChatGroq`).
+    path : str
+        Call log to append to (created if missing).
+    model : str
+        Model name recorded with each call.
+    temperature : float
+        Sampling temperature recorded with each call.
+
+    Notes
+    -----
+    Any attribute other than `invoke` / `ainvoke` / `with_structured_output`
+    is delegated to the wrapped model. Cancelled calls (e.g. hedge losers)
+    are not recorded.
+    """
+
+    def __init__(self, llm: Any, path: str, model: str, temperature: float) -> None:
+        self.llm = llm
+        self.path = path
+        self.model = model
+        self.temperature = temperature
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    def __getattr__(self, name: str) -> Any:
+        # Structured runnables call the provider directly; wrap them so their
+        # calls are logged too (only if the wrapped model supports them)
+        if name == "with_structured_output" and hasattr(self.llm, name):
+            return self._with_structured_output
+        return getattr(self.llm, name)
+
+    def _with_structured_output(self, schema: Any, **kwargs: Any) -> "_RecordedRunnable":
+        """`with_structured_output` of the wrapped model, with every call logged."""
+        return _RecordedRunnable(self, self.llm.with_structured_output(schema, **kwargs))
+
+    def _record(
+        self,
+        prompt: Any,
+        started: float,
+        response: Any = None,
+        error: Optional[BaseException] = None,
+    ) -> None:
+        """Append one call to the log."""
+        kind, count = prompt_kind(prompt)
+        record: Dict[str, Any] = {
+            "ts": round(time.time(), 3),
+            "key": prompt_hash(prompt),
+            "model": self.model,
+            "temperature": self.temperature,
+            "seed": getattr(self.llm, "seed", None),
+            "kind": kind,
+            "n": count,
+            "latency": round(time.monotonic() - started, 4),
+        }
+        if error is None:
+            record["response"] = response.content
+            usage = getattr(response, "usage_metadata", None) or {}
+            record["tokens"] = [usage.get("input_tokens"), usage.get("output_tokens")]
+        else:
+            status = getattr(error, "status_code", None)
+            headers = getattr(getattr(error, "response", None), "headers", None) or {}
+            record["error"] = {
+                "reason": classify_error(error).value,
+                "type": type(error).__name__,
+                "status": status if isinstance(status, int) else None,
+                "retry_after": headers.get("retry-after"),
+                "message": str(error)[:200],
+            }
+
+        line = json.dumps(record, separators=(",", ":"), ensure_ascii=False)
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+    def invoke(self, prompt: Any, *args: Any, **kwargs: Any) -> Any:
+        """Call the wrapped model and log the call."""
+        started = time.monotonic()
+        try:
+            response = self.llm.invoke(prompt, *args, **kwargs)
+        except Exception as exc:
+            self._record(prompt, started, error=exc)
+            raise
+        self._record(prompt, started, response=response)
+        return response
+
+    async def ainvoke(self, prompt: Any, *args: Any, **kwargs: Any) -> Any:
+        """Async variant of `invoke`."""
+        started = time.monotonic()
+        try:
+            response = await self.llm.ainvoke(prompt, *args, **kwargs)
+        except Exception as exc:
+            self._record(prompt, started, error=exc)
+            raise
+        self._record(prompt, started, response=response)
+        return response
+
+
+def _structured_message(result: Any) -> AIMessage:
+    """
+    Flatten a structured-output result into the message the text path would see.
+
+    The JSON text is what the generator parses (the validated object, else the
+    tool-call arguments, else the raw content), so a replayed call parses the
+    same way the recorded one did.
+    """
+    if isinstance(result, dict) and "raw" in result:
+        raw, parsed = result.get("raw"), result.get("parsed")
+    else:
+        raw, parsed = None, result
+
+    if isinstance(parsed, BaseModel):
+        text = parsed.model_dump_json()
+    elif parsed is not None:
+        text = json.dumps(parsed)
+    else:
+        tool_calls = getattr(raw, "tool_calls", None) or []
+        text = json.dumps(tool_calls[0].get("args", {})) if tool_calls else getattr(raw, "content", "") or ""
+    return AIMessage(content=text, usage_metadata=getattr(raw, "usage_metadata", None))
+
+
+class _RecordedRunnable:
+    """Structured-output runnable whose calls are logged by a `CassetteRecorder`."""
+
+    def __init__(self, recorder: CassetteRecorder, runnable: Any) -> None:
+        self.recorder = recorder
+        self.runnable = runnable
+
+    def _record_error(self, prompt: Any, started: float, exc: BaseException) -> None:
+        """Log a failed call; a rejected tool call is logged as the text it carried."""
+        text = failed_generation(exc) if getattr(exc, "status_code", None) == 400 else None
+        if text is None:
+            self.recorder._record(prompt, started, error=exc)
+        else:
+            self.recorder._record(prompt, started, response=AIMessage(content=text))
+
+    def invoke(self, prompt: Any, *args: Any, **kwargs: Any) -> Any:
+        """Call the structured runnable and log the call."""
+        started = time.monotonic()
+        try:
+            result = self.runnable.invoke(prompt, *args, **kwargs)
+        except Exception as exc:
+            self._record_error(prompt, started, exc)
+            raise
+        self.recorder._record(prompt, started, response=_structured_message(result))
+        return result
+
+    async def ainvoke(self, prompt: Any, *args: Any, **kwargs: Any) -> Any:
+        """Async variant of `invoke`."""
+        started = time.monotonic()
+        try:
+            result = await self.runnable.ainvoke(prompt, *args, **kwargs)
+        except Exception as exc:
+            self._record_error(prompt, started, exc)
+            raise
+        self.recorder._record(prompt, started, response=_structured_message(result))
+        return result
+
+
+# --------------------------------------------------------------
+# Player
+# --------------------------------------------------------------
+class CassettePlayer:
+    """
+    Chat model that replays responses from a call log.
+
+    Parameters
+    ----------
+    path : str
+        Call log written by `CassetteRecorder`.
+    model : str, optional
+        Only replay calls recorded for this model (all models if None).
+    simulate_latency : bool, optional
+        Sleep for each call's recorded latency before answering.
+    speed : float, optional
+        Latency divisor (2.0 replays twice as fast).
+    match : str, optional
+        'exact' serves only responses recorded for the identical prompt;
+        'kind' falls back to any response for the same question kind and
+        batch size (prompts with avoid lists rarely repeat exactly).
+
+    Notes
+    -----
+    Responses for a key are served in recorded order and then cycle, so a
+    log replays the same mix of successes and errors every time.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        model: Optional[str] = None,
+        simulate_latency: bool = False,
+        speed: float = 1.0,
+        match: str = "kind",
+    ) -> None:
+        self.simulate_latency = simulate_latency
+        self.speed = speed
+        self.match = match
+        self.logger = get_logger(self.__class__.__name__)
+
+        self._lock = threading.Lock()
+        self._by_key: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self._by_kind: Dict[Tuple[str, int], List[Dict[str, Any]]] = defaultdict(list)
+        self._cursor: Dict[Any, int] = defaultdict(int)
+
+        for record in iter_records(path):
+            if model is not None and record.get("model") != model:
+                continue
+            self._by_key[record["key"]].append(record)
+            self._by_kind[(record.get("kind", "other"), record.get("n", 1))].append(record)
+
+        self.logger.info(f"Loaded {sum(map(len, self._by_key.values()))} recorded calls from {path}.")
+
+    def _next(self, prompt: Any) -> Dict[str, Any]:
+        """Return the next recorded call for a prompt."""
+        key = prompt_hash(prompt)
+        kind = prompt_kind(prompt)
+
+        cursor_key, records = key, self._by_key.get(key)
+        if not records and self.match == "kind":
+            cursor_key, records = kind, self._by_kind.get(kind)
+        if not records:
+            raise CassetteMiss(f"No recorded response for prompt {key} ({kind[0]}, n={kind[1]}).")
+
+        with self._lock:
+            index = self._cursor[cursor_key]
+            self._cursor[cursor_key] = index + 1
+        return records[index % len(records)]
+
+    def _delay(self, record: Dict[str, Any]) -> float:
+        """Seconds to wait before answering."""
+        if not self.simulate_latency:
+            return 0.0
+        return record.get("latency", 0.0) / max(self.speed, 1e-9)
+
+    @staticmethod
+    def _result(record: Dict[str, Any]) -> AIMessage:
+        """Rebuild the recorded response, or raise the recorded error."""
+        error = record.get("error")
+        if error is not None:
+            raise ReplayedHTTPError(error.get("message", ""), error.get("status"), error.get("retry_after"))
+
+        input_tokens, output_tokens = (record.get("tokens") or [None, None])[:2]
+        usage = None
+        if input_tokens is not None and output_tokens is not None:
+            usage = {
+                "input_tokens": input_tokens,
+                "output_tokens": output_tokens,
+                "total_tokens": input_tokens + output_tokens,
+            }
+        return AIMessage(content=record.get("response", ""), usage_metadata=usage)
+
+    def invoke(self, prompt: Any, *args: Any, **kwargs: Any) -> AIMessage:
+        """Serve the next recorded response for `prompt`."""
+        record = self._next(prompt)
+        time.sleep(self._delay(record))
+        return self._result(record)
+
+    async def ainvoke(self, prompt: Any, *args: Any, **kwargs: Any) -> AIMessage:
+        """Async variant of `invoke`."""
+        record = self._next(prompt)
+        await asyncio.sleep(self._delay(record))
+        return self._result(record)
+
+
+# --------------------------------------------------------------
+# Analyzer
+# --------------------------------------------------------------
+def _percentiles(values: List[float]) -> Dict[str, float]:
+    """Return p50/p95/p99 and max of `values` (empty dict if none)."""
+    if not values:
+        return {}
+    ordered = sorted(values)
+
+    def pick(q: float) -> float:
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    return {"p50": pick(0.5), "p95": pick(0.95), "p99": pick(0.99), "max": ordered[-1]}
+
+
+def analyze(path: str) -> Dict[str, Any]:
+    """
+    Summarise a call log.
+
+    Returns
+    -------
+    dict
+        Call and error counts, latency percentiles overall and per model,
+        tokens per question kind (per call and per requested question), and
+        failures by reason.
+    """
+    latencies: List[float] = []
+    per_model: Dict[str, List[float]] = defaultdict(list)
+    failures: Dict[str, int] = defaultdict(int)
+    tokens: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+    calls = 0
+    first_ts = last_ts = None
+
+    for record in iter_records(path):
+        calls += 1
+        ts = record.get("ts")
+        if ts is not None:
+            first_ts = ts if first_ts is None else min(first_ts, ts)
+            last_ts = ts if last_ts is None else max(last_ts, ts)
+
+        latency = record.get("latency", 0.0)
+        latencies.append(latency)
+        per_model[record.get("model", "?")].append(latency)
+
+        if "error" in record:
+            failures[record["error"].get("reason", "unknown")] += 1
+            continue
+
+        input_tokens, output_tokens = (record.get("tokens") or [None, None])[:2]
+        stats = tokens[record.get("kind", "other")]
+        stats["calls"] += 1
+        stats["questions"] += record.get("n", 1)
+        stats["input_tokens"] += input_tokens or 0
+        stats["output_tokens"] += output_tokens or 0
+
+    by_kind = {}
+    for kind, stats in tokens.items():
+        total = stats["input_tokens"] + stats["output_tokens"]
+        by_kind[kind] = {
+            "calls": int(stats["calls"]),
+            "questions": int(stats["questions"]),
+            "input_tokens_per_call": stats["input_tokens"] / stats["calls"],
+            "output_tokens_per_call": stats["output_tokens"] / stats["calls"],
+            "tokens_per_question": total / stats["questions"] if stats["questions"] else 0.0,
+        }
+
+    duration = (last_ts - first_ts) if first_ts is not None else 0.0
+    return {
+        "calls": calls,
+        "errors": sum(failures.values()),
+        "duration_seconds": duration,
+        "calls_per_minute": calls / duration * 60 if duration > 0 else None,
+        "latency_seconds": _percentiles(latencies),
+        "latency_by_model": {model: _percentiles(values) for model, values in per_model.items()},
+        "tokens_by_kind": by_kind,
+        "failures_by_reason": dict(failures),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """CLI entry point: print the analysis of a call log as JSON."""
+    parser = argparse.ArgumentParser(description="Summarise a StudyBuddy LLM call log.")
+    parser.add_argument("path", help="JSONL call log written in record mode.")
+    args = parser.parse_args(argv)
+    print(json.dumps(analyze(args.path), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -8,36 +8,208 @@ This module provides a simple wrapper function for constructing a
 `ChatGroq` client using globally defined settings. It ensures that
 all model configuration (API key, model name, temperature) remains
 centralised and consistent across the system.
+
+Clients are shared process-wide: one `ChatGroq` per (model, temperature),
+all backed by a single pair of pooled HTTP clients with keep-alive, so
+quizzes reuse warm connections instead of paying a TLS handshake per click.
+
+Each client carries a callback that records per-model latency, in-flight
+requests and token usage in `src.common.metrics`.
+
+With `LLM_CASSETTE_MODE='record'` every client is wrapped so its calls are
+appended to the call log; with 'replay' the log answers instead of Groq
+(see `src.llm.cassette`).
 """
 
 # --------------------------------------------------------------
 # Imports
 # --------------------------------------------------------------
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+from uuid import UUID
+
+import httpx
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
 from langchain_groq import ChatGroq
+from src.common import metrics
 from src.config.settings import settings
+from src.llm.cassette import CassettePlayer, CassetteRecorder
+
+
+# --------------------------------------------------------------
+# Shared State
+# --------------------------------------------------------------
+_clients: Dict[Tuple[str, float], Any] = {}
+_player: Optional[CassettePlayer] = None
+_http_clients: Optional[Tuple[httpx.Client, httpx.AsyncClient]] = None
+_lock = threading.Lock()
+
+
+# --------------------------------------------------------------
+# HTTP Connection Pool
+# --------------------------------------------------------------
+def _get_http_clients() -> Tuple[httpx.Client, httpx.AsyncClient]:
+    """
+    Return the shared sync/async HTTP clients, creating them on first use.
+
+    Caller must hold `_lock`.
+
+    Notes
+    -----
+    The async client's connections belong to the event loop that opened
+    them. All async LLM calls run on the shared loop in
+    `src.common.event_loop`, which is what makes sharing it safe.
+    """
+    global _http_clients
+
+    if _http_clients is None:
+        limits = httpx.Limits(
+            max_connections=settings.LLM_POOL_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.LLM_POOL_MAX_KEEPALIVE,
+            keepalive_expiry=settings.LLM_POOL_KEEPALIVE_EXPIRY,
+        )
+        timeout = httpx.Timeout(
+            settings.LLM_READ_TIMEOUT,
+            connect=settings.LLM_CONNECT_TIMEOUT,
+        )
+        _http_clients = (
+            httpx.Client(limits=limits, timeout=timeout),
+            httpx.AsyncClient(limits=limits, timeout=timeout),
+        )
+
+    return _http_clients
+
+
+# --------------------------------------------------------------
+# Call Metrics
+# --------------------------------------------------------------
+class _MetricsCallback(BaseCallbackHandler):
+    """Record latency, in-flight requests and token usage for one model."""
+
+    # Run in the calling thread/loop so timings are not skewed by an executor
+    run_inline = True
+
+    def __init__(self, model: str) -> None:
+        self.model = model
+        self._started: Dict[UUID, float] = {}
+
+    def on_chat_model_start(self, serialized: Any, messages: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._started[run_id] = time.monotonic()
+        metrics.llm_inflight.labels(model=self.model).inc()
+
+    def _finish(self, run_id: UUID, outcome: str) -> None:
+        started = self._started.pop(run_id, None)
+        if started is None:
+            return
+        metrics.llm_inflight.labels(model=self.model).dec()
+        metrics.llm_latency.labels(model=self.model, outcome=outcome).observe(
+            time.monotonic() - started
+        )
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        self._finish(run_id, "success")
+
+        # Token usage as reported by Groq on the returned message
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+                for direction in ("input", "output"):
+                    count = usage.get(f"{direction}_tokens")
+                    if count:
+                        metrics.llm_tokens.labels(model=self.model, direction=direction).inc(count)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._finish(run_id, "error")
 
 
 # --------------------------------------------------------------
 # Groq LLM Client Factory
 # --------------------------------------------------------------
-def get_groq_llm() -> ChatGroq:
+def get_groq_llm(
+    model: Optional[str] = None,
+    temperature: Optional[float] = None,
+) -> Any:
     """
-    Create and return a configured Groq LLM client.
+    Return the shared Groq LLM client for a model and temperature.
 
-    The client is initialised using project-wide configuration values
-    defined in the `settings` object. This function provides a clean,
-    reusable entry point for any module requiring LLM access.
+    The client is created lazily on first request and cached for the
+    lifetime of the process, so every caller (and every Streamlit session)
+    reuses the same pooled HTTP connections. Creation is thread-safe.
+
+    Parameters
+    ----------
+    model : str, optional
+        Model name. Defaults to `settings.MODEL_NAME`.
+    temperature : float, optional
+        Sampling temperature. Defaults to `settings.TEMPERATURE`.
 
     Returns
     -------
     ChatGroq
         An instance of the Groq language model client configured with
-        the API key, model name, and temperature defined in settings.
+        the API key, model name, and temperature defined in settings
+        (wrapped in a `CassetteRecorder` in record mode, or replaced by the
+        shared `CassettePlayer` in replay mode).
     """
+    global _player
 
-    # Construct and return the Groq LLM client using global settings
-    return ChatGroq(
-        api_key=settings.GROQ_API_KEY,
-        model=settings.MODEL_NAME,
-        temperature=settings.TEMPERATURE,
+    key = (
+        model or settings.MODEL_NAME,
+        settings.TEMPERATURE if temperature is None else temperature,
     )
+
+    # Fast path: client already built
+    client = _clients.get(key)
+    if client is not None:
+        return client
+
+    with _lock:
+        client = _clients.get(key)
+        if client is None and settings.LLM_CASSETTE_MODE == "replay":
+            # One player for every model: serve recorded responses, no network
+            if _player is None:
+                _player = CassettePlayer(
+                    settings.LLM_CASSETTE_PATH,
+                    simulate_latency=settings.LLM_CASSETTE_SIMULATE_LATENCY,
+                    speed=settings.LLM_CASSETTE_SPEED,
+                )
+            client = _clients[key] = _player
+        elif client is None:
+            http_client, http_async_client = _get_http_clients()
+            client = ChatGroq(
+                api_key=settings.GROQ_API_KEY,
+                model=key[0],
+                temperature=key[1],
+                request_timeout=settings.LLM_READ_TIMEOUT,
+                # Retries are owned by src.llm.retry; SDK retries would multiply load
+                max_retries=settings.LLM_CLIENT_MAX_RETRIES,
+                http_client=http_client,
+                http_async_client=http_async_client,
+                callbacks=[_MetricsCallback(key[0])] if settings.METRICS_ENABLED else None,
+            )
+            if settings.LLM_CASSETTE_MODE == "record":
+                client = CassetteRecorder(client, settings.LLM_CASSETTE_PATH, key[0], key[1])
+            _clients[key] = client
+
+    return client
+
+
+def close_groq_clients() -> None:
+    """
+    Drop all cached clients and close the shared sync HTTP pool.
+
+    Intended for shutdown hooks and tests. The async client is left to the
+    garbage collector because closing it requires its owning event loop.
+    """
+    global _http_clients, _player
+
+    with _lock:
+        _clients.clear()
+        _player = None
+        if _http_clients is not None:
+            _http_clients[0].close()
+            _http_clients = None
@@ -0,0 +1,236 @@
+"""
+hedging.py
+
+Hedged LLM requests for the LLMOps StudyBuddy project.
+
+A handful of slow Groq responses dominate tail latency. `Hedger` runs a
+call and, if it has not finished within a high percentile of recent
+latencies, starts a second identical call. Whichever returns a valid result
+first wins and the other is cancelled (its HTTP request is closed).
+
+Hedging spends extra quota, so every hedge draws from a budget that allows
+at most `HEDGE_MAX_FRACTION` hedges per primary call, and a hedge is only
+sent if the rate limiter can grant it immediately.
+
+Hedges run as tasks on the shared event loop (`src.common.event_loop`), so
+synchronous callers use `run_coroutine(hedger.arun(...))`.
+"""
+
+# --------------------------------------------------------------
+# Imports
+# --------------------------------------------------------------
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections import Counter, deque
+from typing import Awaitable, Callable, Deque, Dict, Optional, TypeVar
+
+from src.common.logger import get_logger
+from src.config.settings import settings
+from src.llm.retry import RetryBudget
+
+T = TypeVar("T")
+
+# Recent latencies kept per key for the percentile estimate
+_LATENCY_WINDOW = 200
+
+
+# --------------------------------------------------------------
+# Latency Tracker
+# --------------------------------------------------------------
+class LatencyTracker:
+    """Rolling per-key latency samples with percentile queries."""
+
+    def __init__(self, window: int = _LATENCY_WINDOW) -> None:
+        self.window = window
+        self._lock = threading.Lock()
+        self._samples: Dict[str, Deque[float]] = {}
+
+    def record(self, key: str, latency: float) -> None:
+        """Add one call's latency (or a lower bound, for calls cut short)."""
+        with self._lock:
+            self._samples.setdefault(key, deque(maxlen=self.window)).append(latency)
+
+    def percentile(self, key: str, q: float, min_samples: int = 1) -> Optional[float]:
+        """Return the `q` quantile (0-1), or None with fewer than `min_samples` samples."""
+        with self._lock:
+            samples = sorted(self._samples.get(key, ()))
+        if len(samples) < max(1, min_samples):
+            return None
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+
+# --------------------------------------------------------------
+# Hedger
+# --------------------------------------------------------------
+class Hedger:
+    """
+    Send a backup request when the first one is slower than usual.
+
+    Parameters
+    ----------
+    percentile : float, optional
+        Latency quantile (0-1) after which a hedge is sent.
+    min_samples : int, optional
+        Samples needed before hedging starts for a key.
+    min_delay : float, optional
+        Never hedge earlier than this many seconds.
+    max_fraction : float, optional
+        Hedges allowed per primary call (e.g. 0.1 -> at most 10% extra calls).
+
+    Methods
+    -------
+    arun(call, key, can_hedge)
+        Run `call()`, hedging it if it is slow; return the first valid result.
+    stats()
+        Primary calls, hedges sent, hedge wins and budget denials.
+    """
+
+    def __init__(
+        self,
+        percentile: Optional[float] = None,
+        min_samples: Optional[int] = None,
+        min_delay: Optional[float] = None,
+        max_fraction: Optional[float] = None,
+    ) -> None:
+        self.percentile = settings.HEDGE_PERCENTILE if percentile is None else percentile
+        self.min_samples = settings.HEDGE_MIN_SAMPLES if min_samples is None else min_samples
+        self.min_delay = settings.HEDGE_MIN_DELAY if min_delay is None else min_delay
+        fraction = settings.HEDGE_MAX_FRACTION if max_fraction is None else max_fraction
+
+        # Same token bucket as the retry budget, without the time-based trickle
+        self.budget = RetryBudget(ratio=fraction, min_per_second=0.0, max_tokens=5.0)
+
+        self.latencies = LatencyTracker()
+        self.logger = get_logger(self.__class__.__name__)
+        self._lock = threading.Lock()
+        self._counts: Counter = Counter()
+
+    def hedge_delay(self, key: str) -> Optional[float]:
+        """Seconds to wait before hedging a call for `key` (None = do not hedge yet)."""
+        threshold = self.latencies.percentile(key, self.percentile, self.min_samples)
+        if threshold is None:
+            return None
+        return max(self.min_delay, threshold)
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counts[name] += 1
+
+    async def _timed(self, key: str, call: Callable[[], Awaitable[T]], primary: bool) -> T:
+        """
+        Run one call and record how long it took.
+
+        A primary call is recorded whatever its outcome: a slow primary that
+        a hedge beats is cancelled, and its elapsed time (a lower bound on
+        its latency) must still count, or the percentile would be built
+        only from the faster calls and keep drifting down. A hedge is
+        recorded only when it succeeds, because a hedge cancelled after
+        the primary won says nothing about slowness.
+        """
+        started = time.monotonic()
+        succeeded = False
+        try:
+            result = await call()
+            succeeded = True
+            return result
+        finally:
+            if primary or succeeded:
+                self.latencies.record(key, time.monotonic() - started)
+
+    async def arun(
+        self,
+        call: Callable[[], Awaitable[T]],
+        key: str = "default",
+        can_hedge: Optional[Callable[[], bool]] = None,
+    ) -> T:
+        """
+        Run `call()`, sending one identical hedge if it is slow.
+
+        Parameters
+        ----------
+        call : callable
+            Zero-argument coroutine factory performing the request *and*
+            parsing/validation, so that only a valid result can win.
+        key : str, optional
+            Latency bucket (e.g. the model tier).
+        can_hedge : callable, optional
+            Last-moment check (e.g. quota available right now) before hedging.
+
+        Returns
+        -------
+        T
+            The first successful result.
+
+        Raises
+        ------
+        Exception
+            The primary call's error if every started call failed.
+        """
+        self.budget.record_request()
+        self._count("primary")
+
+        primary = asyncio.ensure_future(self._timed(key, call, primary=True))
+        pending = {primary}
+        errors: list[BaseException] = []
+
+        try:
+            delay = self.hedge_delay(key)
+            if delay is not None:
+                done, _ = await asyncio.wait(pending, timeout=delay)
+                if not done:
+                    if not self.budget.try_spend():
+                        self._count("budget_denied")
+                    elif can_hedge is not None and not can_hedge():
+                        self._count("quota_denied")
+                    else:
+                        self._count("hedged")
+                        self.logger.info(f"Hedging '{key}' call after {delay:.2f}s.")
+                        pending.add(asyncio.ensure_future(self._timed(key, call, primary=False)))
+
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            self._count("hedge_won")
+                        return task.result()
+                    errors.append(task.exception())
+
+            raise errors[0]
+
+        finally:
+            # Cancel the loser (or everything, if we were cancelled ourselves)
+            for task in (primary, *pending):
+                if not task.done():
+                    task.cancel()
+
+    def stats(self) -> Dict[str, int]:
+        """Return primary calls, hedges sent, hedge wins and denials."""
+        with self._lock:
+            return {
+                name: self._counts[name]
+                for name in ("primary", "hedged", "hedge_won", "budget_denied", "quota_denied")
+            }
+
+
+# --------------------------------------------------------------
+# Shared Instance
+# --------------------------------------------------------------
+_hedger: Optional[Hedger] = None
+_hedger_lock = threading.Lock()
+
+
+def get_hedger() -> Optional[Hedger]:
+    """Return the process-wide hedger, or None if hedging is disabled."""
+    global _hedger
+
+    if not settings.HEDGING_ENABLED:
+        return None
+
+    with _hedger_lock:
+        if _hedger is None:
+            _hedger = Hedger()
+        return _hedger
@@ -0,0 +1,586 @@
+"""
+rate_limiter.py
+
+Token-bucket rate limiting for Groq calls in the LLMOps StudyBuddy project.
+
+Groq enforces per-key quotas on requests per minute (RPM) and tokens per
+minute (TPM). With several Streamlit sessions per pod and several pods, bursts
+easily exceed them and surface as 429s that users see as failed quizzes. This
+module lets callers wait their turn instead:
+
+- `estimate_tokens` estimates what a call will cost, from the formatted prompt
+  and the expected output size
+- `RateLimiter` holds an RPM bucket and a TPM bucket and queues callers in
+  FIFO order until both can pay, so no session is starved by a luckier one
+- `InMemoryBucketBackend` keeps bucket state in the process (per-pod limits)
+- `RedisBucketBackend` keeps it in Redis, so all replicas share one quota
+- `RateLimiter.stats()` reports queue depth and wait times
+- `background_priority()` marks calls as background work (e.g. prefetch
+  refills): they never join the FIFO queue and only take quota while nobody
+  is queued, so they cannot delay an interactive caller
+
+After a call, `reconcile` corrects the TPM bucket with the token usage the
+provider actually reported.
+"""
+
+# --------------------------------------------------------------
+# Imports
+# --------------------------------------------------------------
+from __future__ import annotations
+
+import asyncio
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Deque, Dict, Iterator, NamedTuple, Optional, Sequence
+
+from src.common.logger import get_logger
+from src.config.settings import settings
+
+# Rough characters-per-token ratio for English text with Llama tokenisers
+_CHARS_PER_TOKEN = 4
+
+# How often a queued caller re-checks its position (seconds)
+_POLL_INTERVAL = 0.05
+
+# True while the current call is background work (see `background_priority`)
+_background: ContextVar[bool] = ContextVar("studybuddy_background", default=False)
+
+
+@contextmanager
+def background_priority() -> Iterator[None]:
+    """
+    Mark every limiter acquisition made in this context as background work.
+
+    Background calls wait in a separate lane: they never join the FIFO
+    queue and only draw quota while no interactive caller is queued, so
+    retries of a background job cannot end up ahead of a user's request.
+    """
+    token = _background.set(True)
+    try:
+        yield
+    finally:
+        _background.reset(token)
+
+
+# --------------------------------------------------------------
+# Token Estimation
+# --------------------------------------------------------------
+def estimate_tokens(prompt: str, expected_output_tokens: int = 0) -> int:
+    """
+    Estimate the TPM cost of one chat completion.
+
+    Parameters
+    ----------
+    prompt : str
+        Formatted prompt sent to the model.
+    expected_output_tokens : int, optional
+        Expected completion size in tokens.
+
+    Returns
+    -------
+    int
+        Estimated prompt plus completion tokens (at least 1).
+    """
+    return max(1, math.ceil(len(prompt) / _CHARS_PER_TOKEN) + expected_output_tokens)
+
+
+def usage_tokens(response) -> Optional[int]:
+    """Return the total tokens reported on a LangChain response, if any."""
+    usage = getattr(response, "usage_metadata", None) or {}
+    total = usage.get("total_tokens")
+    return total if isinstance(total, int) else None
+
+
+class RateLimitTimeout(TimeoutError):
+    """Raised when a caller waits longer than its allowed time for quota."""
+
+
+# --------------------------------------------------------------
+# Bucket Backends
+# --------------------------------------------------------------
+class Bucket(NamedTuple):
+    """A token bucket: storage key, capacity and refill rate (tokens/second)."""
+
+    key: str
+    capacity: float
+    refill_per_second: float
+
+
+class InMemoryBucketBackend:
+    """
+    Process-local bucket storage.
+
+    Each pod enforces the limits on its own, so with several replicas the
+    configured limits should be each pod's share of the account quota.
+    Also serves as a local stand-in for `RedisBucketBackend`.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._state: Dict[str, list[float]] = {}
+
+    def _level(self, bucket: Bucket, now: float) -> list[float]:
+        """Return the refilled [tokens, timestamp] state. Caller holds the lock."""
+        state = self._state.setdefault(bucket.key, [bucket.capacity, now])
+        state[0] = min(bucket.capacity, state[0] + (now - state[1]) * bucket.refill_per_second)
+        state[1] = now
+        return state
+
+    def try_consume(self, buckets: Sequence[Bucket], costs: Sequence[float]) -> float:
+        """
+        Take `costs` from all `buckets` atomically if every bucket can pay.
+
+        Returns
+        -------
+        float
+            0.0 on success, otherwise the seconds until all buckets could pay.
+        """
+        with self._lock:
+            now = time.monotonic()
+            states = [self._level(bucket, now) for bucket in buckets]
+
+            wait = 0.0
+            for bucket, state, cost in zip(buckets, states, costs):
+                if state[0] < cost:
+                    wait = max(wait, (cost - state[0]) / bucket.refill_per_second)
+            if wait > 0:
+                return wait
+
+            for state, cost in zip(states, costs):
+                state[0] -= cost
+            return 0.0
+
+    def adjust(self, bucket: Bucket, delta: float) -> None:
+        """Add `delta` tokens (may be negative) to a bucket, capped at capacity."""
+        with self._lock:
+            state = self._level(bucket, time.monotonic())
+            state[0] = min(bucket.capacity, state[0] + delta)
+
+
+# Atomic multi-bucket consume. KEYS = bucket keys;
+# ARGV = capacity, rate, cost for each bucket in order.
+_REDIS_CONSUME = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local levels = {}
+local wait = 0
+for i = 1, #KEYS do
+    local cap = tonumber(ARGV[(i - 1) * 3 + 1])
+    local rate = tonumber(ARGV[(i - 1) * 3 + 2])
+    local cost = tonumber(ARGV[(i - 1) * 3 + 3])
+    local state = redis.call('HMGET', KEYS[i], 'tokens', 'ts')
+    local tokens = tonumber(state[1]) or cap
+    local ts = tonumber(state[2]) or now
+    tokens = math.min(cap, tokens + math.max(0, now - ts) * rate)
+    levels[i] = tokens
+    if tokens < cost then
+        wait = math.max(wait, (cost - tokens) / rate)
+    end
+end
+if wait > 0 then
+    return tostring(wait)
+end
+for i = 1, #KEYS do
+    local cap = tonumber(ARGV[(i - 1) * 3 + 1])
+    local rate = tonumber(ARGV[(i - 1) * 3 + 2])
+    local cost = tonumber(ARGV[(i - 1) * 3 + 3])
+    redis.call('HSET', KEYS[i], 'tokens', levels[i] - cost, 'ts', now)
+    redis.call('EXPIRE', KEYS[i], math.ceil(cap / rate) * 2)
+end
+return '0'
+"""
+
+# Refill a bucket, then add ARGV[3] tokens (capped). ARGV = capacity, rate, delta.
+_REDIS_ADJUST = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local cap = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or cap
+local ts = tonumber(state[2]) or now
+tokens = math.min(cap, tokens + math.max(0, now - ts) * rate + tonumber(ARGV[3]))
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(cap / rate) * 2)
+return 1
+"""
+
+
+class RedisBucketBackend:
+    """
+    Bucket storage shared by every replica through Redis.
+
+    Each operation is a single Lua script using the Redis server clock, so
+    concurrent pods cannot over-spend and clock skew between pods does not
+    matter. Requires the optional `redis` package.
+
+    Parameters
+    ----------
+    url : str
+        Redis connection URL, e.g. 'redis://redis:6379/0'.
+    """
+
+    def __init__(self, url: str) -> None:
+        try:
+            import redis
+        except ImportError as exc:
+            raise ImportError(
+                "RATE_LIMIT_BACKEND='redis' requires the 'redis' package."
+            ) from exc
+
+        self._client = redis.Redis.from_url(url)
+        self._consume = self._client.register_script(_REDIS_CONSUME)
+        self._adjust = self._client.register_script(_REDIS_ADJUST)
+
+    def try_consume(self, buckets: Sequence[Bucket], costs: Sequence[float]) -> float:
+        """Same contract as `InMemoryBucketBackend.try_consume`."""
+        args: list[float] = []
+        for bucket, cost in zip(buckets, costs):
+            args.extend((bucket.capacity, bucket.refill_per_second, cost))
+        return float(self._consume(keys=[bucket.key for bucket in buckets], args=args))
+
+    def adjust(self, bucket: Bucket, delta: float) -> None:
+        """Same contract as `InMemoryBucketBackend.adjust`."""
+        self._adjust(keys=[bucket.key], args=[bucket.capacity, bucket.refill_per_second, delta])
+
+
+# --------------------------------------------------------------
+# Rate Limiter
+# --------------------------------------------------------------
+class RateLimiter:
+    """
+    Fair RPM + TPM limiter for LLM calls.
+
+    Callers join a FIFO queue; only the caller at the head may draw from the
+    buckets, so a large request cannot be overtaken indefinitely by small
+    ones. Sync (`acquire`) and async (`aacquire`) callers share the queue.
+    Calls made under `background_priority()` wait outside the queue and are
+    served only while it is empty.
+
+    Parameters
+    ----------
+    requests_per_minute : float
+        RPM quota.
+    tokens_per_minute : float
+        TPM quota.
+    backend : InMemoryBucketBackend or RedisBucketBackend, optional
+        Where bucket state lives. Defaults to in-process storage.
+    namespace : str, optional
+        Prefix for bucket keys (lets several API keys share one Redis).
+    max_wait : float, optional
+        Longest a caller may queue before `RateLimitTimeout` is raised.
+
+    Methods
+    -------
+    acquire(tokens)
+        Block until the call may proceed; return the seconds waited.
+    aacquire(tokens)
+        Async variant of `acquire`.
+    try_acquire(tokens)
+        Take quota only if it is free right now; never waits.
+    reconcile(estimated, actual)
+        Correct the TPM bucket once real usage is known.
+    stats()
+        Queue depth and wait-time statistics.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float,
+        tokens_per_minute: float,
+        backend: Optional[InMemoryBucketBackend | RedisBucketBackend] = None,
+        namespace: str = "studybuddy:groq",
+        max_wait: Optional[float] = None,
+    ) -> None:
+        self.requests = Bucket(f"{namespace}:rpm", requests_per_minute, requests_per_minute / 60.0)
+        self.tokens = Bucket(f"{namespace}:tpm", tokens_per_minute, tokens_per_minute / 60.0)
+        self.backend = backend or InMemoryBucketBackend()
+        # Backends that do network I/O must not run on the event loop thread
+        self._blocking_backend = not isinstance(self.backend, InMemoryBucketBackend)
+        self.max_wait = settings.RATE_LIMIT_MAX_WAIT if max_wait is None else max_wait
+        self.logger = get_logger(self.__class__.__name__)
+
+        self._condition = threading.Condition()
+        self._queue: Deque[object] = deque()
+
+        # Observability counters (guarded by the condition's lock)
+        self._acquired = 0
+        self._timeouts = 0
+        self._total_wait = 0.0
+        self._max_wait_seen = 0.0
+
+    # ----------------------------------------------------------
+    # Queueing
+    # ----------------------------------------------------------
+    def _cost(self, tokens: int) -> list[float]:
+        """Costs for (RPM, TPM); oversized requests are clamped to capacity."""
+        return [1.0, float(min(tokens, self.tokens.capacity))]
+
+    def _try_head(self, ticket: object, tokens: int) -> float:
+        """
+        Try to pay for `ticket` if it is at the head of the queue.
+
+        Returns 0.0 once paid (the ticket is dequeued), otherwise how long to
+        wait before checking again. Caller holds the condition's lock.
+        """
+        if self._queue[0] is not ticket:
+            return _POLL_INTERVAL
+
+        wait = self.backend.try_consume((self.requests, self.tokens), self._cost(tokens))
+        if wait == 0.0:
+            self._queue.popleft()
+            # Wake the next caller in line
+            self._condition.notify_all()
+        return wait
+
+    def _record(self, waited: float) -> float:
+        """Update wait statistics. Caller holds the condition's lock."""
+        self._acquired += 1
+        self._total_wait += waited
+        self._max_wait_seen = max(self._max_wait_seen, waited)
+        if waited >= 1.0:
+            self.logger.info(
+                f"Rate limiter delayed call by {waited:.1f}s "
+                f"(queue depth {len(self._queue)})."
+            )
+        return waited
+
+    def _give_up(self, ticket: object, waited: float) -> RateLimitTimeout:
+        """Leave the queue after a timeout. Caller holds the condition's lock."""
+        self._queue.remove(ticket)
+        self._timeouts += 1
+        self._condition.notify_all()
+        return RateLimitTimeout(
+            f"Waited {waited:.1f}s for LLM quota (queue depth {len(self._queue)})."
+        )
+
+    def acquire(self, tokens: int) -> float:
+        """
+        Block until one request costing `tokens` fits within both quotas.
+
+        Parameters
+        ----------
+        tokens : int
+            Estimated tokens for the call (see `estimate_tokens`).
+
+        Returns
+        -------
+        float
+            Seconds spent waiting.
+
+        Raises
+        ------
+        RateLimitTimeout
+            If quota did not become available within `max_wait` seconds.
+        """
+        if _background.get():
+            return self._acquire_idle(tokens)
+
+        ticket = object()
+        start = time.monotonic()
+
+        with self._condition:
+            self._queue.append(ticket)
+            try:
+                while True:
+                    wait = self._try_head(ticket, tokens)
+                    waited = time.monotonic() - start
+                    if wait == 0.0:
+                        return self._record(waited)
+                    if waited + wait > self.max_wait:
+                        raise self._give_up(ticket, waited)
+                    self._condition.wait(wait)
+            except BaseException:
+                # Interrupted while queued -> do not block the callers behind us
+                if ticket in self._queue:
+                    self._queue.remove(ticket)
+                    self._condition.notify_all()
+                raise
+
+    def _acquire_idle(self, tokens: int) -> float:
+        """
+        Background lane of `acquire`: wait until nobody is queued and quota is free.
+
+        Raises
+        ------
+        RateLimitTimeout
+            If no idle quota turned up within `max_wait` seconds.
+        """
+        start = time.monotonic()
+
+        with self._condition:
+            while True:
+                if self._queue:
+                    # Interactive callers are waiting -> stay out of their way
+                    wait = _POLL_INTERVAL
+                else:
+                    wait = self.backend.try_consume((self.requests, self.tokens), self._cost(tokens))
+                waited = time.monotonic() - start
+                if wait == 0.0:
+                    return self._record(waited)
+                if waited + wait > self.max_wait:
+                    self._timeouts += 1
+                    raise RateLimitTimeout(f"Background call waited {waited:.1f}s for idle LLM quota.")
+                self._condition.wait(wait)
+
+    def _async_step(self, ticket: object, tokens: int, start: float) -> Optional[float]:
+        """
+        One `aacquire` attempt: None once paid, otherwise the seconds to wait.
+
+        Raises
+        ------
+        RateLimitTimeout
+            If quota cannot become available within `max_wait`.
+        """
+        with self._condition:
+            wait = self._try_head(ticket, tokens)
+            waited = time.monotonic() - start
+            if wait == 0.0:
+                self._record(waited)
+                return None
+            if waited + wait > self.max_wait:
+                raise self._give_up(ticket, waited)
+            return wait
+
+    async def aacquire(self, tokens: int) -> float:
+        """
+        Async variant of `acquire`; waits with `asyncio.sleep`.
+
+        With the Redis backend the limiter's lock is held across network
+        round-trips, so every step that takes it runs in a worker thread and
+        the shared event loop never blocks on Redis. Cancelling the awaiting
+        task removes it from the queue.
+        """
+        if _background.get():
+            # Rare (background work is threaded); wait in a worker thread
+            return await asyncio.to_thread(self._acquire_idle, tokens)
+
+        ticket = object()
+        start = time.monotonic()
+
+        # deque.append is thread-safe; joining the queue needs no lock
+        self._queue.append(ticket)
+
+        try:
+            while True:
+                if self._blocking_backend:
+                    wait = await asyncio.to_thread(self._async_step, ticket, tokens, start)
+                else:
+                    wait = self._async_step(ticket, tokens, start)
+                if wait is None:
+                    return time.monotonic() - start
+                # Poll so a sync caller finishing ahead of us is noticed promptly
+                await asyncio.sleep(min(wait, _POLL_INTERVAL * 4))
+        except BaseException:
+            if self._blocking_backend:
+                asyncio.get_running_loop().run_in_executor(None, self._leave, ticket)
+            else:
+                self._leave(ticket)
+            raise
+
+    def _leave(self, ticket: object) -> None:
+        """Drop an abandoned ticket and wake the callers behind it."""
+        with self._condition:
+            if ticket in self._queue:
+                self._queue.remove(ticket)
+                self._condition.notify_all()
+
+    def try_acquire(self, tokens: int) -> bool:
+        """
+        Take quota only if it is available right now and nobody is queued.
+
+        Used for optional traffic (e.g. hedged requests) that should never
+        delay or overtake regular callers.
+        """
+        with self._condition:
+            if self._queue:
+                return False
+            if self.backend.try_consume((self.requests, self.tokens), self._cost(tokens)) > 0:
+                return False
+            self._record(0.0)
+            return True
+
+    def reconcile(self, estimated: int, actual: Optional[int]) -> None:
+        """
+        Correct the TPM bucket once the provider reports real usage.
+
+        Parameters
+        ----------
+        estimated : int
+            Tokens charged by `acquire`.
+        actual : int or None
+            Tokens reported by the provider; nothing happens if unknown.
+        """
+        if actual is None or actual == estimated:
+            return
+
+        if self._blocking_backend:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                loop = None
+            if loop is not None:
+                # Called from the event loop -> correct the bucket off-thread
+                loop.run_in_executor(None, self.backend.adjust, self.tokens, estimated - actual)
+                return
+        self.backend.adjust(self.tokens, estimated - actual)
+
+    # ----------------------------------------------------------
+    # Observability
+    # ----------------------------------------------------------
+    def stats(self) -> Dict[str, float]:
+        """
+        Return queue depth and wait-time statistics.
+
+        Returns
+        -------
+        dict
+            'queue_depth', 'acquired', 'timeouts', 'mean_wait_seconds' and
+            'max_wait_seconds'.
+        """
+        with self._condition:
+            return {
+                "queue_depth": len(self._queue),
+                "acquired": self._acquired,
+                "timeouts": self._timeouts,
+                "mean_wait_seconds": self._total_wait / self._acquired if self._acquired else 0.0,
+                "max_wait_seconds": self._max_wait_seen,
+            }
+
+
+# --------------------------------------------------------------
+# Shared Instance
+# --------------------------------------------------------------
+_limiter: Optional[RateLimiter] = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> Optional[RateLimiter]:
+    """
+    Return the process-wide rate limiter, or None if rate limiting is disabled.
+
+    The backend is chosen by `settings.RATE_LIMIT_BACKEND` ('memory' or
+    'redis').
+    """
+    global _limiter
+
+    if not settings.RATE_LIMIT_ENABLED:
+        return None
+
+    with _limiter_lock:
+        if _limiter is None:
+            backend = (
+                RedisBucketBackend(settings.RATE_LIMIT_REDIS_URL)
+                if settings.RATE_LIMIT_BACKEND == "redis"
+                else InMemoryBucketBackend()
+            )
+            _limiter = RateLimiter(
+                requests_per_minute=settings.GROQ_REQUESTS_PER_MINUTE,
+                tokens_per_minute=settings.GROQ_TOKENS_PER_MINUTE,
+                backend=backend,
+            )
+        return _limiter
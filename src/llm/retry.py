@@ -0,0 +1,363 @@
+"""
+retry.py
+
+Error-aware retry policy for LLM calls in the LLMOps StudyBuddy project.
+
+Not every failure deserves the same retry. A 429 from Groq should wait for
+the provider's `Retry-After` hint, a 5xx or timeout should back off with
+jitter, and a parse or validation failure should simply try again (the model
+produced bad content; the service itself is healthy). Authentication and
+other client errors should not be retried at all.
+
+This module provides:
+- `classify_error`, mapping an exception to a `FailureClass`
+- `RetryBudget`, a process-wide token bucket that caps retries to a fraction
+  of first attempts, so a provider brown-out cannot multiply outbound load
+- `RetryPolicy`, which combines both to decide whether and when to retry
+- `retry_stats`, per-class counters showing where retries go
+"""
+
+# --------------------------------------------------------------
+# Imports
+# --------------------------------------------------------------
+from __future__ import annotations
+
+import json
+import random
+import threading
+import time
+from collections import Counter
+from email.utils import parsedate_to_datetime
+from enum import Enum
+from typing import Dict, Iterator, Optional
+
+from pydantic import ValidationError
+
+from src.config.settings import settings
+
+
+# --------------------------------------------------------------
+# Failure Classification
+# --------------------------------------------------------------
+class FailureClass(str, Enum):
+    """Categories of generation failures, each with its own retry behaviour."""
+
+    RATE_LIMIT = "rate_limit"
+    TIMEOUT = "timeout"
+    SERVER_ERROR = "server_error"
+    PARSE_ERROR = "parse_error"
+    VALIDATION_ERROR = "validation_error"
+    CLIENT_ERROR = "client_error"
+    UNKNOWN = "unknown"
+
+
+# Failures that indicate the provider is struggling -> back off
+_BACKOFF_CLASSES = {FailureClass.RATE_LIMIT, FailureClass.TIMEOUT, FailureClass.SERVER_ERROR}
+
+# Failures that will not succeed on retry
+_FATAL_CLASSES = {FailureClass.CLIENT_ERROR}
+
+
+def _exception_chain(exc: BaseException) -> Iterator[BaseException]:
+    """Yield an exception followed by its causes/contexts (cycle-safe)."""
+    seen: set[int] = set()
+    current: Optional[BaseException] = exc
+    while current is not None and id(current) not in seen:
+        seen.add(id(current))
+        yield current
+        current = current.__cause__ or current.__context__
+
+
+def _status_code(exc: BaseException) -> Optional[int]:
+    """Return the HTTP status code attached to an exception, if any."""
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        status = getattr(getattr(exc, "response", None), "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def classify_error(exc: BaseException) -> FailureClass:
+    """
+    Map an exception raised while generating a question to a failure class.
+
+    Parameters
+    ----------
+    exc : BaseException
+        The exception to classify; its cause chain is inspected as well.
+
+    Returns
+    -------
+    FailureClass
+        The best matching category.
+    """
+    for current in _exception_chain(exc):
+        status = _status_code(current)
+        if status == 429:
+            return FailureClass.RATE_LIMIT
+        if status in (408, 504):
+            return FailureClass.TIMEOUT
+        if status is not None and status >= 500:
+            return FailureClass.SERVER_ERROR
+        if status is not None and status >= 400:
+            return FailureClass.CLIENT_ERROR
+
+        # Timeouts and dropped connections are transient network failures
+        name = type(current).__name__
+        if isinstance(current, TimeoutError) or "Timeout" in name or "Connection" in name:
+            return FailureClass.TIMEOUT
+
+        if isinstance(current, ValidationError):
+            return FailureClass.VALIDATION_ERROR
+
+    # Imported here so that importing the retry policy stays cheap
+    from langchain_core.exceptions import OutputParserException
+
+    # Parse failures are checked after the whole chain so that a wrapped
+    # pydantic ValidationError is reported as a validation error
+    for current in _exception_chain(exc):
+        if isinstance(current, (OutputParserException, json.JSONDecodeError)):
+            return FailureClass.PARSE_ERROR
+        if isinstance(current, ValueError):
+            return FailureClass.VALIDATION_ERROR
+
+    return FailureClass.UNKNOWN
+
+
+def retry_after_seconds(exc: BaseException) -> Optional[float]:
+    """
+    Extract the provider's `Retry-After` hint from an exception, if present.
+
+    Supports `retry-after-ms`, `retry-after` in seconds, and `retry-after`
+    as an HTTP date.
+
+    Returns
+    -------
+    float or None
+        Seconds to wait, or None if the response carried no hint.
+    """
+    for current in _exception_chain(exc):
+        headers = getattr(getattr(current, "response", None), "headers", None)
+        if not headers:
+            continue
+
+        value = headers.get("retry-after-ms")
+        if value:
+            try:
+                return float(value) / 1000.0
+            except ValueError:
+                pass
+
+        value = headers.get("retry-after")
+        if value:
+            try:
+                return float(value)
+            except ValueError:
+                try:
+                    return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+                except (TypeError, ValueError):
+                    pass
+    return None
+
+
+# --------------------------------------------------------------
+# Retry Budget
+# --------------------------------------------------------------
+class RetryBudget:
+    """
+    Token bucket limiting retries to a fraction of first attempts.
+
+    Each first attempt deposits `ratio` tokens and each retry withdraws one.
+    A small time-based trickle (`min_per_second`) keeps low-traffic processes
+    able to retry at all.
+
+    Parameters
+    ----------
+    ratio : float
+        Retries allowed per first attempt (e.g. 0.2 -> at most 20% extra load).
+    min_per_second : float
+        Tokens added per second regardless of traffic.
+    max_tokens : float
+        Bucket capacity.
+    """
+
+    def __init__(self, ratio: float, min_per_second: float, max_tokens: float) -> None:
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.max_tokens = max_tokens
+        self._tokens = max_tokens
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        """Add the time-based trickle. Caller holds the lock."""
+        now = time.monotonic()
+        self._tokens = min(
+            self.max_tokens,
+            self._tokens + (now - self._updated) * self.min_per_second,
+        )
+        self._updated = now
+
+    def record_request(self) -> None:
+        """Deposit tokens for a first attempt."""
+        with self._lock:
+            self._refill()
+            self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        """Withdraw one token for a retry; return False if the budget is exhausted."""
+        with self._lock:
+            self._refill()
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                return True
+            return False
+
+    @property
+    def available(self) -> float:
+        """Tokens currently available."""
+        with self._lock:
+            self._refill()
+            return self._tokens
+
+
+# --------------------------------------------------------------
+# Retry Statistics
+# --------------------------------------------------------------
+class RetryStats:
+    """
+    Thread-safe per-class counters for failures, retries and give-ups.
+
+    `snapshot()` returns a plain dictionary suitable for logging or export.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._failures: Counter = Counter()
+        self._retries: Counter = Counter()
+        self._budget_denied: Counter = Counter()
+
+    def record(self, failure: FailureClass, retried: bool, budget_denied: bool = False) -> None:
+        """Record one failure and whether it was retried."""
+        with self._lock:
+            self._failures[failure.value] += 1
+            if retried:
+                self._retries[failure.value] += 1
+            if budget_denied:
+                self._budget_denied[failure.value] += 1
+
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        """Return counters keyed by failure class."""
+        with self._lock:
+            return {
+                failure.value: {
+                    "failures": self._failures[failure.value],
+                    "retries": self._retries[failure.value],
+                    "budget_denied": self._budget_denied[failure.value],
+                }
+                for failure in FailureClass
+            }
+
+
+# --------------------------------------------------------------
+# Retry Policy
+# --------------------------------------------------------------
+class RetryPolicy:
+    """
+    Decide whether to retry a failed attempt and how long to wait first.
+
+    Parameters
+    ----------
+    max_attempts : int
+        Total attempts allowed per generation (first attempt included).
+    base_delay : float
+        Base delay in seconds for exponential backoff.
+    max_delay : float
+        Upper bound on any single backoff delay.
+    budget : RetryBudget
+        Shared retry budget.
+    stats : RetryStats
+        Counters updated for every failure.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int,
+        base_delay: float,
+        max_delay: float,
+        budget: RetryBudget,
+        stats: RetryStats,
+    ) -> None:
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget = budget
+        self.stats = stats
+
+    def on_first_attempt(self) -> None:
+        """Register a first attempt with the retry budget."""
+        self.budget.record_request()
+
+    def next_delay(self, exc: BaseException, attempt: int) -> tuple[FailureClass, Optional[float]]:
+        """
+        Classify a failure and compute the delay before the next attempt.
+
+        Parameters
+        ----------
+        exc : BaseException
+            The failure raised by attempt number `attempt` (0-based).
+        attempt : int
+            Index of the attempt that failed.
+
+        Returns
+        -------
+        tuple of (FailureClass, float or None)
+            The failure class, and the seconds to sleep before retrying, or
+            None if the caller should give up.
+        """
+        failure = classify_error(exc)
+
+        # Out of attempts or not worth retrying
+        if attempt + 1 >= self.max_attempts or failure in _FATAL_CLASSES:
+            self.stats.record(failure, retried=False)
+            return failure, None
+
+        # Process-wide budget protects the provider during brown-outs
+        if not self.budget.try_spend():
+            self.stats.record(failure, retried=False, budget_denied=True)
+            return failure, None
+
+        self.stats.record(failure, retried=True)
+
+        if failure not in _BACKOFF_CLASSES:
+            # Bad content from a healthy service -> retry straight away
+            return failure, 0.0
+
+        # Exponential backoff with full jitter
+        delay = random.uniform(0.0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+        # Never retry earlier than the provider asked us to
+        hint = retry_after_seconds(exc)
+        if hint is not None:
+            delay = max(delay, min(hint, self.max_delay))
+
+        return failure, delay
+
+
+# --------------------------------------------------------------
+# Shared Instances
+# --------------------------------------------------------------
+retry_budget = RetryBudget(
+    ratio=settings.RETRY_BUDGET_RATIO,
+    min_per_second=settings.RETRY_BUDGET_MIN_PER_SECOND,
+    max_tokens=settings.RETRY_BUDGET_MAX_TOKENS,
+)
+
+retry_stats = RetryStats()
+
+retry_policy = RetryPolicy(
+    max_attempts=settings.MAX_RETRIES,
+    base_delay=settings.RETRY_BASE_DELAY,
+    max_delay=settings.RETRY_MAX_DELAY,
+    budget=retry_budget,
+    stats=retry_stats,
+)
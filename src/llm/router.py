@@ -0,0 +1,265 @@
+"""
+router.py
+
+Difficulty- and load-aware model routing for the LLMOps StudyBuddy project.
+
+Sending every request to the largest model wastes latency and quota on
+"Easy" questions a small model handles well. `ModelRouter` maps a request's
+(question kind, difficulty) to a model tier using a configurable routing
+table, with two adjustments:
+
+- Pressure: when the rate limiter queue is long or the large tier is slow,
+  unprotected difficulties are sent to the cheapest tier. Slowness is judged
+  on recent latency *per requested question*, so batched calls for 5-10
+  questions do not look slow just for being large, and samples expire so
+  the signal recovers once the large tier stops receiving traffic
+- Escalation: when a tier's output fails parsing or validation, the next
+  attempt moves up to the next tier
+
+Per-tier latency percentiles, success rates and escalations are recorded in
+`TierMetrics`, so routing decisions can be checked against real traffic.
+"""
+
+# --------------------------------------------------------------
+# Imports
+# --------------------------------------------------------------
+from __future__ import annotations
+
+import threading
+import time
+from collections import Counter, deque
+from typing import Any, Callable, Deque, Dict, Optional, Sequence, Tuple
+
+from src.common.logger import get_logger
+from src.config.settings import settings
+from src.config.topics import question_kind
+from src.llm.groq_client import get_groq_llm
+from src.llm.rate_limiter import RateLimiter, get_rate_limiter
+from src.llm.retry import FailureClass, classify_error
+
+# Failures that mean "the model produced bad content" -> try a stronger model
+_ESCALATING_FAILURES = {FailureClass.PARSE_ERROR, FailureClass.VALIDATION_ERROR}
+
+# Recent latencies kept per tier for percentile estimates
+_LATENCY_WINDOW = 200
+
+
+# --------------------------------------------------------------
+# Tier Metrics
+# --------------------------------------------------------------
+class TierMetrics:
+    """
+    Thread-safe per-tier call counters and rolling latency percentiles.
+
+    Latencies are stored per requested question (a 10-question batch that
+    took 8 s counts as 0.8 s), with the time they were recorded.
+
+    `snapshot()` returns, for every tier seen so far: calls, successes,
+    failures, escalations (away from the tier), success rate and p50/p95
+    latency per question in seconds.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counts: Dict[str, Counter] = {}
+        # (recorded at, seconds per question)
+        self._latencies: Dict[str, Deque[Tuple[float, float]]] = {}
+
+    def _tier(self, tier: str) -> Counter:
+        """Return the counters for a tier, creating them. Caller holds the lock."""
+        if tier not in self._counts:
+            self._counts[tier] = Counter()
+            self._latencies[tier] = deque(maxlen=_LATENCY_WINDOW)
+        return self._counts[tier]
+
+    def record(self, tier: str, latency: float, success: bool, questions: int = 1) -> None:
+        """Record one call to a tier that requested `questions` questions."""
+        with self._lock:
+            counts = self._tier(tier)
+            counts["calls"] += 1
+            counts["successes" if success else "failures"] += 1
+            self._latencies[tier].append((time.monotonic(), latency / max(1, questions)))
+
+    def record_escalation(self, tier: str) -> None:
+        """Record that a request escalated away from `tier`."""
+        with self._lock:
+            self._tier(tier)["escalations"] += 1
+
+    def percentile(
+        self,
+        tier: str,
+        q: float,
+        max_age: Optional[float] = None,
+        min_samples: int = 1,
+    ) -> Optional[float]:
+        """
+        Return the `q` quantile (0-1) of per-question latencies.
+
+        Only samples younger than `max_age` seconds count (all, if None).
+        Returns None if fewer than `min_samples` samples qualify.
+        """
+        cutoff = None if max_age is None else time.monotonic() - max_age
+        with self._lock:
+            samples = sorted(
+                latency
+                for recorded, latency in self._latencies.get(tier, ())
+                if cutoff is None or recorded >= cutoff
+            )
+        if not samples or len(samples) < min_samples:
+            return None
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """Return per-tier counters, success rate and latency percentiles."""
+        with self._lock:
+            tiers = list(self._counts)
+            counts = {tier: dict(self._counts[tier]) for tier in tiers}
+
+        snapshot = {}
+        for tier in tiers:
+            calls = counts[tier].get("calls", 0)
+            snapshot[tier] = {
+                "calls": calls,
+                "successes": counts[tier].get("successes", 0),
+                "failures": counts[tier].get("failures", 0),
+                "escalations": counts[tier].get("escalations", 0),
+                "success_rate": counts[tier].get("successes", 0) / calls if calls else 0.0,
+                "p50_seconds": self.percentile(tier, 0.5) or 0.0,
+                "p95_seconds": self.percentile(tier, 0.95) or 0.0,
+            }
+        return snapshot
+
+
+# --------------------------------------------------------------
+# Model Router
+# --------------------------------------------------------------
+class ModelRouter:
+    """
+    Choose a model tier per request and escalate on bad output.
+
+    Parameters
+    ----------
+    tiers : dict, optional
+        Tier name -> model name. Defaults to `settings.MODEL_TIERS`.
+    routes : dict, optional
+        '<kind>:<difficulty>' -> tier, where kind is 'mcq' or 'fill_blank'
+        and '*' matches any kind. Defaults to `settings.MODEL_ROUTES`.
+    order : sequence of str, optional
+        Tiers from cheapest to strongest; escalation follows this order.
+    llm_factory : callable, optional
+        Builds a chat model from a model name. Defaults to `get_groq_llm`.
+    rate_limiter : RateLimiter, optional
+        Limiter whose queue depth signals pressure.
+
+    Methods
+    -------
+    route(question_type, difficulty)
+        Return the tier for a request.
+    escalate(tier, exc)
+        Return the tier for the next attempt after a failure.
+    llm(tier)
+        Return the chat model serving a tier.
+    """
+
+    def __init__(
+        self,
+        tiers: Optional[Dict[str, str]] = None,
+        routes: Optional[Dict[str, str]] = None,
+        order: Optional[Sequence[str]] = None,
+        llm_factory: Callable[..., Any] = get_groq_llm,
+        rate_limiter: Optional[RateLimiter] = None,
+    ) -> None:
+        self.tiers = tiers or settings.MODEL_TIERS
+        self.routes = {key.lower(): tier for key, tier in (routes or settings.MODEL_ROUTES).items()}
+        self.order = list(order or settings.MODEL_TIER_ORDER)
+        self.llm_factory = llm_factory
+        self.rate_limiter = rate_limiter
+        self.metrics = TierMetrics()
+        self.logger = get_logger(self.__class__.__name__)
+
+    def under_pressure(self) -> bool:
+        """
+        True if the limiter queue is long or the strongest tier is slow.
+
+        Slowness is the p50 latency per requested question over the last
+        `MODEL_PRESSURE_SAMPLE_MAX_AGE` seconds. Once load is shed, the tier
+        gets fewer samples; old ones expire, so shedding stops on its own.
+        """
+        if self.rate_limiter is not None:
+            if self.rate_limiter.stats()["queue_depth"] >= settings.MODEL_PRESSURE_QUEUE_DEPTH:
+                return True
+
+        p50 = self.metrics.percentile(
+            self.order[-1],
+            0.5,
+            max_age=settings.MODEL_PRESSURE_SAMPLE_MAX_AGE,
+            min_samples=settings.MODEL_PRESSURE_MIN_SAMPLES,
+        )
+        return p50 is not None and p50 >= settings.MODEL_PRESSURE_LATENCY_P50
+
+    def route(self, question_type: str, difficulty: str) -> str:
+        """
+        Return the tier for a (question type, difficulty) request.
+
+        Unknown combinations go to the strongest tier.
+        """
+        kind = question_kind(question_type)
+        difficulty = difficulty.lower()
+        tier = (
+            self.routes.get(f"{kind}:{difficulty}")
+            or self.routes.get(f"*:{difficulty}")
+            or self.order[-1]
+        )
+
+        # Shed load to the cheapest tier, but never for protected difficulties
+        if (
+            tier != self.order[0]
+            and difficulty not in settings.MODEL_PRESSURE_PROTECTED
+            and self.under_pressure()
+        ):
+            self.logger.info(f"Routing {kind}:{difficulty} to '{self.order[0]}' under pressure.")
+            return self.order[0]
+
+        return tier
+
+    def escalate(self, tier: str, exc: BaseException) -> str:
+        """
+        Return the tier for the next attempt after `exc`.
+
+        Bad content (parse/validation failures) moves up one tier; provider
+        errors stay on the same tier and are handled by the retry policy.
+        """
+        if classify_error(exc) not in _ESCALATING_FAILURES or tier not in self.order:
+            return tier
+
+        index = self.order.index(tier)
+        if index + 1 >= len(self.order):
+            return tier
+
+        self.metrics.record_escalation(tier)
+        self.logger.info(f"Escalating from '{tier}' to '{self.order[index + 1]}' after bad output.")
+        return self.order[index + 1]
+
+    def llm(self, tier: str) -> Any:
+        """Return the (shared) chat model serving a tier."""
+        return self.llm_factory(model=self.tiers[tier])
+
+
+# --------------------------------------------------------------
+# Shared Instance
+# --------------------------------------------------------------
+_router: Optional[ModelRouter] = None
+_router_lock = threading.Lock()
+
+
+def get_model_router() -> Optional[ModelRouter]:
+    """Return the process-wide router, or None if routing is disabled."""
+    global _router
+
+    if not settings.MODEL_ROUTING_ENABLED:
+        return None
+
+    with _router_lock:
+        if _router is None:
+            _router = ModelRouter(rate_limiter=get_rate_limiter())
+        return _router
@@ -0,0 +1,173 @@
+"""
+structured.py
+
+Provider-native structured output for the LLMOps StudyBuddy project.
+
+Asking for "ONLY a JSON object" in plain text means every malformed answer
+costs a retry. `StructuredCaller` instead calls the chat model through
+`with_structured_output` (tool/function calling, JSON mode or JSON schema),
+with the schema derived from the question's Pydantic model, and returns the
+result as JSON text for the generator's usual parse-and-validate step.
+
+If the provider cannot produce a valid object, the caller falls back to the
+text the model did produce: the raw message content, the tool-call
+arguments, or the `failed_generation` Groq attaches to a rejected tool call.
+Only when nothing usable is left does the attempt fail as a parse error.
+
+`parse_stats` counts parse outcomes per mode ('structured' / 'text'), so the
+failure rates of the two modes can be compared in logs and metrics.
+"""
+
+# --------------------------------------------------------------
+# Imports
+# --------------------------------------------------------------
+from __future__ import annotations
+
+import json
+import threading
+from collections import Counter
+from typing import Any, Dict, Optional, Tuple, Type
+
+from langchain_core.exceptions import OutputParserException
+from pydantic import BaseModel
+
+# Methods accepted by `with_structured_output`
+STRUCTURED_METHODS = ("function_calling", "json_mode", "json_schema")
+
+
+# --------------------------------------------------------------
+# Parse Statistics
+# --------------------------------------------------------------
+class ParseStats:
+    """
+    Thread-safe counters of parse outcomes per mode.
+
+    Outcomes:
+    - 'ok'       : the response parsed and validated directly
+    - 'fallback' : structured output failed, recovered from the text path
+    - 'failed'   : the attempt produced no valid question
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counts: Dict[str, Counter] = {}
+
+    def record(self, mode: str, outcome: str) -> None:
+        """Record one attempt's outcome."""
+        with self._lock:
+            self._counts.setdefault(mode, Counter())[outcome] += 1
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """Return outcome counts and the failure rate per mode."""
+        with self._lock:
+            snapshot = {}
+            for mode, counts in self._counts.items():
+                total = sum(counts.values())
+                snapshot[mode] = {
+                    **counts,
+                    "failure_rate": counts["failed"] / total if total else 0.0,
+                }
+            return snapshot
+
+
+parse_stats = ParseStats()
+
+
+# --------------------------------------------------------------
+# Structured Caller
+# --------------------------------------------------------------
+def failed_generation(exc: BaseException) -> Optional[str]:
+    """Return the text of a tool call Groq rejected (400 'tool_use_failed'), if any."""
+    body = getattr(exc, "body", None)
+    if isinstance(body, dict):
+        error = body.get("error", body)
+        if isinstance(error, dict) and isinstance(error.get("failed_generation"), str):
+            return error["failed_generation"]
+    return None
+
+
+class StructuredCaller:
+    """
+    Call chat models in structured-output mode.
+
+    Parameters
+    ----------
+    method : str
+        'function_calling', 'json_mode' or 'json_schema'.
+
+    Methods
+    -------
+    supports(llm)
+        True if the model offers `with_structured_output`.
+    invoke(llm, prompt, schema) / ainvoke(llm, prompt, schema)
+        Return (raw message or None, JSON text, native), where `native` is
+        True if the provider itself returned a valid object.
+    """
+
+    def __init__(self, method: str) -> None:
+        if method not in STRUCTURED_METHODS:
+            raise ValueError(f"Unknown structured output method '{method}'.")
+        self.method = method
+        self._lock = threading.Lock()
+        self._runnables: Dict[Tuple[int, Type[BaseModel]], Any] = {}
+
+    @staticmethod
+    def supports(llm: Any) -> bool:
+        """True if `llm` can produce structured output (test doubles may not)."""
+        return hasattr(llm, "with_structured_output")
+
+    def _runnable(self, llm: Any, schema: Type[BaseModel]) -> Any:
+        """Return the (cached) structured runnable for a model and schema."""
+        key = (id(llm), schema)
+        with self._lock:
+            runnable = self._runnables.get(key)
+            if runnable is None:
+                runnable = llm.with_structured_output(schema, method=self.method, include_raw=True)
+                self._runnables[key] = runnable
+            return runnable
+
+    @staticmethod
+    def _unpack(result: Dict[str, Any]) -> Tuple[Any, str, bool]:
+        """Turn an `include_raw` result into (raw, JSON text, native)."""
+        raw, parsed = result.get("raw"), result.get("parsed")
+        if isinstance(parsed, BaseModel):
+            return raw, parsed.model_dump_json(), True
+
+        # Provider output did not match the schema: hand its text to the text path
+        tool_calls = getattr(raw, "tool_calls", None) or []
+        if tool_calls:
+            return raw, json.dumps(tool_calls[0].get("args", {})), False
+        return raw, getattr(raw, "content", "") or "", False
+
+    @staticmethod
+    def _rejected(exc: BaseException) -> Tuple[None, str, bool]:
+        """Recover from a 400 rejection of the model's tool call, or raise a parse error."""
+        text = failed_generation(exc)
+        if text is None:
+            raise OutputParserException(f"Structured output rejected by the provider: {exc}")
+        return None, text, False
+
+    def invoke(self, llm: Any, prompt: Any, schema: Type[BaseModel]) -> Tuple[Any, str, bool]:
+        """Call `llm` in structured mode (blocking)."""
+        rejection = None
+        try:
+            return self._unpack(self._runnable(llm, schema).invoke(prompt))
+        except Exception as exc:
+            # Malformed tool calls come back as HTTP 400; everything else is
+            # a provider error for the retry policy
+            if getattr(exc, "status_code", None) != 400:
+                raise
+            rejection = exc
+        # Raised outside the except block so the 400 is not in the cause chain
+        return self._rejected(rejection)
+
+    async def ainvoke(self, llm: Any, prompt: Any, schema: Type[BaseModel]) -> Tuple[Any, str, bool]:
+        """Async variant of `invoke`."""
+        rejection = None
+        try:
+            return self._unpack(await self._runnable(llm, schema).ainvoke(prompt))
+        except Exception as exc:
+            if getattr(exc, "status_code", None) != 400:
+                raise
+            rejection = exc
+        return self._rejected(rejection)
@@ -5,9 +5,14 @@ Pydantic models for representing question schemas in the LLMOps StudyBuddy proje
 
 This module defines structured data models for different question types used
 by the StudyBuddy system, such as multiple-choice questions (MCQs) and
-fill-in-the-blank questions. The models provide validation and light
-normalisation of question text to ensure consistent handling across the
-application.
+fill-in-the-blank questions, plus batch containers used when several
+questions are requested in a single LLM call. The models provide validation
+and light normalisation of question text to ensure consistent handling across
+the application.
+
+Validators use the Pydantic v2 API (`field_validator`), and the module-level
+`TypeAdapter`s validate a whole list of questions in one call, which is what
+batch responses need on every attempt.
 """
 
 # --------------------------------------------------------------
@@ -18,8 +23,11 @@ from __future__ import annotations
 # Standard library typing tools
 from typing import List
 
-# Pydantic base model and field utilities
-from pydantic import BaseModel, Field, validator
+# Pydantic base model, field utilities and list adapters
+from pydantic import BaseModel, Field, TypeAdapter, field_validator
+
+# Keys that may hold the question text when the model nests it in an object
+_QUESTION_TEXT_KEYS = ("text", "question", "description", "content", "prompt")
 
 
 # --------------------------------------------------------------
@@ -55,13 +63,16 @@ class MCQQuestion(BaseModel):
     )
 
     # Normalises question input when it is provided as a dictionary
-    @validator("question", pre=True)
+    @field_validator("question", mode="before")
+    @classmethod
     def clean_question(cls, v: object) -> str:
         """
         Normalise the question field when initialised.
 
-        If the incoming question value is a dictionary, it attempts to extract
-        a 'description' field; otherwise, it converts the value to a string.
+        If the incoming question value is a dictionary, it extracts the first
+        string found under a common text key ('text', 'question',
+        'description', 'content', 'prompt'); otherwise, it converts the value
+        to a string.
 
         Parameters
         ----------
@@ -76,7 +87,10 @@ class MCQQuestion(BaseModel):
             The normalised question text.
         """
         if isinstance(v, dict):
-            return v.get("description", str(v))
+            for key in _QUESTION_TEXT_KEYS:
+                if isinstance(v.get(key), str):
+                    return v[key]
+            return str(v)
         return str(v)
 
 
@@ -110,13 +124,16 @@ class FillBlankQuestion(BaseModel):
     )
 
     # Normalises question input when it is provided as a dictionary
-    @validator("question", pre=True)
+    @field_validator("question", mode="before")
+    @classmethod
     def clean_question(cls, v: object) -> str:
         """
         Normalise the question field when initialised.
 
-        If the incoming question value is a dictionary, it attempts to extract
-        a 'description' field; otherwise, it converts the value to a string.
+        If the incoming question value is a dictionary, it extracts the first
+        string found under a common text key ('text', 'question',
+        'description', 'content', 'prompt'); otherwise, it converts the value
+        to a string.
 
         Parameters
         ----------
@@ -131,5 +148,54 @@ class FillBlankQuestion(BaseModel):
             The normalised question text.
         """
         if isinstance(v, dict):
-            return v.get("description", str(v))
+            for key in _QUESTION_TEXT_KEYS:
+                if isinstance(v.get(key), str):
+                    return v[key]
+            return str(v)
         return str(v)
+
+
+# --------------------------------------------------------------
+# Batch Schemas
+# --------------------------------------------------------------
+class MCQBatch(BaseModel):
+    """
+    Container for several multiple-choice questions produced in one LLM call.
+
+    Attributes
+    ----------
+    questions : list of MCQQuestion
+        The individually validated questions from a batch response.
+    """
+
+    # Questions that survived per-item validation
+    questions: List[MCQQuestion] = Field(
+        default_factory=list,
+        description="List of distinct multiple-choice questions",
+    )
+
+
+class FillBlankBatch(BaseModel):
+    """
+    Container for several fill-in-the-blank questions produced in one LLM call.
+
+    Attributes
+    ----------
+    questions : list of FillBlankQuestion
+        The individually validated questions from a batch response.
+    """
+
+    # Questions that survived per-item validation
+    questions: List[FillBlankQuestion] = Field(
+        default_factory=list,
+        description="List of distinct fill-in-the-blank questions",
+    )
+
+
+# --------------------------------------------------------------
+# List Adapters
+# --------------------------------------------------------------
+# Built once at import time; validating a list through one adapter call is
+# cheaper than calling `model_validate` per item
+MCQ_LIST_ADAPTER: TypeAdapter[List[MCQQuestion]] = TypeAdapter(List[MCQQuestion])
+FILL_BLANK_LIST_ADAPTER: TypeAdapter[List[FillBlankQuestion]] = TypeAdapter(List[FillBlankQuestion])
@@ -0,0 +1,198 @@
+"""
+quiz_records.py
+
+Lightweight quiz records for the LLMOps StudyBuddy project.
+
+The Pydantic schemas in `question_schemas.py` validate LLM output. Once a
+question is accepted into a quiz it only needs to be displayed, marked and
+exported, which happens on every Streamlit rerun. These records are plain
+slotted, immutable dataclasses: small in memory, cheap to create and free of
+validation overhead.
+
+- `QuizQuestion`   : one question as shown to the learner
+- `QuestionResult` : one marked answer (referencing its `QuizQuestion`)
+- `ResultSummary`  : score and per-question correctness of a marked quiz
+
+`intern_question` returns one shared instance per distinct question, so
+sessions served the same question (from the question bank or the prefetch
+pool) hold references to one object instead of copies of its text.
+"""
+
+# --------------------------------------------------------------
+# Imports
+# --------------------------------------------------------------
+from __future__ import annotations
+
+import threading
+import weakref
+from dataclasses import dataclass
+from typing import Any, Dict, Sequence, Tuple
+
+# Question type labels used across the UI and exports
+MCQ = "MCQ"
+FILL_BLANK = "Fill in the blank"
+
+
+# --------------------------------------------------------------
+# Quiz Question
+# --------------------------------------------------------------
+@dataclass(frozen=True, slots=True, weakref_slot=True)
+class QuizQuestion:
+    """
+    A question accepted into a quiz.
+
+    Attributes
+    ----------
+    question_type : str
+        `MCQ` or `FILL_BLANK`.
+    question : str
+        The question text.
+    correct_answer : str
+        The correct option (MCQ) or the word(s) filling the blank.
+    options : tuple of str
+        Answer options (empty for fill-in-the-blank questions).
+    """
+
+    question_type: str
+    question: str
+    correct_answer: str
+    options: Tuple[str, ...] = ()
+
+    @property
+    def is_mcq(self) -> bool:
+        """True for multiple-choice questions."""
+        return self.question_type == MCQ
+
+
+# Live questions keyed by their field values. Keys are plain tuples so the
+# table holds no strong reference to a record; an entry disappears once the
+# last session using that question drops it.
+_interned: "weakref.WeakValueDictionary[Tuple[Any, ...], QuizQuestion]" = weakref.WeakValueDictionary()
+_intern_lock = threading.Lock()
+
+
+def intern_question(question: QuizQuestion) -> QuizQuestion:
+    """
+    Return the shared instance equal to `question` (registering it if new).
+
+    Parameters
+    ----------
+    question : QuizQuestion
+        A freshly built record.
+
+    Returns
+    -------
+    QuizQuestion
+        The process-wide instance with the same content.
+    """
+    key = (question.question_type, question.question, question.correct_answer, question.options)
+    with _intern_lock:
+        shared = _interned.get(key)
+        if shared is None:
+            _interned[key] = shared = question
+        return shared
+
+
+def interned_count() -> int:
+    """Number of distinct questions currently shared across sessions."""
+    return len(_interned)
+
+
+# --------------------------------------------------------------
+# Results
+# --------------------------------------------------------------
+@dataclass(frozen=True, slots=True)
+class QuestionResult:
+    """
+    The marked answer to one quiz question.
+
+    The question's text, type, answer and options are read from the
+    referenced (shared) `QuizQuestion` rather than copied.
+
+    Attributes
+    ----------
+    question_number : int
+        1-based position in the quiz.
+    record : QuizQuestion
+        The question that was answered.
+    user_answer : str
+        The learner's answer.
+    is_correct : bool
+        Whether the answer was marked correct.
+    """
+
+    question_number: int
+    record: QuizQuestion
+    user_answer: str
+    is_correct: bool
+
+    @property
+    def question(self) -> str:
+        """The question text."""
+        return self.record.question
+
+    @property
+    def question_type(self) -> str:
+        """`MCQ` or `FILL_BLANK`."""
+        return self.record.question_type
+
+    @property
+    def correct_answer(self) -> str:
+        """The expected answer."""
+        return self.record.correct_answer
+
+    @property
+    def options(self) -> Tuple[str, ...]:
+        """Answer options (empty for fill-in-the-blank questions)."""
+        return self.record.options
+
+    def as_row(self) -> Dict[str, Any]:
+        """Return the result as an export row (column order as in the CSV)."""
+        return {
+            "question_number": self.question_number,
+            "question": self.question,
+            "question_type": self.question_type,
+            "user_answer": self.user_answer,
+            "correct_answer": self.correct_answer,
+            "is_correct": self.is_correct,
+            "options": list(self.options),
+        }
+
+
+@dataclass(frozen=True, slots=True)
+class ResultSummary:
+    """
+    Score of a marked quiz, computed once per evaluation.
+
+    Attributes
+    ----------
+    results : tuple of QuestionResult
+        Every marked answer, in quiz order.
+    correct : int
+        Number of correct answers.
+    total : int
+        Number of marked questions.
+    """
+
+    results: Tuple[QuestionResult, ...]
+    correct: int
+    total: int
+
+    @classmethod
+    def from_results(cls, results: Sequence[QuestionResult]) -> "ResultSummary":
+        """Summarise a list of marked answers."""
+        return cls(
+            results=tuple(results),
+            correct=sum(result.is_correct for result in results),
+            total=len(results),
+        )
+
+    @property
+    def score_percentage(self) -> float:
+        """Share of correct answers, in percent (0.0 for an empty quiz)."""
+        return self.correct / self.total * 100 if self.total else 0.0
+
+    @property
+    def correctness(self) -> Tuple[bool, ...]:
+        """Per-question correctness, in quiz order."""
+        return tuple(result.is_correct for result in self.results)
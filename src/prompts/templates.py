@@ -5,15 +5,81 @@ Prompt templates for generating structured study questions in the
 LLMOps StudyBuddy project.
 
 This module defines LangChain `PromptTemplate` objects for creating
-multiple-choice questions (MCQs) and fill-in-the-blank questions. Each
-template instructs the LLM to return strictly formatted JSON compatible
+multiple-choice questions (MCQs) and fill-in-the-blank questions, in both
+single-question and batched (N questions per call) forms. Each template
+instructs the LLM to return strictly formatted JSON compatible
 with the project's Pydantic schemas, while avoiding overused examples.
+
+Every template also accepts an optional `{avoid}` block, built with
+`format_avoid_block`, listing questions the quiz already has so that
+retries are steered away from them.
+
+Each template also exists in a compact variant with the same JSON contract
+and a much shorter instruction block; `get_prompt_template` returns the
+variant selected by `settings.PROMPT_VARIANT`.
 """
 
 # --------------------------------------------------------------
 # Imports
 # --------------------------------------------------------------
+from typing import Dict, Optional, Sequence
+
 from langchain_core.prompts import PromptTemplate
+from src.config.settings import settings
+
+# Rough characters-per-token ratio used to enforce the avoid-list budget
+_CHARS_PER_TOKEN = 4
+
+# Longest excerpt of a single question included in an avoid list
+_AVOID_ITEM_CHARS = 120
+
+
+# --------------------------------------------------------------
+# Avoid-List Block
+# --------------------------------------------------------------
+def format_avoid_block(questions: Sequence[str], token_budget: int) -> Optional[str]:
+    """
+    Format questions the model must not repeat, within a token budget.
+
+    The most recent questions are kept first; long questions are shortened
+    to an excerpt, which is enough for the model to recognise the fact.
+
+    Parameters
+    ----------
+    questions : sequence of str
+        Question texts, oldest first.
+    token_budget : int
+        Approximate maximum size of the block in tokens.
+
+    Returns
+    -------
+    str or None
+        Text for the templates' `{avoid}` variable, or None if empty.
+    """
+    header = (
+        "- Do NOT repeat, paraphrase or test the same fact as any of these "
+        "existing questions:\n"
+    )
+    budget = token_budget * _CHARS_PER_TOKEN - len(header)
+
+    lines: list[str] = []
+    seen: set[str] = set()
+    for question in reversed(questions):
+        text = " ".join(question.split())
+        if len(text) > _AVOID_ITEM_CHARS:
+            text = text[:_AVOID_ITEM_CHARS].rstrip() + "..."
+        if text.lower() in seen:
+            continue
+        line = f"  * {text}\n"
+        if len(line) > budget:
+            break
+        budget -= len(line)
+        seen.add(text.lower())
+        lines.append(line)
+
+    if not lines:
+        return None
+    return header + "".join(lines) + "\n"
 
 
 # --------------------------------------------------------------
@@ -30,6 +96,7 @@ mcq_prompt_template: PromptTemplate = PromptTemplate(
         "the Qin dynasty, or other overused examples unless they are explicitly "
         "mentioned in the topic text.\n"
         "- Make this question feel distinct and interesting.\n\n"
+        "{avoid}"
         "Return ONLY a JSON object with these exact fields:\n"
         "- 'question': A clear, specific question\n"
         "- 'options': An array of exactly 4 possible answers\n"
@@ -43,6 +110,7 @@ mcq_prompt_template: PromptTemplate = PromptTemplate(
         "Your response:"
     ),
     input_variables=["topic", "difficulty"],
+    partial_variables={"avoid": ""},
 )
 
 
@@ -60,6 +128,7 @@ fill_blank_prompt_template: PromptTemplate = PromptTemplate(
         "the Qin dynasty, or other overused examples unless they are explicitly "
         "mentioned in the topic text.\n"
         "- Make this question feel distinct and interesting.\n\n"
+        "{avoid}"
         "Return ONLY a JSON object with these exact fields:\n"
         "- 'question': A sentence with '_____' marking where the blank should be\n"
         "- 'answer': The correct word or phrase that belongs in the blank\n\n"
@@ -71,4 +140,158 @@ fill_blank_prompt_template: PromptTemplate = PromptTemplate(
         "Your response:"
     ),
     input_variables=["topic", "difficulty"],
+    partial_variables={"avoid": ""},
+)
+
+
+# --------------------------------------------------------------
+# Batched Multiple-Choice Question Prompt Template
+# --------------------------------------------------------------
+mcq_batch_prompt_template: PromptTemplate = PromptTemplate(
+    template=(
+        "You are helping to build a quiz. Generate {n} distinct {difficulty} "
+        "multiple-choice questions about the topic: {topic}.\n\n"
+        "Requirements:\n"
+        "- Each question must be about a specific fact, event, person, idea or concept.\n"
+        "- No two questions may ask about the same fact or be paraphrases of each other.\n"
+        "- They must be different from typical textbook cliches.\n"
+        "- Do NOT ask about Machu Picchu, the Incas, the Terracotta Army, "
+        "the Qin dynasty, or other overused examples unless they are explicitly "
+        "mentioned in the topic text.\n\n"
+        "{avoid}"
+        "Return ONLY a JSON array of {n} objects, each with these exact fields:\n"
+        "- 'question': A clear, specific question\n"
+        "- 'options': An array of exactly 4 possible answers\n"
+        "- 'correct_answer': One of the options that is the correct answer\n\n"
+        "Example format:\n"
+        '[\n'
+        '    {{\n'
+        '        \"question\": \"What is the capital of France?\",\n'
+        '        \"options\": [\"London\", \"Berlin\", \"Paris\", \"Madrid\"],\n'
+        '        \"correct_answer\": \"Paris\"\n'
+        '    }}\n'
+        ']\n\n'
+        "Your response:"
+    ),
+    input_variables=["topic", "difficulty", "n"],
+    partial_variables={"avoid": ""},
 )
+
+
+# --------------------------------------------------------------
+# Batched Fill-in-the-Blank Question Prompt Template
+# --------------------------------------------------------------
+fill_blank_batch_prompt_template: PromptTemplate = PromptTemplate(
+    template=(
+        "You are helping to build a quiz. Generate {n} distinct {difficulty} "
+        "fill-in-the-blank questions about the topic: {topic}.\n\n"
+        "Requirements:\n"
+        "- Each sentence should test a specific fact, person, date or concept.\n"
+        "- No two sentences may test the same fact or be paraphrases of each other.\n"
+        "- They must be different from typical textbook cliches.\n"
+        "- Do NOT ask about Machu Picchu, the Incas, the Terracotta Army, "
+        "the Qin dynasty, or other overused examples unless they are explicitly "
+        "mentioned in the topic text.\n\n"
+        "{avoid}"
+        "Return ONLY a JSON array of {n} objects, each with these exact fields:\n"
+        "- 'question': A sentence with '_____' marking where the blank should be\n"
+        "- 'answer': The correct word or phrase that belongs in the blank\n\n"
+        "Example format:\n"
+        '[\n'
+        '    {{\n'
+        '        \"question\": \"The capital of France is _____.\",\n'
+        '        \"answer\": \"Paris\"\n'
+        '    }}\n'
+        ']\n\n'
+        "Your response:"
+    ),
+    input_variables=["topic", "difficulty", "n"],
+    partial_variables={"avoid": ""},
+)
+
+
+# --------------------------------------------------------------
+# Compact Template Variants
+# --------------------------------------------------------------
+# Same JSON contract as the full templates, without the long preamble,
+# blacklist and pretty-printed example. Selected with PROMPT_VARIANT=compact.
+mcq_compact_prompt_template: PromptTemplate = PromptTemplate(
+    template=(
+        "Generate a {difficulty} multiple-choice question about: {topic}.\n"
+        "Test one specific, non-cliche fact.\n"
+        "{avoid}"
+        'Return ONLY JSON: {{"question": "...", "options": ["...", "...", "...", "..."], '
+        '"correct_answer": "<one of the 4 options>"}}'
+    ),
+    input_variables=["topic", "difficulty"],
+    partial_variables={"avoid": ""},
+)
+
+fill_blank_compact_prompt_template: PromptTemplate = PromptTemplate(
+    template=(
+        "Generate a {difficulty} fill-in-the-blank question about: {topic}.\n"
+        "Test one specific, non-cliche fact; mark the blank with _____.\n"
+        "{avoid}"
+        'Return ONLY JSON: {{"question": "... _____ ...", "answer": "..."}}'
+    ),
+    input_variables=["topic", "difficulty"],
+    partial_variables={"avoid": ""},
+)
+
+mcq_batch_compact_prompt_template: PromptTemplate = PromptTemplate(
+    template=(
+        "Generate {n} distinct {difficulty} multiple-choice questions about: {topic}.\n"
+        "Each tests a different specific, non-cliche fact.\n"
+        "{avoid}"
+        'Return ONLY a JSON array of {n} objects like {{"question": "...", '
+        '"options": ["...", "...", "...", "..."], "correct_answer": "<one of the 4 options>"}}'
+    ),
+    input_variables=["topic", "difficulty", "n"],
+    partial_variables={"avoid": ""},
+)
+
+fill_blank_batch_compact_prompt_template: PromptTemplate = PromptTemplate(
+    template=(
+        "Generate {n} distinct {difficulty} fill-in-the-blank questions about: {topic}.\n"
+        "Each tests a different specific, non-cliche fact; mark the blank with _____.\n"
+        "{avoid}"
+        'Return ONLY a JSON array of {n} objects like {{"question": "... _____ ...", "answer": "..."}}'
+    ),
+    input_variables=["topic", "difficulty", "n"],
+    partial_variables={"avoid": ""},
+)
+
+
+# --------------------------------------------------------------
+# Variant Registry
+# --------------------------------------------------------------
+PROMPT_VARIANTS: Dict[str, Dict[str, PromptTemplate]] = {
+    "full": {
+        "mcq": mcq_prompt_template,
+        "fill_blank": fill_blank_prompt_template,
+        "mcq_batch": mcq_batch_prompt_template,
+        "fill_blank_batch": fill_blank_batch_prompt_template,
+    },
+    "compact": {
+        "mcq": mcq_compact_prompt_template,
+        "fill_blank": fill_blank_compact_prompt_template,
+        "mcq_batch": mcq_batch_compact_prompt_template,
+        "fill_blank_batch": fill_blank_batch_compact_prompt_template,
+    },
+}
+
+
+def get_prompt_template(name: str, variant: Optional[str] = None) -> PromptTemplate:
+    """
+    Return a template by name from a prompt variant.
+
+    Parameters
+    ----------
+    name : str
+        'mcq', 'fill_blank', 'mcq_batch' or 'fill_blank_batch'.
+    variant : str, optional
+        'full' or 'compact'. Defaults to `settings.PROMPT_VARIANT`; unknown
+        variants fall back to 'full'.
+    """
+    templates = PROMPT_VARIANTS.get(variant or settings.PROMPT_VARIANT, PROMPT_VARIANTS["full"])
+    return templates[name]
@@ -0,0 +1,141 @@
+"""
+token_accounting.py
+
+Prompt token accounting for the LLMOps StudyBuddy project.
+
+Every generation call pays for the full instruction block of its template.
+This module measures that cost per template, variant, topic and difficulty:
+
+- `count_tokens` counts tokens with `tiktoken` when it is installed (a close
+  proxy for Llama tokenisers) and falls back to the ~4 characters/token
+  heuristic used by the rate limiter
+- `template_token_report` formats every template for the given topics and
+  difficulties and reports input tokens per call and per question
+
+CLI:
+
+    python -m src.prompts.token_accounting --n 5
+"""
+
+# --------------------------------------------------------------
+# Imports
+# --------------------------------------------------------------
+from __future__ import annotations
+
+import argparse
+import json
+import math
+from typing import Any, Dict, List, Optional, Sequence
+
+from src.config.topics import DIFFICULTIES, preset_topics
+from src.prompts.templates import PROMPT_VARIANTS
+
+try:
+    import tiktoken
+
+    _ENCODING = tiktoken.get_encoding("cl100k_base")
+    TOKENIZER = "tiktoken:cl100k_base"
+except Exception:  # pragma: no cover - optional dependency (or no cached encoding)
+    _ENCODING = None
+    TOKENIZER = "chars/4"
+
+# Characters-per-token ratio used when no tokenizer is available
+_CHARS_PER_TOKEN = 4
+
+
+# --------------------------------------------------------------
+# Token Counting
+# --------------------------------------------------------------
+def count_tokens(text: str) -> int:
+    """Return the number of tokens in `text` (see `TOKENIZER` for the method)."""
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text))
+    return math.ceil(len(text) / _CHARS_PER_TOKEN)
+
+
+# --------------------------------------------------------------
+# Template Report
+# --------------------------------------------------------------
+def template_token_report(
+    topics: Optional[Sequence[str]] = None,
+    difficulties: Optional[Sequence[str]] = None,
+    variants: Optional[Sequence[str]] = None,
+    n: int = 5,
+) -> List[Dict[str, Any]]:
+    """
+    Count input tokens for every template and (topic, difficulty).
+
+    Parameters
+    ----------
+    topics : sequence of str, optional
+        Topics to format. Defaults to the preset topics.
+    difficulties : sequence of str, optional
+        Difficulties to format. Defaults to the UI difficulties.
+    variants : sequence of str, optional
+        Template variants. Defaults to all variants.
+    n : int, optional
+        Batch size used for batch templates.
+
+    Returns
+    -------
+    list of dict
+        One row per (variant, template, topic, difficulty) with `tokens`
+        (per call) and `tokens_per_question` (per call divided by the
+        number of questions it asks for).
+    """
+    topics = list(topics or preset_topics())
+    difficulties = [d.lower() for d in (difficulties or DIFFICULTIES)]
+
+    rows = []
+    for variant in variants or PROMPT_VARIANTS:
+        for name, template in PROMPT_VARIANTS[variant].items():
+            questions = n if name.endswith("_batch") else 1
+            for topic in topics:
+                for difficulty in difficulties:
+                    tokens = count_tokens(template.format(topic=topic, difficulty=difficulty, n=n))
+                    rows.append(
+                        {
+                            "variant": variant,
+                            "template": name,
+                            "topic": topic,
+                            "difficulty": difficulty,
+                            "tokens": tokens,
+                            "tokens_per_question": tokens / questions,
+                        }
+                    )
+    return rows
+
+
+def summarise(rows: Sequence[Dict[str, Any]]) -> Dict[str, Dict[str, Dict[str, float]]]:
+    """Average tokens per call and per question, by variant and template."""
+    grouped: Dict[tuple, List[Dict[str, Any]]] = {}
+    for row in rows:
+        grouped.setdefault((row["variant"], row["template"]), []).append(row)
+
+    summary: Dict[str, Dict[str, Dict[str, float]]] = {}
+    for (variant, name), group in grouped.items():
+        summary.setdefault(variant, {})[name] = {
+            "mean_tokens": sum(r["tokens"] for r in group) / len(group),
+            "max_tokens": max(r["tokens"] for r in group),
+            "mean_tokens_per_question": sum(r["tokens_per_question"] for r in group) / len(group),
+        }
+    return summary
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """CLI entry point: print per-template token counts as JSON."""
+    parser = argparse.ArgumentParser(description="Count prompt tokens per template.")
+    parser.add_argument("--topics", nargs="*", help="Topics (default: the preset topics).")
+    parser.add_argument("--n", type=int, default=5, help="Batch size for batch templates.")
+    parser.add_argument("--rows", action="store_true", help="Print every row, not just the summary.")
+    args = parser.parse_args(argv)
+
+    rows = template_token_report(topics=args.topics, n=args.n)
+    output: Dict[str, Any] = {"tokenizer": TOKENIZER, "summary": summarise(rows)}
+    if args.rows:
+        output["rows"] = rows
+    print(json.dumps(output, indent=2))
+
+
+if __name__ == "__main__":
+    main()
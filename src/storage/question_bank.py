@@ -0,0 +1,341 @@
+"""
+question_bank.py
+
+Persistent SQLite-backed question bank for the LLMOps StudyBuddy project.
+
+Most quiz requests target a small set of preset topics at one of three
+difficulty levels, so validated questions are worth keeping. This module
+stores every validated `MCQQuestion` / `FillBlankQuestion`, indexed by
+(normalised topic, question type, difficulty), and serves random samples
+back to `QuizManager` so that popular quizzes can be built without calling
+the LLM at all.
+
+Design notes
+------------
+- Random sampling uses a random `rand_key` column covered by the lookup
+  index: a query starts at a random key and walks the index, so it never
+  scans the whole table. Served rows get a fresh random key, which keeps
+  repeated samples from clustering.
+- The bank is bounded by `max_rows`. When it grows past the limit the least
+  recently served rows are evicted first.
+- A single connection in WAL mode is shared across Streamlit sessions and
+  guarded by a lock.
+- Near-duplicates of questions already stored under the same key are not
+  inserted. Each key's duplicate index is built lazily on first write.
+"""
+
+# --------------------------------------------------------------
+# Imports
+# --------------------------------------------------------------
+from __future__ import annotations
+
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+from typing import Container, Dict, Iterable, List, Optional, Tuple
+
+from src.common.logger import get_logger
+from src.config.settings import settings
+from src.config.topics import question_kind
+from src.models.question_schemas import FillBlankQuestion, MCQQuestion
+from src.utils.similarity import SimilarityIndex, make_similarity_index
+
+# Largest value used for random sampling keys (fits in SQLite INTEGER)
+_RAND_MAX = 2**62
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS questions (
+    id          INTEGER PRIMARY KEY,
+    topic_key   TEXT    NOT NULL,
+    kind        TEXT    NOT NULL,
+    difficulty  TEXT    NOT NULL,
+    text_key    TEXT    NOT NULL,
+    payload     TEXT    NOT NULL,
+    rand_key    INTEGER NOT NULL,
+    last_used   REAL    NOT NULL,
+    UNIQUE (topic_key, kind, difficulty, text_key)
+);
+CREATE INDEX IF NOT EXISTS idx_questions_sample
+    ON questions (topic_key, kind, difficulty, rand_key);
+CREATE INDEX IF NOT EXISTS idx_questions_lru
+    ON questions (last_used);
+"""
+
+
+# --------------------------------------------------------------
+# Key Helpers
+# --------------------------------------------------------------
+def normalise_topic(topic: str) -> str:
+    """Return a case- and whitespace-insensitive key for a topic string."""
+    return " ".join(topic.lower().split())
+
+
+def question_key(text: str) -> str:
+    """Return the case-insensitive key used for duplicate detection."""
+    return text.strip().lower()
+
+
+# --------------------------------------------------------------
+# Question Bank
+# --------------------------------------------------------------
+class QuestionBank:
+    """
+    Bounded, persistent store of validated questions.
+
+    Parameters
+    ----------
+    path : str, optional
+        SQLite database file. Defaults to `settings.QUESTION_BANK_PATH`.
+    max_rows : int, optional
+        Maximum number of stored questions. Defaults to
+        `settings.QUESTION_BANK_MAX_ROWS`.
+
+    Methods
+    -------
+    add(topic, question_type, difficulty, questions)
+        Store validated questions, ignoring ones already present.
+    sample(topic, question_type, difficulty, k, exclude)
+        Return up to `k` random questions not listed in `exclude`.
+    count(topic, question_type, difficulty)
+        Number of stored questions for a key.
+    """
+
+    def __init__(self, path: Optional[str] = None, max_rows: Optional[int] = None) -> None:
+        self.path = path or settings.QUESTION_BANK_PATH
+        self.max_rows = max_rows or settings.QUESTION_BANK_MAX_ROWS
+        self.logger = get_logger(self.__class__.__name__)
+
+        # Ensure the parent directory exists for on-disk databases
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+        # Track the row count in memory so eviction checks stay O(1)
+        self._row_count = self._conn.execute("SELECT COUNT(*) FROM questions").fetchone()[0]
+
+        # Per-key duplicate indexes, built on first write to each key
+        self._indexes: Dict[Tuple[str, str, str], SimilarityIndex] = {}
+
+    @staticmethod
+    def _answer_of(payload: dict) -> Optional[str]:
+        """Return the correct answer stored in a question payload."""
+        return payload.get("correct_answer") or payload.get("answer")
+
+    def _index_for(self, key: Tuple[str, str, str]) -> SimilarityIndex:
+        """Return the duplicate index for a key. Caller holds the lock."""
+        index = self._indexes.get(key)
+        if index is None:
+            index = make_similarity_index()
+            for (payload,) in self._conn.execute(
+                "SELECT payload FROM questions "
+                "WHERE topic_key = ? AND kind = ? AND difficulty = ?",
+                key,
+            ):
+                data = json.loads(payload)
+                index.add(data["question"], self._answer_of(data))
+            self._indexes[key] = index
+        return index
+
+    # ----------------------------------------------------------
+    # Writes
+    # ----------------------------------------------------------
+    def add(
+        self,
+        topic: str,
+        question_type: str,
+        difficulty: str,
+        questions: Iterable[MCQQuestion | FillBlankQuestion],
+    ) -> int:
+        """
+        Store validated questions under (topic, type, difficulty).
+
+        Parameters
+        ----------
+        topic : str
+            Topic the questions were generated for.
+        question_type : str
+            UI question type, e.g. 'Multiple Choice'.
+        difficulty : str
+            Difficulty level.
+        questions : iterable of MCQQuestion or FillBlankQuestion
+            Validated questions to store.
+
+        Returns
+        -------
+        int
+            Number of newly stored questions.
+        """
+        key = (normalise_topic(topic), question_kind(question_type), difficulty.lower())
+        payloads = [question.model_dump() for question in questions]
+        if not payloads:
+            return 0
+
+        now = time.time()
+        with self._lock:
+            # Skip near-duplicates of stored questions (and of each other)
+            index = self._index_for(key)
+            rows = []
+            for payload in payloads:
+                answer = self._answer_of(payload)
+                if index.find(payload["question"], answer) is not None:
+                    continue
+                index.add(payload["question"], answer)
+                rows.append(
+                    (
+                        *key,
+                        question_key(payload["question"]),
+                        json.dumps(payload),
+                        random.randrange(_RAND_MAX),
+                        now,
+                    )
+                )
+
+            before = self._conn.total_changes
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO questions "
+                    "(topic_key, kind, difficulty, text_key, payload, rand_key, last_used) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+            inserted = self._conn.total_changes - before
+            self._row_count += inserted
+
+            if self._row_count > self.max_rows:
+                self._evict(self._row_count - self.max_rows)
+
+        return inserted
+
+    def _evict(self, excess: int) -> None:
+        """Delete the `excess` least recently used rows. Caller holds the lock."""
+        with self._conn:
+            cursor = self._conn.execute(
+                "DELETE FROM questions WHERE id IN "
+                "(SELECT id FROM questions ORDER BY last_used LIMIT ?)",
+                (excess,),
+            )
+        self._row_count -= cursor.rowcount
+
+        # Evicted rows may be stored again -> rebuild indexes on next write
+        self._indexes.clear()
+        self.logger.info(f"Evicted {cursor.rowcount} questions from the bank.")
+
+    # ----------------------------------------------------------
+    # Reads
+    # ----------------------------------------------------------
+    def sample(
+        self,
+        topic: str,
+        question_type: str,
+        difficulty: str,
+        k: int,
+        exclude: Container[str] = (),
+    ) -> List[MCQQuestion | FillBlankQuestion]:
+        """
+        Return up to `k` random stored questions for a key.
+
+        Parameters
+        ----------
+        topic : str
+            Topic to sample from.
+        question_type : str
+            UI question type, e.g. 'Multiple Choice'.
+        difficulty : str
+            Difficulty level.
+        k : int
+            Maximum number of questions to return.
+        exclude : container of str, optional
+            Question keys (see `question_key`) the caller has already seen; a
+            `SimilarityIndex` also excludes near-duplicates of them.
+
+        Returns
+        -------
+        list of MCQQuestion or FillBlankQuestion
+            Between 0 and `k` questions.
+        """
+        if k <= 0:
+            return []
+
+        key = (normalise_topic(topic), question_kind(question_type), difficulty.lower())
+        model = MCQQuestion if key[1] == "mcq" else FillBlankQuestion
+        start = random.randrange(_RAND_MAX)
+        chunk = k + 16
+
+        picked: list[tuple[int, str]] = []
+        with self._lock:
+            # Walk the index from a random point, then wrap around once
+            for low, high in ((start, _RAND_MAX), (0, start)):
+                cursor = low
+                while len(picked) < k:
+                    rows = self._conn.execute(
+                        "SELECT id, text_key, payload, rand_key FROM questions "
+                        "WHERE topic_key = ? AND kind = ? AND difficulty = ? "
+                        "AND rand_key >= ? AND rand_key < ? "
+                        "ORDER BY rand_key LIMIT ?",
+                        (*key, cursor, high, chunk),
+                    ).fetchall()
+                    for row_id, text_key, payload, _ in rows:
+                        if text_key not in exclude and len(picked) < k:
+                            picked.append((row_id, payload))
+                    if len(rows) < chunk:
+                        break
+                    cursor = rows[-1][3] + 1
+                if len(picked) >= k:
+                    break
+
+            if picked:
+                # Touch served rows for LRU and reshuffle their sampling keys
+                now = time.time()
+                with self._conn:
+                    self._conn.executemany(
+                        "UPDATE questions SET last_used = ?, rand_key = ? WHERE id = ?",
+                        [(now, random.randrange(_RAND_MAX), row_id) for row_id, _ in picked],
+                    )
+
+        return [model.model_validate(json.loads(payload)) for _, payload in picked]
+
+    def count(self, topic: str, question_type: str, difficulty: str) -> int:
+        """Return the number of stored questions for (topic, type, difficulty)."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM questions "
+                "WHERE topic_key = ? AND kind = ? AND difficulty = ?",
+                (normalise_topic(topic), question_kind(question_type), difficulty.lower()),
+            ).fetchone()[0]
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+# --------------------------------------------------------------
+# Shared Instance
+# --------------------------------------------------------------
+_bank: Optional[QuestionBank] = None
+_bank_lock = threading.Lock()
+
+
+def get_question_bank() -> QuestionBank:
+    """
+    Return the process-wide question bank, creating it on first use.
+
+    Returns
+    -------
+    QuestionBank
+        The shared bank configured from `settings`.
+    """
+    global _bank
+    with _bank_lock:
+        if _bank is None:
+            _bank = QuestionBank()
+        return _bank
@@ -0,0 +1,319 @@
+"""
+results_store.py
+
+Append-only SQLite store of marked quiz results for the LLMOps StudyBuddy
+project.
+
+Saving results used to write one timestamped CSV per click under
+`results/`, which the app then read back to offer it for download. Instead,
+every marked answer becomes one row of a single `quiz_results` table,
+tagged with the session, optional user, topic and difficulty, so results
+can be analysed across quizzes without collecting files from containers.
+The download is built in memory (see `QuizManager.results_csv`).
+
+Design notes
+------------
+- Rows are never updated or deleted. Each save gets a `quiz_id`, so the
+  rows of one submitted quiz can be grouped.
+- Writes are batched: `append` only buffers rows. The buffer is written in
+  one transaction once it holds `flush_rows` rows, at least every
+  `flush_seconds` by a daemon thread, and at interpreter exit.
+- If the database itself fails (locked, disk full, ...), the rows stay
+  buffered for the next flush. If it rejects the batch for any other reason,
+  the rows are retried one by one and only the offending rows are dropped
+  (logged and counted), so one bad row cannot block every later write.
+- A single connection in WAL mode is shared across Streamlit sessions and
+  guarded by a lock, as in `question_bank.py`.
+"""
+
+# --------------------------------------------------------------
+# Imports
+# --------------------------------------------------------------
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from src.common import metrics
+from src.common.logger import get_logger
+from src.config.settings import settings
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS quiz_results (
+    id              INTEGER PRIMARY KEY,
+    quiz_id         TEXT    NOT NULL,
+    saved_at        REAL    NOT NULL,
+    session_id      TEXT,
+    user_id         TEXT,
+    topic           TEXT    NOT NULL,
+    difficulty      TEXT    NOT NULL,
+    question_number INTEGER NOT NULL,
+    question_type   TEXT    NOT NULL,
+    question        TEXT    NOT NULL,
+    user_answer     TEXT    NOT NULL,
+    correct_answer  TEXT    NOT NULL,
+    is_correct      INTEGER NOT NULL,
+    options         TEXT    NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_quiz_results_topic
+    ON quiz_results (topic, saved_at);
+CREATE INDEX IF NOT EXISTS idx_quiz_results_session
+    ON quiz_results (session_id, saved_at);
+"""
+
+_INSERT = (
+    "INSERT INTO quiz_results "
+    "(quiz_id, saved_at, session_id, user_id, topic, difficulty, question_number, "
+    "question_type, question, user_answer, correct_answer, is_correct, options) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+
+
+# --------------------------------------------------------------
+# Results Store
+# --------------------------------------------------------------
+class ResultsStore:
+    """
+    Append-only, batched store of marked quiz answers.
+
+    Parameters
+    ----------
+    path : str, optional
+        SQLite database file. Defaults to `settings.RESULTS_STORE_PATH`.
+    flush_rows : int, optional
+        Buffered rows that trigger a write. Defaults to
+        `settings.RESULTS_FLUSH_ROWS`.
+    flush_seconds : float, optional
+        Longest a buffered row waits before being written. Defaults to
+        `settings.RESULTS_FLUSH_SECONDS`.
+
+    Methods
+    -------
+    append(rows, topic, difficulty, session_id, user_id)
+        Buffer the export rows of one marked quiz.
+    flush()
+        Write every buffered row in one transaction.
+    count(topic)
+        Number of stored rows (optionally for one topic).
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        flush_rows: Optional[int] = None,
+        flush_seconds: Optional[float] = None,
+    ) -> None:
+        self.path = path or settings.RESULTS_STORE_PATH
+        self.flush_rows = flush_rows or settings.RESULTS_FLUSH_ROWS
+        self.flush_seconds = flush_seconds or settings.RESULTS_FLUSH_SECONDS
+        self.logger = get_logger(self.__class__.__name__)
+
+        # Ensure the parent directory exists for on-disk databases
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+        # Rows waiting for the next batched write
+        self._pending: List[Tuple[Any, ...]] = []
+        self._pending_lock = threading.Lock()
+        self._closed = threading.Event()
+
+        self._flusher = threading.Thread(target=self._flush_periodically, name="results-flush", daemon=True)
+        self._flusher.start()
+        atexit.register(self.close)
+
+    # ----------------------------------------------------------
+    # Writes
+    # ----------------------------------------------------------
+    def append(
+        self,
+        rows: Iterable[Dict[str, Any]],
+        topic: str,
+        difficulty: str,
+        session_id: Optional[str] = None,
+        user_id: Optional[str] = None,
+    ) -> str:
+        """
+        Buffer the marked answers of one quiz.
+
+        Parameters
+        ----------
+        rows : iterable of dict
+            Export rows (`QuestionResult.as_row()`).
+        topic : str
+            Topic the quiz was generated for.
+        difficulty : str
+            Difficulty level of the quiz.
+        session_id : str, optional
+            Streamlit session that took the quiz.
+        user_id : str, optional
+            Authenticated user, for deployments that have one.
+
+        Returns
+        -------
+        str
+            The id shared by the quiz's rows.
+        """
+        quiz_id = uuid.uuid4().hex
+        now = time.time()
+        batch = [
+            (
+                quiz_id,
+                now,
+                session_id,
+                user_id,
+                topic,
+                difficulty,
+                row["question_number"],
+                row["question_type"],
+                row["question"],
+                row["user_answer"],
+                row["correct_answer"],
+                int(row["is_correct"]),
+                json.dumps(row["options"]),
+            )
+            for row in rows
+        ]
+
+        with self._pending_lock:
+            self._pending.extend(batch)
+            flush_due = len(self._pending) >= self.flush_rows
+
+        if flush_due:
+            try:
+                self.flush()
+            except Exception as exc:
+                # Rows stay buffered; the next flush retries them
+                self.logger.error(f"Could not write quiz results: {exc}")
+        return quiz_id
+
+    def flush(self) -> int:
+        """
+        Write every buffered row in a single transaction.
+
+        Flushes are serialised, so once `flush` returns, every row buffered
+        before the call is on disk (including rows another thread's flush
+        had taken). If the database fails (`sqlite3.OperationalError`), the
+        rows are put back at the front of the buffer and the error is
+        re-raised. Rows the database rejects are dropped (see `_write_rows`).
+
+        Returns
+        -------
+        int
+            Number of rows written.
+        """
+        with self._lock:
+            with self._pending_lock:
+                batch, self._pending = self._pending, []
+            if not batch:
+                return 0
+
+            try:
+                with self._conn:
+                    self._conn.executemany(_INSERT, batch)
+                written = len(batch)
+            except sqlite3.OperationalError:
+                self._requeue(batch)
+                raise
+            except Exception as exc:
+                # Some row was rejected -> find it instead of retrying the batch forever
+                self.logger.warning(f"Results batch of {len(batch)} rows rejected ({exc}); writing rows one by one.")
+                written = self._write_rows(batch)
+
+        metrics.results_rows_written.inc(written)
+        return written
+
+    def _write_rows(self, batch: List[Tuple[Any, ...]]) -> int:
+        """
+        Write rows one at a time, dropping the ones the database rejects.
+
+        Caller holds `_lock`. A database failure part-way through puts the
+        unwritten rows back in the buffer and is re-raised.
+        """
+        written = 0
+        for index, row in enumerate(batch):
+            try:
+                with self._conn:
+                    self._conn.execute(_INSERT, row)
+            except sqlite3.OperationalError:
+                self._requeue(batch[index:])
+                metrics.results_rows_written.inc(written)
+                raise
+            except Exception as exc:
+                metrics.results_rows_dropped.inc()
+                self.logger.error(f"Dropped result row {row[6]} of quiz {row[0]}: {exc}")
+            else:
+                written += 1
+        return written
+
+    def _requeue(self, rows: List[Tuple[Any, ...]]) -> None:
+        """Put unwritten rows back at the front of the buffer."""
+        with self._pending_lock:
+            self._pending[:0] = rows
+
+    def _flush_periodically(self) -> None:
+        """Flush the buffer every `flush_seconds` until the store is closed."""
+        while not self._closed.wait(self.flush_seconds):
+            try:
+                self.flush()
+            except Exception as exc:
+                self.logger.error(f"Could not write quiz results: {exc}")
+
+    # ----------------------------------------------------------
+    # Reads
+    # ----------------------------------------------------------
+    def count(self, topic: Optional[str] = None) -> int:
+        """Return the number of stored rows, optionally for one topic (buffered rows included)."""
+        self.flush()
+        with self._lock:
+            if topic is None:
+                return self._conn.execute("SELECT COUNT(*) FROM quiz_results").fetchone()[0]
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM quiz_results WHERE topic = ?", (topic,)
+            ).fetchone()[0]
+
+    def close(self) -> None:
+        """Write buffered rows and close the underlying database connection."""
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        try:
+            self.flush()
+        finally:
+            with self._lock:
+                self._conn.close()
+
+
+# --------------------------------------------------------------
+# Shared Instance
+# --------------------------------------------------------------
+_store: Optional[ResultsStore] = None
+_store_lock = threading.Lock()
+
+
+def get_results_store() -> ResultsStore:
+    """
+    Return the process-wide results store, creating it on first use.
+
+    Returns
+    -------
+    ResultsStore
+        The shared store configured from `settings`.
+    """
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ResultsStore()
+        return _store
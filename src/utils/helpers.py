@@ -6,7 +6,8 @@ Utility helpers and quiz management logic for the LLMOps StudyBuddy project.
 This module provides:
 - A `rerun` helper for triggering Streamlit app reruns via session state.
 - A `QuizManager` class for generating, presenting, and evaluating quizzes
-  built from LLM-generated questions.
+  built from LLM-generated questions, either all at once or as a stream of
+  questions delivered while the rest are still being generated.
 """
 
 # --------------------------------------------------------------
@@ -14,14 +15,46 @@ This module provides:
 # --------------------------------------------------------------
 from __future__ import annotations
 
+import asyncio
+import csv
+import io
 import os
+import queue
 from datetime import datetime
-from typing import Any, List, Optional
+from typing import TYPE_CHECKING, Any, Callable, Iterator, List, Optional
 
-import pandas as pd
 import streamlit as st
 
-from src.generator.question_generator import QuestionGenerator
+from src.common import metrics
+from src.common.event_loop import submit_coroutine
+from src.common.logger import get_logger
+from src.config.settings import settings
+from src.config.topics import question_kind
+from src.generator.coalescing import quiz_scope
+from src.models.question_schemas import FillBlankQuestion, MCQQuestion
+from src.models.quiz_records import (
+    FILL_BLANK,
+    MCQ,
+    QuestionResult,
+    QuizQuestion,
+    ResultSummary,
+    intern_question,
+)
+from src.storage.question_bank import QuestionBank
+from src.utils.similarity import SimilarityIndex, duplicate_stats, make_similarity_index
+
+if TYPE_CHECKING:
+    # Annotation-only imports: pandas and the generator (LangChain, Groq)
+    # are loaded on first use, not when the app starts
+    import pandas as pd
+
+    from src.generator.prefetch import PrefetchPool
+    from src.generator.question_generator import QuestionGenerator
+    from src.storage.results_store import ResultsStore
+
+# Markers passed from the event loop to `QuizManager._iter_concurrent`
+_STREAM_DONE = object()
+_SLOT_FAILED = object()
 
 
 # --------------------------------------------------------------
@@ -49,31 +82,205 @@ class QuizManager:
     Manage quiz generation, user interaction, evaluation, and persistence.
 
     This class coordinates:
-    - Question generation via `QuestionGenerator`
+    - Question generation via `QuestionGenerator`, served from the
+      persistent `QuestionBank` first when one is available
     - Interactive question display using Streamlit
     - Answer collection and scoring
-    - Export of results to a CSV file
+    - Saving results to the append-only `ResultsStore`, and CSV export
+      (built in memory, or written to a file on the legacy path)
 
     Attributes
     ----------
-    questions : list of dict
-        The list of generated questions in a simple serialisable format.
+    questions : list of QuizQuestion
+        The accepted questions, as compact immutable records.
     user_answers : list of str
         The user's answers in the order questions were presented.
-    results : list of dict
+    results : list of QuestionResult
         Evaluation records including correctness, question text, and user answer.
+    seen_history : SimilarityIndex
+        Every question shown in this session, for near-duplicate checks.
+    topic, difficulty : str
+        Topic and difficulty the current quiz was generated for.
+    evicted : bool
+        True if the quiz state was released after inactivity.
     """
 
+    # Limit how many times we will retry per requested question
+    MAX_ATTEMPTS_PER_QUESTION: int = 5
+
     def __init__(self) -> None:
         """Initialise an empty quiz state."""
         # Stores generated questions and metadata
-        self.questions: List[dict[str, Any]] = []
+        self.questions: List[QuizQuestion] = []
 
         # Stores user answers captured via the UI
         self.user_answers: List[str] = []
 
         # Stores evaluation results after marking
-        self.results: List[dict[str, Any]] = []
+        self.results: List[QuestionResult] = []
+
+        # Score of the marked quiz, computed once per `evaluate_quiz`
+        self._summary: Optional[ResultSummary] = None
+
+        # What the current quiz was generated for (tags saved results)
+        self.topic = ""
+        self.difficulty = ""
+
+        # Results-store id of the marked quiz, once saved
+        self._saved_quiz_id: Optional[str] = None
+
+        # Questions already shown in this session (across quizzes), so neither
+        # the question bank nor the LLM serves the same question twice
+        self.seen_history: SimilarityIndex = make_similarity_index()
+
+        # Questions freshly produced by the LLM during the current quiz
+        self._fresh_questions: List[MCQQuestion | FillBlankQuestion] = []
+
+        # Whether the current quiz already warned about a shortfall
+        self._shortfall_warned = False
+
+        # Set when the session's state was released after inactivity
+        self.evicted = False
+
+        self.logger = get_logger(self.__class__.__name__)
+
+    def release(self) -> None:
+        """
+        Drop this session's quiz state (called for idle sessions).
+
+        Questions, answers, results and the session's duplicate history are
+        cleared and `evicted` is set, so the app can tell the learner why
+        the quiz is gone when they come back.
+        """
+        self.questions = []
+        self.user_answers = []
+        self.results = []
+        self._summary = None
+        self._saved_quiz_id = None
+        self._fresh_questions = []
+        self.seen_history = make_similarity_index()
+        self.evicted = True
+
+    @staticmethod
+    def _answer_of(question: MCQQuestion | FillBlankQuestion) -> str:
+        """Return the correct answer of either question model."""
+        if isinstance(question, MCQQuestion):
+            return question.correct_answer
+        return question.answer
+
+    @staticmethod
+    def _to_record(
+        question: MCQQuestion | FillBlankQuestion,
+        question_type: str,
+    ) -> QuizQuestion:
+        """
+        Convert a validated question model into a compact, shared quiz record.
+
+        Parameters
+        ----------
+        question : MCQQuestion or FillBlankQuestion
+            The validated question returned by the generator.
+        question_type : str
+            The question type selected in the UI.
+
+        Returns
+        -------
+        QuizQuestion
+            The record used for rendering, evaluation and export, shared with
+            every other session holding the same question.
+        """
+        if question_type == "Multiple Choice":
+            record = QuizQuestion(
+                question_type=MCQ,
+                question=question.question,
+                correct_answer=question.correct_answer,
+                options=tuple(question.options),
+            )
+        else:
+            record = QuizQuestion(
+                question_type=FILL_BLANK,
+                question=question.question,
+                correct_answer=question.answer,
+            )
+        return intern_question(record)
+
+    def _accept(
+        self,
+        question: MCQQuestion | FillBlankQuestion,
+        question_type: str,
+        seen_questions: SimilarityIndex,
+        fresh: bool = True,
+    ) -> Optional[QuizQuestion]:
+        """
+        Add a question to the quiz unless it duplicates one already seen.
+
+        A question is rejected if it is a near-duplicate (similar wording, or
+        the same answer with related wording) of a question accepted in this
+        quiz or shown earlier in this session.
+
+        Parameters
+        ----------
+        question : MCQQuestion or FillBlankQuestion
+            Candidate question.
+        question_type : str
+            The question type selected in the UI.
+        seen_questions : SimilarityIndex
+            Questions accepted so far in this quiz.
+        fresh : bool, optional
+            True if the question came from the LLM (and should be banked).
+
+        Returns
+        -------
+        QuizQuestion or None
+            The accepted quiz record, or None for a duplicate.
+        """
+        answer = self._answer_of(question)
+
+        # Skip duplicates within this quiz and across the session
+        for index in (seen_questions, self.seen_history):
+            if index.find(question.question, answer) is not None:
+                return None
+
+        # Accept this question
+        seen_questions.add(question.question, answer)
+        self.seen_history.add(question.question, answer)
+        record = self._to_record(question, question_type)
+        self.questions.append(record)
+        if fresh:
+            self._fresh_questions.append(question)
+        metrics.questions_served.labels(
+            kind=question_kind(question_type),
+            source="generated" if fresh else "cached",
+        ).inc()
+        return record
+
+    def _avoid_list(self, rejected: List[str]) -> Optional[List[str]]:
+        """
+        Questions a duplicate retry should steer away from (oldest first).
+
+        Returns this quiz's questions plus the candidates rejected for the
+        current slot, or None when avoid-list prompting is disabled.
+        """
+        if not settings.AVOID_PROMPTING_ENABLED:
+            return None
+        return [record.question for record in self.questions] + rejected
+
+    @staticmethod
+    def _retry_arm(attempt: int, avoid: Optional[List[str]]) -> str:
+        """Label an attempt for `duplicate_stats`."""
+        if attempt == 0:
+            return "first"
+        return "retry_avoid" if avoid else "retry_plain"
+
+    def _warn_shortfall(self) -> None:
+        """Warn (once per quiz) that the quiz will be shorter than requested."""
+        if self._shortfall_warned:
+            return
+        self._shortfall_warned = True
+        st.warning(
+            "Could not generate enough unique questions for this topic. "
+            "The quiz will contain fewer questions than requested."
+        )
 
     def generate_questions(
         self,
@@ -82,15 +289,78 @@ class QuizManager:
         question_type: str,
         difficulty: str,
         num_questions: int,
+        mode: Optional[str] = None,
+        max_concurrency: Optional[int] = None,
+        bank: Optional[QuestionBank] = None,
+        pool: Optional[PrefetchPool] = None,
     ) -> bool:
         """
         Generate a batch of unique questions using the provided QuestionGenerator.
 
+        This is the blocking counterpart of `iter_questions`: it consumes the
+        whole stream before returning. See `iter_questions` for the parameters.
+
+        Returns
+        -------
+        bool
+            True if at least one question is generated successfully.
+            False if generation fails entirely.
+        """
+        try:
+            for _ in self.iter_questions(
+                generator,
+                topic,
+                question_type,
+                difficulty,
+                num_questions,
+                mode=mode,
+                max_concurrency=max_concurrency,
+                bank=bank,
+                pool=pool,
+            ):
+                pass
+
+        except Exception as exc:
+            st.error(f"Error generating questions: {exc}")
+            return False
+
+        # Return True if we managed to generate at least one question
+        if not self.questions:
+            st.error("No questions were generated.")
+            return False
+
+        return True
+
+    def iter_questions(
+        self,
+        generator: QuestionGenerator,
+        topic: str,
+        question_type: str,
+        difficulty: str,
+        num_questions: int,
+        mode: Optional[str] = None,
+        max_concurrency: Optional[int] = None,
+        bank: Optional[QuestionBank] = None,
+        pool: Optional[PrefetchPool] = None,
+    ) -> Iterator[QuizQuestion]:
+        """
+        Generate unique questions, yielding each one as soon as it is accepted.
+
         This method:
         - Resets the current quiz state
-        - Calls the LLM-backed generator repeatedly
-        - Rejects duplicate question texts and retries a few times
-        - Populates `self.questions` with only unique questions
+        - Serves unseen questions from the prefetch pool and then the question
+          bank first, if they are given
+        - Tops up the remainder with the LLM-backed generator one question at
+          a time, concurrently with a bounded number of in-flight requests,
+          or in batches of several questions per LLM call
+        - Rejects near-duplicate questions (within the quiz and the session's
+          history) and retries a few times
+        - Populates `self.questions` with only unique questions and stores
+          newly generated ones in the bank once the stream ends
+
+        Accepted records are also appended to `self.questions`, so the quiz is
+        complete once the iterator is exhausted. The "fewer questions than
+        requested" warning is shown as soon as a shortfall is known.
 
         Parameters
         ----------
@@ -104,98 +374,324 @@ class QuizManager:
             Difficulty level (e.g. 'Easy', 'Medium', 'Hard').
         num_questions : int
             Number of questions to generate.
-
-        Returns
-        -------
-        bool
-            True if at least one question is generated successfully.
-            False if generation fails entirely.
+        mode : str, optional
+            'sequential', 'concurrent' or 'batch'. Defaults to
+            `settings.GENERATION_MODE`.
+        max_concurrency : int, optional
+            Maximum simultaneous LLM calls in concurrent mode. Defaults to
+            `settings.MAX_CONCURRENCY`.
+        bank : QuestionBank, optional
+            Persistent question bank to read from and write to.
+        pool : PrefetchPool, optional
+            Background-filled buffer of ready-made questions for presets.
+
+        Yields
+        ------
+        QuizQuestion
+            Each accepted question record, in acceptance order.
+
+        Raises
+        ------
+        Exception
+            Any unrecoverable generation error is propagated to the caller.
         """
         # Reset internal quiz state for a new quiz
         self.questions = []
         self.user_answers = []
         self.results = []
+        self._summary = None
+        self._saved_quiz_id = None
+        self._fresh_questions = []
+        self._shortfall_warned = False
+        self.topic = topic
+        self.difficulty = difficulty
 
-        # Track seen question texts to avoid duplicates (case-insensitive)
-        seen_questions: set[str] = set()
+        mode = mode or settings.GENERATION_MODE
+        max_concurrency = max_concurrency or settings.MAX_CONCURRENCY
 
-        # Limit how many times we will retry per requested question
-        max_attempts_per_question = 5
+        # Track this quiz's questions to reject (near-)duplicates
+        seen_questions = make_similarity_index()
 
         try:
-            for _ in range(num_questions):
-                attempts = 0
-                unique_question_added = False
+            # Serve ready-made questions from the prefetch buffers first
+            if pool is not None:
+                for question in pool.take(
+                    topic,
+                    question_type,
+                    difficulty,
+                    num_questions,
+                    exclude=self.seen_history,
+                ):
+                    record = self._accept(question, question_type, seen_questions, fresh=False)
+                    if record is not None:
+                        yield record
+
+            # Then serve as much of the rest as possible from the bank
+            if bank is not None and len(self.questions) < num_questions:
+                for question in bank.sample(
+                    topic,
+                    question_type,
+                    difficulty,
+                    num_questions - len(self.questions),
+                    exclude=self.seen_history,
+                ):
+                    record = self._accept(question, question_type, seen_questions, fresh=False)
+                    if record is not None:
+                        yield record
+
+            remaining = num_questions - len(self.questions)
+            if remaining <= 0:
+                return
+
+            if mode == "concurrent":
+                # Fan out every remaining question at once
+                stream = self._iter_concurrent(
+                    generator,
+                    topic,
+                    question_type,
+                    difficulty,
+                    remaining,
+                    seen_questions,
+                    max_concurrency,
+                )
+            elif mode == "batch":
+                # Ask for all remaining questions in as few LLM calls as possible
+                stream = self._iter_batched(
+                    generator,
+                    topic,
+                    question_type,
+                    difficulty,
+                    remaining,
+                    seen_questions,
+                )
+            else:
+                stream = self._iter_unique(
+                    generator,
+                    topic,
+                    question_type,
+                    difficulty,
+                    remaining,
+                    seen_questions,
+                )
 
-                while attempts < max_attempts_per_question and not unique_question_added:
-                    attempts += 1
+            yield from stream
 
-                    if question_type == "Multiple Choice":
-                        # Generate a multiple-choice question
-                        question = generator.generate_mcq(topic, difficulty.lower())
-
-                        question_text = question.question.strip().lower()
-
-                        # Skip duplicates
-                        if question_text in seen_questions:
-                            continue
-
-                        # Accept this question
-                        seen_questions.add(question_text)
-                        self.questions.append(
-                            {
-                                "type": "MCQ",
-                                "question": question.question,
-                                "options": question.options,
-                                "correct_answer": question.correct_answer,
-                            }
-                        )
-                        unique_question_added = True
+        finally:
+            self.logger.info(f"Duplicate-retry stats: {duplicate_stats.snapshot()}")
+            metrics.quiz_questions.observe(len(self.questions))
 
-                    else:
-                        # Generate a fill-in-the-blank question
-                        question = generator.generate_fill_blank(
-                            topic,
-                            difficulty.lower(),
-                        )
+            # Keep every validated LLM question for future quizzes
+            if bank is not None and self._fresh_questions:
+                try:
+                    bank.add(topic, question_type, difficulty, self._fresh_questions)
+                except Exception as exc:
+                    st.warning(f"Could not store questions in the question bank: {exc}")
 
-                        question_text = question.question.strip().lower()
+    def _iter_unique(
+        self,
+        generator: QuestionGenerator,
+        topic: str,
+        question_type: str,
+        difficulty: str,
+        num_questions: int,
+        seen_questions: SimilarityIndex,
+    ) -> Iterator[QuizQuestion]:
+        """Generate unique questions one after another, yielding each record."""
+        for _ in range(num_questions):
+            attempts = 0
+            record = None
+            rejected: List[str] = []
+
+            while attempts < self.MAX_ATTEMPTS_PER_QUESTION and record is None:
+                # Retries tell the model what we already have
+                avoid = self._avoid_list(rejected) if attempts else None
+
+                if question_type == "Multiple Choice":
+                    question = generator.generate_mcq(topic, difficulty.lower(), avoid=avoid)
+                else:
+                    question = generator.generate_fill_blank(
+                        topic,
+                        difficulty.lower(),
+                        avoid=avoid,
+                    )
 
-                        # Skip duplicates
-                        if question_text in seen_questions:
-                            continue
+                record = self._accept(question, question_type, seen_questions)
+                duplicate_stats.record(self._retry_arm(attempts, avoid), record is None)
+                if record is None:
+                    rejected.append(question.question)
+                attempts += 1
 
-                        # Accept this question
-                        seen_questions.add(question_text)
-                        self.questions.append(
-                            {
-                                "type": "Fill in the blank",
-                                "question": question.question,
-                                "correct_answer": question.answer,
-                            }
-                        )
-                        unique_question_added = True
-
-                # If we could not get a unique question after several attempts,
-                # stop trying to generate more for this run.
-                if not unique_question_added:
-                    st.warning(
-                        "Could not generate enough unique questions for this topic. "
-                        "The quiz will contain fewer questions than requested."
+            # If we could not get a unique question after several attempts,
+            # stop trying to generate more for this run.
+            if record is None:
+                self._warn_shortfall()
+                return
+
+            yield record
+
+    def _iter_batched(
+        self,
+        generator: QuestionGenerator,
+        topic: str,
+        question_type: str,
+        difficulty: str,
+        num_questions: int,
+        seen_questions: SimilarityIndex,
+    ) -> Iterator[QuizQuestion]:
+        """
+        Generate unique questions with batched LLM calls, yielding each record.
+
+        Each round requests only the questions still missing; duplicates of
+        already accepted questions are discarded and re-requested next round,
+        with the existing questions listed in the prompt to avoid.
+        """
+        accepted = 0
+        rejected: List[str] = []
+
+        for round_index in range(self.MAX_ATTEMPTS_PER_QUESTION):
+            missing = num_questions - accepted
+            if missing <= 0:
+                return
+
+            avoid = self._avoid_list(rejected) if round_index else None
+            batch = generator.generate_batch(
+                topic,
+                difficulty.lower(),
+                missing,
+                question_type,
+                avoid=avoid,
+            )
+
+            for question in batch[:missing]:
+                record = self._accept(question, question_type, seen_questions)
+                duplicate_stats.record(self._retry_arm(round_index, avoid), record is None)
+                if record is not None:
+                    accepted += 1
+                    yield record
+                else:
+                    rejected.append(question.question)
+
+        if accepted < num_questions:
+            self._warn_shortfall()
+
+    def _iter_concurrent(
+        self,
+        generator: QuestionGenerator,
+        topic: str,
+        question_type: str,
+        difficulty: str,
+        num_questions: int,
+        seen_questions: SimilarityIndex,
+        max_concurrency: int,
+    ) -> Iterator[QuizQuestion]:
+        """
+        Run `_agenerate_unique` on the shared event loop, yielding records
+        to the calling thread as each task accepts one.
+        """
+        events: queue.Queue = queue.Queue()
+
+        async def produce() -> None:
+            try:
+                # Slots of this quiz are siblings: never coalesced with each other
+                with quiz_scope():
+                    await self._agenerate_unique(
+                        generator,
+                        topic,
+                        question_type,
+                        difficulty,
+                        num_questions,
+                        seen_questions,
+                        max_concurrency,
+                        on_event=events.put_nowait,
                     )
+            finally:
+                events.put_nowait(_STREAM_DONE)
+
+        future = submit_coroutine(produce())
+        try:
+            while True:
+                event = events.get()
+                if event is _STREAM_DONE:
                     break
+                if event is _SLOT_FAILED:
+                    self._warn_shortfall()
+                    continue
+                yield event
 
-        except Exception as exc:
-            st.error(f"Error generating questions: {exc}")
-            return False
+            # Surface any generation error raised on the loop
+            future.result()
 
-        # Return True if we managed to generate at least one question
-        if not self.questions:
-            st.error("No questions were generated.")
+        finally:
+            # Consumer stopped early or failed -> cancel outstanding calls
+            future.cancel()
+
+    async def _agenerate_unique(
+        self,
+        generator: QuestionGenerator,
+        topic: str,
+        question_type: str,
+        difficulty: str,
+        num_questions: int,
+        seen_questions: SimilarityIndex,
+        max_concurrency: int,
+        on_event: Callable[[Any], None],
+    ) -> int:
+        """
+        Generate unique questions concurrently, bounded by a semaphore.
+
+        Each requested question gets its own task with the same per-question
+        attempt cap as the sequential path. Duplicate checks need no lock
+        because every task runs on the same event loop. Every accepted record
+        (or `_SLOT_FAILED` marker) is passed to `on_event` immediately.
+
+        Returns
+        -------
+        int
+            The number of requested questions that could not be generated.
+        """
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+        async def fill_slot() -> bool:
+            rejected: List[str] = []
+
+            for attempt in range(self.MAX_ATTEMPTS_PER_QUESTION):
+                # Retries tell the model what we already have
+                avoid = self._avoid_list(rejected) if attempt else None
+
+                async with semaphore:
+                    if question_type == "Multiple Choice":
+                        question = await generator.agenerate_mcq(
+                            topic,
+                            difficulty.lower(),
+                            avoid=avoid,
+                        )
+                    else:
+                        question = await generator.agenerate_fill_blank(
+                            topic,
+                            difficulty.lower(),
+                            avoid=avoid,
+                        )
+
+                record = self._accept(question, question_type, seen_questions)
+                duplicate_stats.record(self._retry_arm(attempt, avoid), record is None)
+                if record is not None:
+                    on_event(record)
+                    return True
+                rejected.append(question.question)
+
+            on_event(_SLOT_FAILED)
             return False
 
-        return True
+        tasks = [asyncio.ensure_future(fill_slot()) for _ in range(num_questions)]
+        try:
+            filled = await asyncio.gather(*tasks)
+        except BaseException:
+            # One slot failed hard -> stop the others before propagating
+            for task in tasks:
+                task.cancel()
+            raise
 
+        return filled.count(False)
 
     def attempt_quiz(self) -> None:
         """
@@ -212,13 +708,13 @@ class QuizManager:
 
         for i, q in enumerate(self.questions):
             # Display question text
-            st.markdown(f"**Question {i + 1}: {q['question']}**")
+            st.markdown(f"**Question {i + 1}: {q.question}**")
 
-            if q["type"] == "MCQ":
+            if q.is_mcq:
                 # Multiple-choice selection widget
                 user_answer = st.radio(
                     f"Select an answer for Question {i + 1}",
-                    q["options"],
+                    q.options,
                     key=f"mcq_{i}",
                 )
                 self.user_answers.append(user_answer)
@@ -243,54 +739,143 @@ class QuizManager:
         - correctness flag
         - options (if applicable)
         """
-        # Reset previous evaluation results
+        # Reset previous evaluation results (and the cached summary)
         self.results = []
+        self._summary = None
+        self._saved_quiz_id = None
 
         for i, (q, user_ans) in enumerate(zip(self.questions, self.user_answers)):
-            # Base result record for each question
-            result_dict: dict[str, Any] = {
-                "question_number": i + 1,
-                "question": q["question"],
-                "question_type": q["type"],
-                "user_answer": user_ans,
-                "correct_answer": q["correct_answer"],
-                "is_correct": False,
-            }
-
-            if q["type"] == "MCQ":
-                # For MCQs, store options and compare directly
-                result_dict["options"] = q["options"]
-                result_dict["is_correct"] = user_ans == q["correct_answer"]
+            if q.is_mcq:
+                # For MCQs, compare directly
+                is_correct = user_ans == q.correct_answer
             else:
                 # For fill-in-the-blank, normalise case and whitespace
-                result_dict["options"] = []
-                result_dict["is_correct"] = (
-                    user_ans.strip().lower()
-                    == q["correct_answer"].strip().lower()
+                is_correct = user_ans.strip().lower() == q.correct_answer.strip().lower()
+
+            self.results.append(
+                QuestionResult(
+                    question_number=i + 1,
+                    record=q,
+                    user_answer=user_ans,
+                    is_correct=is_correct,
                 )
+            )
 
-            self.results.append(result_dict)
+    def result_summary(self) -> ResultSummary:
+        """
+        Return the score and per-question correctness of the marked quiz.
+
+        The summary is computed on the first call after `evaluate_quiz` and
+        reused by every later rerun.
+
+        Returns
+        -------
+        ResultSummary
+            Marked answers, correct count and total (empty before marking).
+        """
+        if self._summary is None:
+            self._summary = ResultSummary.from_results(self.results)
+        return self._summary
 
     def generate_result_dataframe(self) -> pd.DataFrame:
         """
         Convert the quiz results into a pandas DataFrame.
 
+        Only used for export; the UI renders `result_summary()` instead.
+
         Returns
         -------
         pandas.DataFrame
             A DataFrame containing one row per question result. Returns an
             empty DataFrame if no results are available.
         """
+        # pandas is only needed for exports, so it is imported on first use
+        import pandas as pd
+
         # Return an empty DataFrame if there are no results yet
         if not self.results:
             return pd.DataFrame()
 
-        return pd.DataFrame(self.results)
+        return pd.DataFrame([result.as_row() for result in self.results])
+
+    def results_csv(self) -> bytes:
+        """
+        Render the quiz results as CSV in memory (for `st.download_button`).
+
+        Columns and value formatting match the files written by
+        `save_to_csv`, without going through pandas or the filesystem.
+
+        Returns
+        -------
+        bytes
+            UTF-8 encoded CSV; empty if there are no results.
+        """
+        if not self.results:
+            return b""
+
+        buffer = io.StringIO()
+        rows = [result.as_row() for result in self.results]
+        writer = csv.DictWriter(buffer, fieldnames=list(rows[0]), lineterminator="\n")
+        writer.writeheader()
+        for row in rows:
+            # Same rendering as pandas' `to_csv` for the list column
+            writer.writerow({**row, "options": str(row["options"])})
+        return buffer.getvalue().encode("utf-8")
+
+    def save_results(
+        self,
+        store: ResultsStore,
+        session_id: Optional[str] = None,
+        user_id: Optional[str] = None,
+    ) -> Optional[str]:
+        """
+        Append the marked quiz to the results store.
+
+        The rows are buffered; the store writes them in batches (at the
+        latest after `RESULTS_FLUSH_SECONDS`), so saving never waits for
+        the database. Saving the same quiz again does not duplicate rows.
+
+        Parameters
+        ----------
+        store : ResultsStore
+            Append-only results store.
+        session_id : str, optional
+            Streamlit session that took the quiz.
+        user_id : str, optional
+            Authenticated user, for deployments that have one.
+
+        Returns
+        -------
+        str or None
+            The quiz's id in the store, or None if there are no results or
+            they could not be queued.
+        """
+        if not self.results:
+            st.warning("No results to save.")
+            return None
+
+        if self._saved_quiz_id is None:
+            try:
+                self._saved_quiz_id = store.append(
+                    (result.as_row() for result in self.results),
+                    topic=self.topic,
+                    difficulty=self.difficulty,
+                    session_id=session_id,
+                    user_id=user_id,
+                )
+            except Exception as exc:
+                st.error(f"Failed to save results: {exc}")
+                return None
+
+        st.success("Results saved successfully.")
+        return self._saved_quiz_id
 
     def save_to_csv(self, filename_prefix: str = "quiz_results") -> Optional[str]:
         """
         Save quiz results to a timestamped CSV file in a `results/` directory.
 
+        Legacy export path (`RESULTS_BACKEND=csv`); see `save_results`.
+
         Parameters
         ----------
         filename_prefix : str, optional
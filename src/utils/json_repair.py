@@ -0,0 +1,270 @@
+"""
+json_repair.py
+
+Tolerant JSON extraction and repair for LLM responses in the LLMOps
+StudyBuddy project.
+
+Many failed generations are "almost JSON": the object is wrapped in a
+```json fence, preceded by prose such as "Here is your question:", uses
+single quotes or Python literals, or ends with a trailing comma. Each of
+those used to cost a full new LLM call. This module recovers them locally:
+
+- `extract_json_block` finds the first balanced JSON object or array
+- `repair_json` applies cheap, conservative textual fixes
+- `loads_tolerant` tries strict parsing first and falls back to the above
+- `repair_stats` records how often repair succeeds
+
+Strict decoding uses `orjson` when it is installed (`JSON_DECODER` names the
+decoder in use) and the standard library otherwise.
+
+Nothing here knows about question schemas; nested `question` objects and
+all other validation are handled by the Pydantic models.
+"""
+
+# --------------------------------------------------------------
+# Imports
+# --------------------------------------------------------------
+from __future__ import annotations
+
+import json
+import re
+import threading
+from collections import Counter
+from typing import Any, Dict, Optional
+
+try:
+    import orjson
+
+    _fast_loads = orjson.loads
+    _DECODE_ERRORS: tuple = (orjson.JSONDecodeError, TypeError)
+    JSON_DECODER = "orjson"
+except ImportError:  # pragma: no cover - optional dependency
+    _fast_loads = json.loads
+    _DECODE_ERRORS = (json.JSONDecodeError, TypeError)
+    JSON_DECODER = "json"
+
+# Leading/trailing Markdown code fences (``` or ```json)
+_FENCE_RE = re.compile(r"```(?:json|JSON)?\s*(.*?)\s*```", re.DOTALL)
+
+# Typographic quotes some models emit instead of ASCII quotes
+_SMART_QUOTES = str.maketrans({"“": '"', "”": '"', "‘": "'", "’": "'"})
+
+# Bare Python literals and their JSON equivalents
+_LITERALS = {"True": "true", "False": "false", "None": "null"}
+
+_OPENERS = {"{": "}", "[": "]"}
+
+
+# --------------------------------------------------------------
+# Extraction
+# --------------------------------------------------------------
+def extract_json_block(text: str) -> Optional[str]:
+    """
+    Return the first balanced JSON object or array found in `text`.
+
+    Code fences are stripped first. Brackets inside string literals (single
+    or double quoted) are ignored. If the block is truncated, the missing
+    closing brackets are appended.
+
+    Parameters
+    ----------
+    text : str
+        Raw model output.
+
+    Returns
+    -------
+    str or None
+        The candidate JSON text, or None if no opening bracket was found.
+    """
+    fenced = _FENCE_RE.search(text)
+    if fenced:
+        text = fenced.group(1)
+
+    starts = [i for i in (text.find("{"), text.find("[")) if i != -1]
+    if not starts:
+        return None
+    start = min(starts)
+
+    stack: list[str] = []
+    quote: Optional[str] = None
+    escaped = False
+
+    for index in range(start, len(text)):
+        char = text[index]
+
+        if quote:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == quote:
+                quote = None
+            continue
+
+        if char in ("\"", "'"):
+            quote = char
+        elif char in _OPENERS:
+            stack.append(_OPENERS[char])
+        elif stack and char == stack[-1]:
+            stack.pop()
+            if not stack:
+                return text[start:index + 1]
+
+    # Truncated output -> close whatever is still open
+    return text[start:] + "".join(reversed(stack))
+
+
+# --------------------------------------------------------------
+# Repair
+# --------------------------------------------------------------
+def repair_json(text: str) -> str:
+    """
+    Apply cheap fixes that turn near-JSON into JSON.
+
+    Fixes applied (outside string literals only where relevant):
+    - typographic quotes -> ASCII quotes
+    - single-quoted strings -> double-quoted strings
+    - `True` / `False` / `None` -> `true` / `false` / `null`
+    - trailing commas before `}` or `]`
+
+    Parameters
+    ----------
+    text : str
+        Candidate JSON text (usually from `extract_json_block`).
+
+    Returns
+    -------
+    str
+        The repaired text; it may still be invalid JSON.
+    """
+    text = text.translate(_SMART_QUOTES)
+    out: list[str] = []
+    index = 0
+    length = len(text)
+
+    while index < length:
+        char = text[index]
+
+        # String literal: copy through, converting single to double quotes
+        if char in ("\"", "'"):
+            quote = char
+            out.append("\"")
+            index += 1
+            while index < length:
+                char = text[index]
+                if char == "\\" and index + 1 < length:
+                    nxt = text[index + 1]
+                    # \' is not a valid JSON escape
+                    out.append("'" if nxt == "'" else char + nxt)
+                    index += 2
+                    continue
+                if char == quote:
+                    break
+                if char == "\"" and quote == "'":
+                    out.append("\\\"")
+                elif char == "\n":
+                    out.append("\\n")
+                else:
+                    out.append(char)
+                index += 1
+            out.append("\"")
+            index += 1
+            continue
+
+        # Trailing comma: drop it if the next significant char closes a container
+        if char == ",":
+            lookahead = index + 1
+            while lookahead < length and text[lookahead].isspace():
+                lookahead += 1
+            if lookahead < length and text[lookahead] in "}]":
+                index += 1
+                continue
+
+        # Bare Python literals
+        if char.isalpha():
+            end = index
+            while end < length and (text[end].isalnum() or text[end] == "_"):
+                end += 1
+            word = text[index:end]
+            out.append(_LITERALS.get(word, word))
+            index = end
+            continue
+
+        out.append(char)
+        index += 1
+
+    return "".join(out)
+
+
+def loads_tolerant(text: str) -> Any:
+    """
+    Decode model output as JSON, repairing it locally if necessary.
+
+    Parameters
+    ----------
+    text : str
+        Raw model output.
+
+    Returns
+    -------
+    Any
+        The decoded JSON value.
+
+    Raises
+    ------
+    ValueError
+        If the text cannot be decoded even after repair.
+    """
+    try:
+        return _fast_loads(text)
+    except _DECODE_ERRORS:
+        pass
+
+    block = extract_json_block(text)
+    if block is None:
+        raise ValueError("No JSON object or array found in model output.")
+
+    for candidate in (block, repair_json(block)):
+        try:
+            return _fast_loads(candidate)
+        except _DECODE_ERRORS:
+            continue
+
+    raise ValueError("Model output could not be repaired into valid JSON.")
+
+
+# --------------------------------------------------------------
+# Repair Statistics
+# --------------------------------------------------------------
+class RepairStats:
+    """
+    Thread-safe counters for the repair stage.
+
+    Outcomes:
+    - 'direct'   : the raw response parsed without repair
+    - 'repaired' : the response parsed only after local repair
+    - 'failed'   : repair could not rescue the response
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counts: Counter = Counter()
+
+    def record(self, outcome: str) -> None:
+        """Increment the counter for an outcome."""
+        with self._lock:
+            self._counts[outcome] += 1
+
+    def hit_rate(self) -> float:
+        """Share of repair attempts that succeeded (0.0 if none yet)."""
+        with self._lock:
+            attempts = self._counts["repaired"] + self._counts["failed"]
+            return self._counts["repaired"] / attempts if attempts else 0.0
+
+    def snapshot(self) -> Dict[str, int]:
+        """Return a copy of all counters."""
+        with self._lock:
+            return {key: self._counts[key] for key in ("direct", "repaired", "failed")}
+
+
+repair_stats = RepairStats()
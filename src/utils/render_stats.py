@@ -0,0 +1,107 @@
+"""
+render_stats.py
+
+Per-session rerun accounting for the LLMOps StudyBuddy Streamlit app.
+
+Streamlit re-executes the script (or, for `st.fragment`s, just the
+fragment) on every widget interaction. `track_render(scope)` wraps one such
+execution and records it:
+
+- per session, in `st.session_state["render_stats"]` (`RenderStats`), so the
+  app can show how many runs of each scope happened and what they cost
+- per process, in the `studybuddy_render_cpu_seconds` Prometheus histogram
+
+Scopes used by the app are 'app' (full script run), 'quiz' (quiz fragment)
+and 'results' (results fragment). A fragment that runs as part of a full
+script run is counted both in its own scope and inside the 'app' run.
+"""
+
+# --------------------------------------------------------------
+# Imports
+# --------------------------------------------------------------
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator
+
+import streamlit as st
+
+from src.common import metrics
+
+# Session-state key holding the session's `RenderStats`
+_SESSION_KEY = "render_stats"
+
+
+# --------------------------------------------------------------
+# Statistics
+# --------------------------------------------------------------
+class RenderStats:
+    """
+    Runs and CPU/wall time per render scope for one session.
+
+    Methods
+    -------
+    record(scope, cpu_seconds, wall_seconds)
+        Add one run.
+    snapshot()
+        Runs, total and mean CPU milliseconds and mean wall milliseconds per scope.
+    """
+
+    def __init__(self) -> None:
+        self._runs: Dict[str, int] = {}
+        self._cpu: Dict[str, float] = {}
+        self._wall: Dict[str, float] = {}
+
+    def record(self, scope: str, cpu_seconds: float, wall_seconds: float) -> None:
+        """Add one run of `scope` (a session renders on one thread at a time)."""
+        self._runs[scope] = self._runs.get(scope, 0) + 1
+        self._cpu[scope] = self._cpu.get(scope, 0.0) + cpu_seconds
+        self._wall[scope] = self._wall.get(scope, 0.0) + wall_seconds
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """Return per-scope counters in milliseconds."""
+        return {
+            scope: {
+                "runs": runs,
+                "cpu_ms_total": round(self._cpu[scope] * 1000, 2),
+                "cpu_ms_mean": round(self._cpu[scope] * 1000 / runs, 2),
+                "wall_ms_mean": round(self._wall[scope] * 1000 / runs, 2),
+            }
+            for scope, runs in self._runs.items()
+        }
+
+
+def session_render_stats() -> RenderStats:
+    """Return the current session's `RenderStats`, creating it on first use."""
+    if _SESSION_KEY not in st.session_state:
+        st.session_state[_SESSION_KEY] = RenderStats()
+    return st.session_state[_SESSION_KEY]
+
+
+# --------------------------------------------------------------
+# Tracking
+# --------------------------------------------------------------
+@contextmanager
+def track_render(scope: str) -> Iterator[None]:
+    """
+    Time one script or fragment run.
+
+    CPU time is measured with `time.thread_time`, i.e. only the work done by
+    the session's script thread. Runs cut short by `st.rerun()` are still
+    recorded.
+
+    Parameters
+    ----------
+    scope : str
+        Name of what is being rendered ('app', 'quiz', 'results', ...).
+    """
+    stats = session_render_stats()
+    cpu_started = time.thread_time()
+    wall_started = time.perf_counter()
+    try:
+        yield
+    finally:
+        cpu = time.thread_time() - cpu_started
+        stats.record(scope, cpu, time.perf_counter() - wall_started)
+        metrics.render_cpu_seconds.labels(scope=scope).observe(cpu)
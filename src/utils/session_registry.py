@@ -0,0 +1,236 @@
+"""
+session_registry.py
+
+Idle-session eviction and memory accounting for the LLMOps StudyBuddy
+Streamlit app.
+
+Every session keeps a `QuizManager` in `st.session_state`, and Streamlit
+only drops a session long after its browser tab is gone. The process-wide
+`SessionRegistry` records when each session last ran:
+
+- `touch(session_id, manager)` is called on every script/fragment run
+- sessions idle for longer than `SESSION_IDLE_SECONDS` have their quiz
+  state released (`QuizManager.release`); sweeps piggyback on `touch`, at
+  most once every `SESSION_SWEEP_SECONDS`
+- `memory_report()` measures bytes per session and in total; questions
+  shared between sessions (see `intern_question`) are counted once in the
+  total
+
+The registry holds sessions' managers through weak references, so it never
+keeps a session alive on its own.
+"""
+
+# --------------------------------------------------------------
+# Imports
+# --------------------------------------------------------------
+from __future__ import annotations
+
+import logging
+import sys
+import threading
+import time
+import types
+import weakref
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Set
+
+from src.common import metrics
+from src.common.logger import get_logger
+from src.config.settings import settings
+
+if TYPE_CHECKING:
+    from src.utils.helpers import QuizManager
+
+logger = get_logger(__name__)
+
+# Objects never traversed by `deep_sizeof`: process-wide, not session state
+_OPAQUE = (
+    type,
+    types.ModuleType,
+    types.FunctionType,
+    types.BuiltinFunctionType,
+    types.MethodType,
+    logging.Logger,
+    type(threading.Lock()),
+    type(threading.RLock()),
+)
+
+
+# --------------------------------------------------------------
+# Memory Accounting
+# --------------------------------------------------------------
+def deep_sizeof(obj: Any, seen: Optional[Set[int]] = None) -> int:
+    """
+    Return the approximate memory footprint of `obj` and what it references.
+
+    Containers, instance `__dict__`s and `__slots__` are followed; classes,
+    modules, functions, loggers and locks are not. Objects whose id is in
+    `seen` are skipped, so passing one `seen` set across several calls
+    counts shared objects once.
+
+    Parameters
+    ----------
+    obj : Any
+        Root object.
+    seen : set of int, optional
+        Ids of objects already counted (updated in place).
+
+    Returns
+    -------
+    int
+        Size in bytes.
+    """
+    seen = set() if seen is None else seen
+    total = 0
+    stack = [obj]
+
+    while stack:
+        current = stack.pop()
+        if id(current) in seen or isinstance(current, _OPAQUE):
+            continue
+        seen.add(id(current))
+        total += sys.getsizeof(current)
+
+        if isinstance(current, dict):
+            stack.extend(current.keys())
+            stack.extend(current.values())
+        elif isinstance(current, (list, tuple, set, frozenset)):
+            stack.extend(current)
+        elif isinstance(current, (str, bytes, int, float, bool)) or current is None:
+            continue
+        else:
+            instance_dict = getattr(current, "__dict__", None)
+            if instance_dict is not None:
+                stack.append(instance_dict)
+            for cls in type(current).__mro__:
+                for name in getattr(cls, "__slots__", ()):
+                    if name != "__weakref__" and hasattr(current, name):
+                        stack.append(getattr(current, name))
+    return total
+
+
+# --------------------------------------------------------------
+# Session Registry
+# --------------------------------------------------------------
+class SessionRegistry:
+    """
+    Last activity and quiz state of every live session in this process.
+
+    Parameters
+    ----------
+    idle_seconds : float
+        Inactivity after which a session's quiz state is released.
+    sweep_seconds : float
+        Minimum interval between idle sweeps.
+
+    Methods
+    -------
+    touch(session_id, manager)
+        Record activity (and sweep idle sessions if a sweep is due).
+    evict_idle(now=None)
+        Release every session idle for longer than `idle_seconds`.
+    memory_report()
+        Bytes per session and in total.
+    """
+
+    def __init__(self, idle_seconds: float, sweep_seconds: float) -> None:
+        self.idle_seconds = idle_seconds
+        self.sweep_seconds = sweep_seconds
+        self._lock = threading.Lock()
+        self._last_seen: Dict[str, float] = {}
+        self._managers: Dict[str, "weakref.ReferenceType[QuizManager]"] = {}
+        self._last_sweep = time.monotonic()
+        self.evicted = 0
+
+    def touch(self, session_id: str, manager: "QuizManager") -> None:
+        """Record that `session_id` just ran, holding `manager` as its quiz state."""
+        now = time.monotonic()
+        with self._lock:
+            self._last_seen[session_id] = now
+            current = self._managers.get(session_id)
+            if current is None or current() is not manager:
+                self._managers[session_id] = weakref.ref(manager)
+            sweep_due = now - self._last_sweep >= self.sweep_seconds
+            if sweep_due:
+                self._last_sweep = now
+
+        if sweep_due:
+            self.evict_idle(now)
+
+    def evict_idle(self, now: Optional[float] = None) -> int:
+        """
+        Release the quiz state of sessions idle for longer than `idle_seconds`.
+
+        Returns
+        -------
+        int
+            Number of sessions evicted.
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            idle = [sid for sid, seen in self._last_seen.items() if now - seen > self.idle_seconds]
+            managers = [self._managers.pop(sid, None) for sid in idle]
+            for sid in idle:
+                del self._last_seen[sid]
+            active = len(self._last_seen)
+
+        evicted = 0
+        for ref in managers:
+            manager = ref() if ref is not None else None
+            if manager is not None:
+                manager.release()
+                evicted += 1
+
+        self.evicted += evicted
+        metrics.sessions_active.set(active)
+        if evicted:
+            metrics.sessions_evicted.inc(evicted)
+            logger.info(f"Evicted {evicted} idle session(s); {active} active.")
+        return evicted
+
+    def memory_report(self) -> Dict[str, Any]:
+        """
+        Measure the quiz state of every registered session.
+
+        Returns
+        -------
+        dict
+            `sessions` (id prefix, idle seconds and bytes per session, largest
+            first), `total_bytes` (shared objects counted once) and `evicted`.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entries = [
+                (sid, now - self._last_seen[sid], ref())
+                for sid, ref in self._managers.items()
+            ]
+
+        sessions: List[Dict[str, Any]] = []
+        shared_seen: Set[int] = set()
+        total = 0
+        for sid, idle, manager in entries:
+            if manager is None:
+                continue
+            sessions.append(
+                {"session": sid[:8], "idle_seconds": round(idle, 1), "bytes": deep_sizeof(manager)}
+            )
+            total += deep_sizeof(manager, shared_seen)
+
+        metrics.session_memory_bytes.set(total)
+        return {
+            "sessions": sorted(sessions, key=lambda row: row["bytes"], reverse=True),
+            "total_bytes": total,
+            "evicted": self.evicted,
+        }
+
+
+_registry: Optional[SessionRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_session_registry() -> SessionRegistry:
+    """Return the process-wide session registry."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = SessionRegistry(settings.SESSION_IDLE_SECONDS, settings.SESSION_SWEEP_SECONDS)
+        return _registry
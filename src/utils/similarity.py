@@ -0,0 +1,333 @@
+"""
+similarity.py
+
+Near-duplicate detection for generated questions in the LLMOps StudyBuddy
+project.
+
+Exact-text matching lets paraphrases through ("Which planet is the
+largest...?" vs "What is the largest planet...?"). This module provides
+small, pluggable indexes that answer "have we already got this question?"
+in well under a millisecond:
+
+- `ExactIndex` reproduces the original case-insensitive exact-match check
+- `MinHashIndex` shingles each question into content words, uses MinHash
+  signatures with LSH banding to find candidates, and confirms them with the
+  exact Jaccard similarity of the word sets
+
+Two questions are duplicates when their texts are similar enough, or when
+they share the same answer and their texts are moderately similar (the same
+fact asked in different words).
+
+Indexes support `in` with a question text, so they can be passed anywhere a
+set of question keys was accepted before (e.g. `QuestionBank.sample`'s
+`exclude`).
+
+`duplicate_stats` records how often generated questions are rejected as
+duplicates, split by first attempts and by retries with or without an avoid
+list in the prompt, so the effect of avoid-list prompting can be measured.
+Rejections are also exported as a Prometheus counter.
+"""
+
+# --------------------------------------------------------------
+# Imports
+# --------------------------------------------------------------
+from __future__ import annotations
+
+import hashlib
+import random
+import re
+import threading
+from collections import Counter, defaultdict
+from typing import Dict, FrozenSet, List, Optional, Protocol, Tuple
+
+from src.common import metrics
+from src.config.settings import settings
+
+# Words that carry no meaning for duplicate detection
+_STOPWORDS = frozenset(
+    """
+    a an and are as at be by can did do does for from has have how in into is it
+    its of on or that the their these this those to was were what when where which
+    who whom whose why will with following best most true false called known
+    """.split()
+)
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Mersenne prime used for the universal hash family
+_PRIME = (1 << 61) - 1
+
+
+# --------------------------------------------------------------
+# Text Features
+# --------------------------------------------------------------
+def _stem(word: str) -> str:
+    """Very light stemming so 'planets' and 'planet' match."""
+    return word[:-1] if len(word) > 3 and word.endswith("s") and not word.endswith("ss") else word
+
+
+def text_features(text: str) -> FrozenSet[str]:
+    """
+    Return the set of normalised content words in a question.
+
+    Stopwords and punctuation (including '___' placeholders) are ignored.
+    If nothing is left, all words are used instead.
+    """
+    tokens = _TOKEN_RE.findall(text.lower())
+    content = frozenset(_stem(token) for token in tokens if token not in _STOPWORDS)
+    return content or frozenset(tokens) or frozenset([text.strip().lower()])
+
+
+def answer_key(answer: Optional[str]) -> Optional[str]:
+    """Normalise an answer for equality checks (None if empty)."""
+    if not answer:
+        return None
+    return " ".join(_TOKEN_RE.findall(str(answer).lower())) or None
+
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    """Jaccard similarity of two feature sets."""
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+# --------------------------------------------------------------
+# Index Interface
+# --------------------------------------------------------------
+class SimilarityIndex(Protocol):
+    """Interface shared by all duplicate indexes."""
+
+    def find(self, text: str, answer: Optional[str] = None) -> Optional[str]:
+        """Return the stored text that `text` duplicates, or None."""
+        ...
+
+    def add(self, text: str, answer: Optional[str] = None) -> None:
+        """Remember a question."""
+        ...
+
+    def __contains__(self, text: object) -> bool:
+        ...
+
+    def __len__(self) -> int:
+        ...
+
+
+class ExactIndex:
+    """Case-insensitive exact-match index (the original behaviour)."""
+
+    def __init__(self) -> None:
+        self._keys: Dict[str, str] = {}
+
+    def find(self, text: str, answer: Optional[str] = None) -> Optional[str]:
+        """Return the stored text equal to `text` ignoring case, or None."""
+        return self._keys.get(text.strip().lower())
+
+    def add(self, text: str, answer: Optional[str] = None) -> None:
+        """Remember a question."""
+        self._keys.setdefault(text.strip().lower(), text)
+
+    def __contains__(self, text: object) -> bool:
+        return isinstance(text, str) and self.find(text) is not None
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+
+class MinHashIndex:
+    """
+    MinHash/LSH index for near-duplicate questions.
+
+    Parameters
+    ----------
+    threshold : float, optional
+        Jaccard similarity at or above which two questions are duplicates.
+    answer_threshold : float, optional
+        Lower similarity that is enough when both questions have the same
+        answer.
+    bands : int, optional
+        LSH bands.
+    rows : int, optional
+        Signature rows per band; `bands * rows` hash functions are used.
+        Small `rows` favours recall; candidates are always confirmed with the
+        exact Jaccard similarity, so precision is unaffected.
+    seed : int, optional
+        Seed for the hash family (fixed, so signatures are reproducible).
+    """
+
+    def __init__(
+        self,
+        threshold: Optional[float] = None,
+        answer_threshold: Optional[float] = None,
+        bands: int = 16,
+        rows: int = 2,
+        seed: int = 1,
+    ) -> None:
+        self.threshold = settings.SIMILARITY_THRESHOLD if threshold is None else threshold
+        self.answer_threshold = (
+            settings.SIMILARITY_ANSWER_THRESHOLD if answer_threshold is None else answer_threshold
+        )
+        self.bands = bands
+        self.rows = rows
+
+        rng = random.Random(seed)
+        self._coefficients: List[Tuple[int, int]] = [
+            (rng.randrange(1, _PRIME), rng.randrange(0, _PRIME)) for _ in range(bands * rows)
+        ]
+
+        self._lock = threading.Lock()
+        self._texts: List[str] = []
+        self._features: List[FrozenSet[str]] = []
+        self._answers: List[Optional[str]] = []
+        self._buckets: Dict[Tuple[int, Tuple[int, ...]], List[int]] = defaultdict(list)
+        self._exact: Dict[str, int] = {}
+
+    @staticmethod
+    def _hash(feature: str) -> int:
+        """Stable 64-bit hash of a feature (independent of PYTHONHASHSEED)."""
+        return int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest(), "big")
+
+    def _band_keys(self, features: FrozenSet[str]) -> List[Tuple[int, Tuple[int, ...]]]:
+        """Compute the MinHash signature and split it into LSH band keys."""
+        hashes = [self._hash(feature) for feature in features]
+        signature = [min((a * h + b) % _PRIME for h in hashes) for a, b in self._coefficients]
+        return [
+            (band, tuple(signature[band * self.rows:(band + 1) * self.rows]))
+            for band in range(self.bands)
+        ]
+
+    def _lookup(
+        self,
+        features: FrozenSet[str],
+        answer: Optional[str],
+        band_keys: List[Tuple[int, Tuple[int, ...]]],
+    ) -> Optional[str]:
+        """Confirm LSH candidates with exact Jaccard. Caller holds the lock."""
+        candidates = {index for key in band_keys for index in self._buckets.get(key, ())}
+        for index in candidates:
+            similarity = jaccard(features, self._features[index])
+            if similarity >= self.threshold:
+                return self._texts[index]
+            if (
+                answer is not None
+                and answer == self._answers[index]
+                and similarity >= self.answer_threshold
+            ):
+                return self._texts[index]
+        return None
+
+    def find(self, text: str, answer: Optional[str] = None) -> Optional[str]:
+        """
+        Return the stored question that `text` duplicates, or None.
+
+        Parameters
+        ----------
+        text : str
+            Candidate question text.
+        answer : str, optional
+            Candidate's correct answer, enabling the answer-equality check.
+        """
+        features = text_features(text)
+        band_keys = self._band_keys(features)
+
+        with self._lock:
+            exact = self._exact.get(text.strip().lower())
+            if exact is not None:
+                return self._texts[exact]
+            return self._lookup(features, answer_key(answer), band_keys)
+
+    def add(self, text: str, answer: Optional[str] = None) -> None:
+        """Remember a question (exact repeats are ignored)."""
+        key = text.strip().lower()
+        features = text_features(text)
+        band_keys = self._band_keys(features)
+
+        with self._lock:
+            if key in self._exact:
+                return
+            index = len(self._texts)
+            self._texts.append(text)
+            self._features.append(features)
+            self._answers.append(answer_key(answer))
+            self._exact[key] = index
+            for band_key in band_keys:
+                self._buckets[band_key].append(index)
+
+    def __contains__(self, text: object) -> bool:
+        return isinstance(text, str) and self.find(text) is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._texts)
+
+
+# --------------------------------------------------------------
+# Factory
+# --------------------------------------------------------------
+def make_similarity_index(kind: Optional[str] = None) -> SimilarityIndex:
+    """
+    Build a duplicate index.
+
+    Parameters
+    ----------
+    kind : str, optional
+        'minhash' (near-duplicates) or 'exact'. Defaults to
+        `settings.SIMILARITY_INDEX`.
+    """
+    kind = kind or settings.SIMILARITY_INDEX
+    if kind == "exact":
+        return ExactIndex()
+    return MinHashIndex()
+
+
+# --------------------------------------------------------------
+# Duplicate Statistics
+# --------------------------------------------------------------
+class DuplicateStats:
+    """
+    Thread-safe counters of generated questions rejected as duplicates.
+
+    Arms:
+    - 'first'       : first attempt for a quiz slot
+    - 'retry_plain' : retry after a duplicate, same prompt (avoid list off)
+    - 'retry_avoid' : retry after a duplicate, with an avoid list in the prompt
+
+    Comparing the duplicate rate of 'retry_plain' (AVOID_PROMPTING_ENABLED
+    off) with 'retry_avoid' (on) shows how much retry spend the avoid list
+    saves.
+    """
+
+    ARMS = ("first", "retry_plain", "retry_avoid")
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._generated: Counter = Counter()
+        self._duplicates: Counter = Counter()
+
+    def record(self, arm: str, duplicate: bool) -> None:
+        """Record one generated question and whether it was a duplicate."""
+        with self._lock:
+            self._generated[arm] += 1
+            if duplicate:
+                self._duplicates[arm] += 1
+        if duplicate:
+            metrics.duplicate_rejections.labels(arm=arm).inc()
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """Return generated/duplicate counts and the duplicate rate per arm."""
+        with self._lock:
+            return {
+                arm: {
+                    "generated": self._generated[arm],
+                    "duplicates": self._duplicates[arm],
+                    "duplicate_rate": (
+                        self._duplicates[arm] / self._generated[arm]
+                        if self._generated[arm]
+                        else 0.0
+                    ),
+                }
+                for arm in self.ARMS
+            }
+
+
+duplicate_stats = DuplicateStats()
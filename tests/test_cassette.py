@@ -0,0 +1,96 @@
+"""
+test_cassette.py
+
+Tests for recording structured-output calls with `CassetteRecorder` and
+replaying them with `CassettePlayer`.
+"""
+
+# --------------------------------------------------------------
+# Imports
+# --------------------------------------------------------------
+import json
+
+import pytest
+from langchain_core.messages import AIMessage
+
+from src.llm.cassette import CassettePlayer, CassetteRecorder, iter_records
+from src.llm.structured import StructuredCaller
+from src.models.question_schemas import MCQQuestion
+
+PROMPT = "Generate a multiple-choice question about Python."
+QUESTION = MCQQuestion(question="What is 1 + 1?", options=["1", "2", "3", "4"], correct_answer="2")
+
+
+# --------------------------------------------------------------
+# Fake Chat Model
+# --------------------------------------------------------------
+class FakeRejection(Exception):
+    """Groq's 400 for a tool call that failed the schema."""
+
+    status_code = 400
+
+    def __init__(self, text: str) -> None:
+        super().__init__("tool_use_failed")
+        self.body = {"error": {"failed_generation": text}}
+
+
+class FakeStructuredRunnable:
+    def __init__(self, outcome) -> None:
+        self.outcome = outcome
+
+    def invoke(self, prompt):
+        if isinstance(self.outcome, Exception):
+            raise self.outcome
+        return self.outcome
+
+
+class FakeChatModel:
+    """Chat model whose structured runnable returns (or raises) a fixed outcome."""
+
+    def __init__(self, outcome) -> None:
+        self.outcome = outcome
+
+    def invoke(self, prompt):
+        return AIMessage(content="plain text")
+
+    def with_structured_output(self, schema, **kwargs):
+        return FakeStructuredRunnable(self.outcome)
+
+
+def _record(tmp_path, outcome):
+    path = str(tmp_path / "calls.jsonl")
+    recorder = CassetteRecorder(FakeChatModel(outcome), path, model="fake", temperature=0.0)
+    caller = StructuredCaller("function_calling")
+    return path, caller.invoke(recorder, PROMPT, MCQQuestion)
+
+
+# --------------------------------------------------------------
+# Tests
+# --------------------------------------------------------------
+def test_structured_call_is_recorded_and_replays_as_text(tmp_path):
+    raw = AIMessage(content="", usage_metadata={"input_tokens": 40, "output_tokens": 30, "total_tokens": 70})
+    path, (_, text, native) = _record(tmp_path, {"raw": raw, "parsed": QUESTION, "parsing_error": None})
+    assert native
+
+    [record] = list(iter_records(path))
+    assert record["tokens"] == [40, 30]
+    assert json.loads(record["response"]) == json.loads(text)
+
+    replayed = CassettePlayer(path).invoke(PROMPT)
+    assert MCQQuestion.model_validate_json(replayed.content) == QUESTION
+
+
+def test_rejected_tool_call_is_recorded_as_its_text(tmp_path):
+    rejected = '{"question": "What is 1 + 1?"}'
+    path, (_, text, native) = _record(tmp_path, FakeRejection(rejected))
+    assert (text, native) == (rejected, False)
+
+    [record] = list(iter_records(path))
+    assert record["response"] == rejected
+
+
+def test_models_without_structured_output_are_not_wrapped(tmp_path):
+    recorder = CassetteRecorder(object(), str(tmp_path / "calls.jsonl"), model="fake", temperature=0.0)
+    assert not StructuredCaller.supports(recorder)
+    with pytest.raises(AttributeError):
+        recorder.with_structured_output(MCQQuestion)
@@ -0,0 +1,199 @@
+"""
+test_coalescing.py
+
+Tests for request coalescing in `src/generator/coalescing.py`: how a flight
+splits its batch, how failures reach every caller, and what happens when a
+caller gives up.
+"""
+
+# --------------------------------------------------------------
+# Imports
+# --------------------------------------------------------------
+import asyncio
+import itertools
+import threading
+import time
+
+import pytest
+
+from src.common.custom_exception import CustomException
+from src.generator.coalescing import CoalescingGenerator, quiz_scope
+from src.models.question_schemas import MCQQuestion
+
+TOPIC = "Python Basics"
+
+
+# --------------------------------------------------------------
+# Fake Generator
+# --------------------------------------------------------------
+class FakeGenerator:
+    """Stand-in for `QuestionGenerator` that numbers its questions and can be held."""
+
+    def __init__(self, fail: Exception | None = None) -> None:
+        self.fail = fail
+        self.batch_sizes: list = []
+        self.direct_started = threading.Event()
+        self.release_direct = threading.Event()
+        self.batch_started = threading.Event()
+        self.release_batch = threading.Event()
+        self.release_batch.set()
+        self._numbers = itertools.count()
+
+    def _question(self) -> MCQQuestion:
+        number = next(self._numbers)
+        return MCQQuestion(question=f"Question {number}?", options=["a", "b", "c", "d"], correct_answer="a")
+
+    def generate_mcq(self, topic, difficulty="medium", avoid=None):
+        self.direct_started.set()
+        self.release_direct.wait(5)
+        return self._question()
+
+    async def agenerate_mcq(self, topic, difficulty="medium", avoid=None):
+        return self._question()
+
+    def generate_batch(self, topic, difficulty, n, question_type="Multiple Choice", avoid=None):
+        self.batch_sizes.append(n)
+        self.batch_started.set()
+        self.release_batch.wait(5)
+        if self.fail is not None:
+            raise self.fail
+        return [self._question() for _ in range(n)]
+
+
+def _in_quiz(call, results, name):
+    """Run `call` as its own quiz in a thread, storing its result or exception."""
+
+    def target():
+        with quiz_scope():
+            try:
+                results[name] = call()
+            except Exception as exc:
+                results[name] = exc
+
+    thread = threading.Thread(target=target)
+    thread.start()
+    return thread
+
+
+def _hold_key(fake, coalescer, results):
+    """Start a direct call from another quiz so later callers coalesce."""
+    thread = _in_quiz(lambda: coalescer.generate_mcq(TOPIC), results, "holder")
+    assert fake.direct_started.wait(5)
+    return thread
+
+
+# --------------------------------------------------------------
+# Tests
+# --------------------------------------------------------------
+def test_lone_caller_goes_direct():
+    fake = FakeGenerator()
+    fake.release_direct.set()
+    coalescer = CoalescingGenerator(fake, window=0.05)
+
+    assert coalescer.generate_mcq(TOPIC).question == "Question 0?"
+    assert fake.batch_sizes == []
+    assert coalescer.stats()["direct"] == 1
+
+
+def test_flight_splits_distinct_questions_between_quizzes():
+    fake = FakeGenerator()
+    coalescer = CoalescingGenerator(fake, window=0.2)
+    results: dict = {}
+    holder = _hold_key(fake, coalescer, results)
+
+    threads = [_in_quiz(lambda: coalescer.generate_mcq(TOPIC), results, name) for name in ("a", "b")]
+    threads.append(_in_quiz(lambda: coalescer.generate_batch(TOPIC, "medium", 3), results, "c"))
+    for thread in threads:
+        thread.join(5)
+    fake.release_direct.set()
+    holder.join(5)
+
+    assert fake.batch_sizes == [5]
+    shared = [results["a"].question, results["b"].question] + [q.question for q in results["c"]]
+    assert len(set(shared)) == 5
+    assert coalescer.stats()["flights"] == 1
+
+
+def test_failed_flight_reaches_every_caller():
+    fake = FakeGenerator(fail=RuntimeError("provider down"))
+    coalescer = CoalescingGenerator(fake, window=0.2)
+    results: dict = {}
+    holder = _hold_key(fake, coalescer, results)
+
+    threads = [_in_quiz(lambda: coalescer.generate_mcq(TOPIC), results, name) for name in ("a", "b")]
+    for thread in threads:
+        thread.join(5)
+    fake.release_direct.set()
+    holder.join(5)
+
+    assert isinstance(results["a"], CustomException)
+    assert isinstance(results["b"], CustomException)
+
+
+def test_caller_cancelled_in_window_drops_out_of_the_flight():
+    fake = FakeGenerator()
+    coalescer = CoalescingGenerator(fake, window=0.3)
+    results: dict = {}
+    holder = _hold_key(fake, coalescer, results)
+
+    async def cancelled_caller():
+        with quiz_scope():
+            task = asyncio.ensure_future(coalescer.agenerate_mcq(TOPIC))
+            await asyncio.sleep(0.05)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+    asyncio.run(cancelled_caller())
+    waiting = _in_quiz(lambda: coalescer.generate_mcq(TOPIC), results, "a")
+    waiting.join(5)
+    fake.release_direct.set()
+    holder.join(5)
+
+    assert fake.batch_sizes == [1]
+    assert isinstance(results["a"], MCQQuestion)
+
+
+def test_cancel_during_the_call_does_not_stop_the_hand_out():
+    fake = FakeGenerator()
+    fake.release_batch.clear()
+    coalescer = CoalescingGenerator(fake, window=0.2)
+    results: dict = {}
+    holder = _hold_key(fake, coalescer, results)
+
+    async def caller_cancelled_mid_flight():
+        with quiz_scope():
+            task = asyncio.ensure_future(coalescer.agenerate_mcq(TOPIC))
+            assert await asyncio.to_thread(fake.batch_started.wait, 5)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+    waiting = _in_quiz(lambda: coalescer.generate_mcq(TOPIC), results, "a")
+    asyncio.run(caller_cancelled_mid_flight())
+    fake.release_batch.set()
+    waiting.join(5)
+    fake.release_direct.set()
+    holder.join(5)
+
+    assert fake.batch_sizes == [2]
+    assert isinstance(results["a"], MCQQuestion)
+
+
+def test_waiting_caller_times_out():
+    fake = FakeGenerator()
+    fake.release_batch.clear()
+    coalescer = CoalescingGenerator(fake, window=0.0, result_timeout=0.2)
+    results: dict = {}
+    holder = _hold_key(fake, coalescer, results)
+
+    started = time.monotonic()
+    waiting = _in_quiz(lambda: coalescer.generate_mcq(TOPIC), results, "a")
+    waiting.join(5)
+    elapsed = time.monotonic() - started
+    fake.release_batch.set()
+    fake.release_direct.set()
+    holder.join(5)
+
+    assert isinstance(results["a"], CustomException)
+    assert elapsed < 2
@@ -0,0 +1,107 @@
+"""
+test_hedging.py
+
+Tests for hedged requests in `src/llm/hedging.py`: when a hedge is sent,
+that the loser is cancelled, and that cancelling the caller cancels every
+call it started.
+"""
+
+# --------------------------------------------------------------
+# Imports
+# --------------------------------------------------------------
+import asyncio
+
+import pytest
+
+from src.llm.hedging import Hedger
+
+KEY = "large"
+
+
+# --------------------------------------------------------------
+# Helpers
+# --------------------------------------------------------------
+class Calls:
+    """Coroutine factory whose n-th call sleeps `delays[n]` and records cancellation."""
+
+    def __init__(self, *delays: float) -> None:
+        self.delays = delays
+        self.started = 0
+        self.cancelled: list = []
+
+    async def __call__(self) -> str:
+        index = self.started
+        self.started += 1
+        try:
+            await asyncio.sleep(self.delays[index])
+        except asyncio.CancelledError:
+            self.cancelled.append(index)
+            raise
+        return f"call {index}"
+
+
+def _hedger(samples: int = 5) -> Hedger:
+    hedger = Hedger(percentile=0.5, min_samples=5, min_delay=0.05, max_fraction=1.0)
+    for _ in range(samples):
+        hedger.latencies.record(KEY, 0.01)
+    return hedger
+
+
+# --------------------------------------------------------------
+# Tests
+# --------------------------------------------------------------
+def test_no_hedge_without_enough_samples():
+    hedger = _hedger(samples=2)
+    calls = Calls(0.2)
+
+    assert asyncio.run(hedger.arun(calls, key=KEY)) == "call 0"
+    assert calls.started == 1
+    assert hedger.stats()["hedged"] == 0
+
+
+def test_slow_primary_is_hedged_and_cancelled():
+    hedger = _hedger()
+    calls = Calls(5.0, 0.01)
+
+    assert asyncio.run(hedger.arun(calls, key=KEY)) == "call 1"
+    assert calls.cancelled == [0]
+    stats = hedger.stats()
+    assert (stats["hedged"], stats["hedge_won"]) == (1, 1)
+    # The cut-short primary still counts as a (lower-bound) latency sample
+    assert len(hedger.latencies._samples[KEY]) == 7
+
+
+def test_hedge_is_cancelled_when_the_primary_wins():
+    hedger = _hedger()
+    calls = Calls(0.1, 5.0)
+
+    assert asyncio.run(hedger.arun(calls, key=KEY)) == "call 0"
+    assert calls.cancelled == [1]
+    assert hedger.stats()["hedge_won"] == 0
+
+
+def test_no_hedge_without_quota():
+    hedger = _hedger()
+    calls = Calls(0.1)
+
+    assert asyncio.run(hedger.arun(calls, key=KEY, can_hedge=lambda: False)) == "call 0"
+    assert calls.started == 1
+    assert hedger.stats()["quota_denied"] == 1
+
+
+def test_cancelling_the_caller_cancels_every_call():
+    hedger = _hedger()
+    calls = Calls(5.0, 5.0)
+
+    async def cancel_after_hedge():
+        task = asyncio.ensure_future(hedger.arun(calls, key=KEY))
+        while calls.started < 2:
+            await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        # Let the cancelled calls run their handlers
+        await asyncio.sleep(0)
+
+    asyncio.run(cancel_after_hedge())
+    assert sorted(calls.cancelled) == [0, 1]
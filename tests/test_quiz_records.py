@@ -0,0 +1,38 @@
+"""
+test_quiz_records.py
+
+Tests for the shared quiz records in `src/models/quiz_records.py`.
+"""
+
+# --------------------------------------------------------------
+# Imports
+# --------------------------------------------------------------
+import gc
+
+from src.models.quiz_records import FILL_BLANK, MCQ, QuizQuestion, intern_question, interned_count
+
+
+# --------------------------------------------------------------
+# Interning
+# --------------------------------------------------------------
+def test_equal_questions_share_one_instance():
+    first = intern_question(QuizQuestion(MCQ, "Shared?", "a", ("a", "b")))
+    second = intern_question(QuizQuestion(MCQ, "Shared?", "a", ("a", "b")))
+    assert second is first
+
+
+def test_different_questions_are_not_merged():
+    mcq = intern_question(QuizQuestion(MCQ, "Which one?", "a", ("a", "b")))
+    blank = intern_question(QuizQuestion(FILL_BLANK, "Which one?", "a"))
+    assert mcq is not blank
+
+
+def test_entries_are_released_with_the_last_reference():
+    gc.collect()
+    before = interned_count()
+    held = [intern_question(QuizQuestion(FILL_BLANK, f"Released {i}?", "x")) for i in range(10)]
+    assert interned_count() == before + 10
+
+    del held
+    gc.collect()
+    assert interned_count() == before
@@ -0,0 +1,174 @@
+"""
+test_rate_limiter.py
+
+Tests for the fair RPM/TPM limiter in `src/llm/rate_limiter.py`. Quota is
+handed out one call at a time by a gated backend, so the order in which
+callers are served is deterministic.
+"""
+
+# --------------------------------------------------------------
+# Imports
+# --------------------------------------------------------------
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src.llm.rate_limiter import RateLimiter, RateLimitTimeout, background_priority
+
+
+# --------------------------------------------------------------
+# Helpers
+# --------------------------------------------------------------
+class GatedBackend:
+    """Bucket backend that grants exactly as many calls as it was given credits."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.credits = 0
+
+    def grant(self, calls: int = 1) -> None:
+        with self._lock:
+            self.credits += calls
+
+    def try_consume(self, buckets, costs) -> float:
+        with self._lock:
+            if self.credits:
+                self.credits -= 1
+                return 0.0
+            return 0.01
+
+    def adjust(self, bucket, delta) -> None:
+        pass
+
+
+def _limiter(max_wait: float = 5.0):
+    backend = GatedBackend()
+    return RateLimiter(60, 60_000, backend=backend, max_wait=max_wait), backend
+
+
+def _wait_for(condition, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not reached"
+        time.sleep(0.005)
+
+
+def _caller(limiter, served, name, background=False, use_async=False):
+    """Acquire in a thread and record the order callers were served in."""
+
+    def target():
+        if use_async:
+            asyncio.run(limiter.aacquire(10))
+        elif background:
+            with background_priority():
+                limiter.acquire(10)
+        else:
+            limiter.acquire(10)
+        served.append(name)
+
+    thread = threading.Thread(target=target)
+    thread.start()
+    return thread
+
+
+# --------------------------------------------------------------
+# Queueing
+# --------------------------------------------------------------
+def test_callers_are_served_in_arrival_order():
+    limiter, backend = _limiter()
+    served: list = []
+
+    threads = []
+    for depth, (name, use_async) in enumerate([("first", False), ("second", True), ("third", False)], start=1):
+        threads.append(_caller(limiter, served, name, use_async=use_async))
+        _wait_for(lambda: limiter.stats()["queue_depth"] == depth)
+
+    for expected in (["first"], ["first", "second"], ["first", "second", "third"]):
+        backend.grant()
+        _wait_for(lambda: len(served) == len(expected))
+        assert served == expected
+
+    for thread in threads:
+        thread.join(5)
+    assert limiter.stats()["queue_depth"] == 0
+
+
+def test_try_acquire_never_overtakes_a_queued_caller():
+    limiter, backend = _limiter()
+    served: list = []
+
+    waiting = _caller(limiter, served, "queued")
+    _wait_for(lambda: limiter.stats()["queue_depth"] == 1)
+    backend.grant()
+    assert not limiter.try_acquire(10)
+
+    waiting.join(5)
+    assert served == ["queued"]
+
+
+def test_timeout_leaves_the_queue():
+    limiter, backend = _limiter(max_wait=0.2)
+
+    started = time.monotonic()
+    with pytest.raises(RateLimitTimeout):
+        limiter.acquire(10)
+    assert time.monotonic() - started < 1
+
+    stats = limiter.stats()
+    assert stats["timeouts"] == 1
+    assert stats["queue_depth"] == 0
+
+    # The queue is usable again afterwards
+    backend.grant()
+    assert limiter.acquire(10) >= 0.0
+
+
+def test_cancelled_async_caller_leaves_the_queue():
+    limiter, backend = _limiter()
+
+    async def cancel_while_queued():
+        task = asyncio.ensure_future(limiter.aacquire(10))
+        while limiter.stats()["queue_depth"] == 0:
+            await asyncio.sleep(0.005)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel_while_queued())
+    _wait_for(lambda: limiter.stats()["queue_depth"] == 0)
+
+    backend.grant()
+    assert limiter.acquire(10) >= 0.0
+
+
+# --------------------------------------------------------------
+# Background Lane
+# --------------------------------------------------------------
+def test_background_call_waits_for_queued_callers():
+    limiter, backend = _limiter()
+    served: list = []
+
+    user = _caller(limiter, served, "user")
+    _wait_for(lambda: limiter.stats()["queue_depth"] == 1)
+    background = _caller(limiter, served, "background", background=True)
+    time.sleep(0.05)
+
+    # Background work never shows up as queued interactive demand
+    assert limiter.stats()["queue_depth"] == 1
+
+    backend.grant()
+    user.join(5)
+    assert served == ["user"]
+
+    backend.grant()
+    background.join(5)
+    assert served == ["user", "background"]
+
+
+def test_background_call_times_out_without_idle_quota():
+    limiter, _ = _limiter(max_wait=0.2)
+    with background_priority(), pytest.raises(RateLimitTimeout):
+        limiter.acquire(10)
+    assert limiter.stats()["timeouts"] == 1
@@ -0,0 +1,97 @@
+"""
+test_results_store.py
+
+Tests for batched writes in `src/storage/results_store.py`: a row the
+database rejects is dropped on its own, and a failing database keeps every
+row for the next flush.
+"""
+
+# --------------------------------------------------------------
+# Imports
+# --------------------------------------------------------------
+import sqlite3
+
+import pytest
+
+from src.storage.results_store import ResultsStore
+
+
+# --------------------------------------------------------------
+# Helpers
+# --------------------------------------------------------------
+def _rows(count, question_number=None):
+    return [
+        {
+            "question_number": i + 1 if question_number is None else question_number,
+            "question_type": "MCQ",
+            "question": f"Question {i}?",
+            "user_answer": "a",
+            "correct_answer": "a",
+            "is_correct": True,
+            "options": ["a", "b"],
+        }
+        for i in range(count)
+    ]
+
+
+class LockedOnce:
+    """Connection proxy whose first batch insert fails like a locked database."""
+
+    def __init__(self, conn: sqlite3.Connection) -> None:
+        self.conn = conn
+        self.failed = False
+
+    def __enter__(self):
+        return self.conn.__enter__()
+
+    def __exit__(self, *exc_info):
+        return self.conn.__exit__(*exc_info)
+
+    def executemany(self, *args):
+        if not self.failed:
+            self.failed = True
+            raise sqlite3.OperationalError("database is locked")
+        return self.conn.executemany(*args)
+
+    def __getattr__(self, name):
+        return getattr(self.conn, name)
+
+
+@pytest.fixture
+def store(tmp_path):
+    # Long interval and batch size: only explicit flushes write
+    store = ResultsStore(str(tmp_path / "results.db"), flush_rows=1000, flush_seconds=3600)
+    yield store
+    store.close()
+
+
+# --------------------------------------------------------------
+# Tests
+# --------------------------------------------------------------
+def test_append_only_buffers(store):
+    store.append(_rows(3), topic="Python", difficulty="easy")
+    assert store._pending
+    assert store.flush() == 3
+    assert store.count("Python") == 3
+
+
+def test_rejected_row_is_dropped_without_blocking_the_batch(store):
+    store.append(_rows(2), topic="Python", difficulty="easy")
+    store.append(_rows(1, question_number=object()), topic="Python", difficulty="easy")
+    store.append(_rows(2), topic="Python", difficulty="easy")
+
+    assert store.flush() == 4
+    assert store.count() == 4
+    assert not store._pending
+
+
+def test_database_failure_keeps_rows_for_the_next_flush(store):
+    store.append(_rows(3), topic="Python", difficulty="easy")
+    store._conn = LockedOnce(store._conn)
+
+    with pytest.raises(sqlite3.OperationalError):
+        store.flush()
+    assert len(store._pending) == 3
+
+    assert store.flush() == 3
+    assert store.count() == 3
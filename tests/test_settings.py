@@ -0,0 +1,26 @@
+"""
+test_settings.py
+
+Tests for environment parsing in `src/config/settings.py`.
+"""
+
+# --------------------------------------------------------------
+# Imports
+# --------------------------------------------------------------
+import pytest
+
+from src.config.settings import _json_object_env
+
+
+# --------------------------------------------------------------
+# Tests
+# --------------------------------------------------------------
+def test_json_object_is_read(monkeypatch):
+    monkeypatch.setenv("MODEL_ROUTES", '{"mcq:medium": "small"}')
+    assert _json_object_env("MODEL_ROUTES") == {"mcq:medium": "small"}
+
+
+@pytest.mark.parametrize("value", ["", "{bad", '["small"]', '{"mcq:easy": 1}'])
+def test_unset_or_malformed_value_falls_back_to_defaults(monkeypatch, value):
+    monkeypatch.setenv("MODEL_ROUTES", value)
+    assert _json_object_env("MODEL_ROUTES") == {}